@@ -0,0 +1,200 @@
+"""Evaluate agents over a range of as-of dates into a partitioned output directory."""
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from . import datasets, utils
+from .forecast_models import ForecastModelService
+from .graph import AGENT_NAMES, NODES, AgentGraph
+
+LAYOUTS = {"jsonl", "columnar"}
+MANIFEST_FILE = "_manifest.json"
+_STEP_PATTERN = re.compile(r"^\s*(\d+)\s*([dw]?)\s*$", re.IGNORECASE)
+_STEP_UNITS = {"": "days", "d": "days", "w": "weeks"}
+
+DateResult = Tuple[datetime, Mapping[str, Mapping[str, object]], Mapping[str, float]]
+
+
+def parse_step(value: str) -> timedelta:
+    """Parse ``7``, ``7d`` or ``2w`` into a positive ``timedelta`` of whole days.
+
+    Partitions are named by date, so steps shorter than a day are not accepted.
+    """
+
+    match = _STEP_PATTERN.match(value or "")
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid step '{value}' (expected e.g. 1d, 7d, 2w)")
+    return timedelta(**{_STEP_UNITS[match.group(2).lower()]: int(match.group(1))})
+
+
+def date_range(start: datetime, end: datetime, step: timedelta) -> List[datetime]:
+    dates: List[datetime] = []
+    current = start
+    while current <= end:
+        dates.append(current)
+        current += step
+    return dates
+
+
+def warm_datasets(data_dir: Path) -> int:
+    """Parse every CSV under ``data_dir`` into the shared dataset cache."""
+
+    count = 0
+    for path in sorted(Path(data_dir).glob("*.csv")):
+        datasets.load_dataset(path)
+        count += 1
+    return count
+
+
+def _init_worker(data_dir: Path) -> None:
+    warm_datasets(data_dir)
+    # The parent refreshed and saved the current fits; workers only fit past
+    # as-of days into their in-memory cache and never write models.json.
+    service = ForecastModelService.for_data_dir(Path(data_dir))
+    service.persist = False
+    service.workers = 1
+
+
+def _evaluate_date(data_dir: Path, as_of: datetime, agents: Sequence[str]) -> DateResult:
+    # A graph per date so ordering still shares the forecast node, without
+    # holding a year of payloads in the process-wide cache.
+    graph = AgentGraph(data_dir, max_entries=len(NODES))
+    payloads: Dict[str, Mapping[str, object]] = {}
+    durations: Dict[str, float] = {}
+    for agent in agents:
+        clock = time.perf_counter()
+        payloads[agent] = graph.get(agent, as_of)
+        durations[agent] = round((time.perf_counter() - clock) * 1000.0, 1)
+    return as_of, payloads, durations
+
+
+def _evaluate_in_worker(args: Tuple[str, datetime, Tuple[str, ...]]) -> DateResult:
+    data_dir, as_of, agents = args
+    return _evaluate_date(Path(data_dir), as_of, agents)
+
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+def _rows(section: object) -> List[object]:
+    if isinstance(section, list):
+        return section
+    return [section]
+
+
+def _columns(rows: Sequence[object]) -> Mapping[str, List[object]]:
+    names: Dict[str, None] = {}
+    for row in rows:
+        if isinstance(row, Mapping):
+            names.update(dict.fromkeys(str(key) for key in row))
+    if not names:
+        return {"value": list(rows)}
+    return {
+        name: [row.get(name) if isinstance(row, Mapping) else None for row in rows]
+        for name in names
+    }
+
+
+def write_partition(
+    output_dir: Path,
+    as_of: datetime,
+    payloads: Mapping[str, Mapping[str, object]],
+    *,
+    layout: str = "jsonl",
+) -> List[Path]:
+    """Write one date's payloads as ``<agent>/<section>/as_of=<date>.<ext>``."""
+
+    written: List[Path] = []
+    partition = f"as_of={as_of.date().isoformat()}"
+    for agent, payload in payloads.items():
+        for section, value in payload.items():
+            directory = output_dir / agent / str(section)
+            utils.ensure_directory(directory)
+            rows = _rows(value)
+            if layout == "columnar":
+                path = directory / f"{partition}.columns.json"
+                body = json.dumps({"length": len(rows), "columns": _columns(rows)}, default=str)
+            else:
+                path = directory / f"{partition}.jsonl"
+                body = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+            path.write_text(body, encoding="utf-8")
+            written.append(path)
+    return written
+
+
+def _results(
+    data_dir: Path, dates: Sequence[datetime], agents: Tuple[str, ...], workers: int
+) -> Iterator[DateResult]:
+    if workers <= 1 or len(dates) <= 1:
+        for as_of in dates:
+            yield _evaluate_date(data_dir, as_of, agents)
+        return
+    # Workers start from a clean interpreter rather than a fork of a possibly
+    # threaded caller; the initializer parses the datasets once per worker.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(dates)),
+        mp_context=utils.process_pool_context(),
+        initializer=_init_worker,
+        initargs=(data_dir,),
+    ) as pool:
+        yield from pool.map(_evaluate_in_worker, [(str(data_dir), as_of, agents) for as_of in dates])
+
+
+def run_backfill(
+    data_dir: Path,
+    start: datetime,
+    end: datetime,
+    output_dir: Path,
+    *,
+    step: timedelta = timedelta(days=1),
+    agents: Optional[Iterable[str]] = None,
+    layout: str = "jsonl",
+    workers: Optional[int] = None,
+) -> Mapping[str, object]:
+    """Evaluate ``agents`` for every date in ``[start, end]`` and write one partition per date."""
+
+    selected = tuple(agent.lower() for agent in (agents or AGENT_NAMES))
+    unknown = [agent for agent in selected if agent not in AGENT_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown agent '{unknown[0]}'")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown backfill layout '{layout}'")
+    if step < timedelta(days=1) or step % timedelta(days=1):
+        raise ValueError("Backfill step must be a whole number of days; partitions are one per date")
+    data_dir = Path(data_dir)
+    output_dir = Path(output_dir)
+    dates = date_range(start, end, step)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    clock = time.perf_counter()
+    warm_datasets(data_dir)
+    ForecastModelService.for_data_dir(data_dir).refresh()
+    files = 0
+    timings: Dict[str, float] = {agent: 0.0 for agent in selected}
+    for as_of, payloads, durations in _results(data_dir, dates, selected, workers):
+        files += len(write_partition(output_dir, as_of, payloads, layout=layout))
+        for agent, elapsed in durations.items():
+            timings[agent] += elapsed
+
+    manifest = {
+        "data_dir": str(data_dir),
+        "from": start.date().isoformat(),
+        "to": end.date().isoformat(),
+        "step_seconds": int(step.total_seconds()),
+        "agents": list(selected),
+        "layout": layout,
+        "dates": [as_of.date().isoformat() for as_of in dates],
+        "files": files,
+        "agent_ms": {agent: round(total, 1) for agent, total in timings.items()},
+        "elapsed_seconds": round(time.perf_counter() - clock, 3),
+    }
+    utils.ensure_directory(output_dir)
+    (output_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
@@ -0,0 +1,150 @@
+"""Process-wide columnar cache for the CSV fixtures shared by every agent."""
+from __future__ import annotations
+
+import csv
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from .utils import parse_date
+
+DatasetKey = Tuple[str, int, int]
+
+
+@dataclass
+class Dataset:
+    """Parsed CSV file held column-wise; rows are handed out as read-only views."""
+
+    path: Path
+    version: DatasetKey
+    columns: Tuple[str, ...]
+    length: int
+    _data: Mapping[str, Tuple[object, ...]]
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _date_columns: MutableMapping[str, Tuple[object, ...]] = field(default_factory=dict, repr=False)
+    _float_columns: MutableMapping[Tuple[str, float], Tuple[float, ...]] = field(default_factory=dict, repr=False)
+    _row_views: MutableMapping[Tuple[str, ...], Tuple[Mapping[str, object], ...]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def __len__(self) -> int:
+        return self.length
+
+    def column(self, name: str, *, parse_dates: bool = False) -> Tuple[object, ...]:
+        """Return one column as an immutable tuple (dates parsed on request)."""
+
+        raw = self._data.get(name)
+        if raw is None:
+            return (None,) * self.length
+        if not parse_dates:
+            return raw
+        with self._lock:
+            parsed = self._date_columns.get(name)
+            if parsed is None:
+                parsed = tuple(parse_date(str(value)) if value else value for value in raw)
+                self._date_columns[name] = parsed
+            return parsed
+
+    def float_column(self, name: str, default: float = 0.0) -> Tuple[float, ...]:
+        """Return a column coerced to floats, substituting ``default`` for bad values."""
+
+        key = (name, default)
+        with self._lock:
+            cached = self._float_columns.get(key)
+        if cached is not None:
+            return cached
+        values: List[float] = []
+        for value in self.column(name):
+            try:
+                values.append(float(value))  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                values.append(default)
+        result = tuple(values)
+        with self._lock:
+            self._float_columns[key] = result
+        return result
+
+    def rows(self, parse_dates: Sequence[str] | None = None) -> Tuple[Mapping[str, object], ...]:
+        """Return every row as a read-only mapping, matching ``csv.DictReader`` keys."""
+
+        date_columns = tuple(sorted({column for column in parse_dates or [] if column in self._data}))
+        with self._lock:
+            cached = self._row_views.get(date_columns)
+        if cached is not None:
+            return cached
+        columns = [
+            self.column(name, parse_dates=name in date_columns) for name in self.columns
+        ]
+        views = tuple(MappingProxyType(dict(zip(self.columns, values))) for values in zip(*columns))
+        with self._lock:
+            self._row_views.setdefault(date_columns, views)
+            return self._row_views[date_columns]
+
+
+_CACHE: Dict[str, Dataset] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _file_version(path: Path) -> DatasetKey:
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _read_columns(path: Path) -> Tuple[Tuple[str, ...], Mapping[str, Tuple[object, ...]], int]:
+    with path.open("r", encoding="utf-8", newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if not header:
+            return (), {}, 0
+        width = len(header)
+        buffers: List[List[object]] = [[] for _ in range(width)]
+        length = 0
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [None] * (width - len(row))
+            for index in range(width):
+                buffers[index].append(row[index])
+            length += 1
+
+    # Later duplicate headers win, mirroring csv.DictReader's dict construction.
+    data = {name: tuple(buffers[index]) for index, name in enumerate(header)}
+    return tuple(dict.fromkeys(header)), data, length
+
+
+def load_dataset(path: Path) -> Dataset:
+    """Return the cached dataset for ``path``, re-parsing only when the file changed."""
+
+    path = Path(path)
+    version = _file_version(path)
+    cache_key = version[0]
+    with _CACHE_LOCK:
+        cached = _CACHE.get(cache_key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    columns, data, length = _read_columns(path)
+    dataset = Dataset(path=path, version=version, columns=columns, length=length, _data=data)
+    with _CACHE_LOCK:
+        current = _CACHE.get(cache_key)
+        if current is not None and current.version == version:
+            return current
+        _CACHE[cache_key] = dataset
+    return dataset
+
+
+def dataset_version(path: Path) -> Optional[DatasetKey]:
+    """Return the (path, mtime, size) signature used to key cached datasets."""
+
+    try:
+        return _file_version(Path(path))
+    except FileNotFoundError:
+        return None
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
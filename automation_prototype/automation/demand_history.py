@@ -0,0 +1,348 @@
+"""Append-only, memory-mapped daily demand history per SKU."""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Set, Tuple
+
+from . import utils
+
+try:  # POSIX advisory locks serialize writers across processes
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: writers are only serialized within a process
+    fcntl = None
+
+HISTORY_DIR = "demand_history"
+INDEX_FILE = "index.json"
+INGESTED_FILE = "ingested.txt"
+LOCK_FILE = "index.lock"
+# Portal order statuses that represent demand we expect to ship.
+DEMAND_STATUSES = frozenset({"approved", "fulfilled", "shipped", "delivered"})
+_CELL = struct.Struct("<d")
+
+
+def _to_date(value: object) -> Optional[date]:
+    if isinstance(value, datetime):
+        stamp = value.astimezone(timezone.utc) if value.tzinfo else value
+        return stamp.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    try:
+        return _to_date(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+    except ValueError:
+        try:
+            return utils.parse_date(str(value)).date()
+        except ValueError:
+            return None
+
+
+def _order_record(order: Mapping[str, object]) -> Optional[Tuple[str, str, object, float]]:
+    try:
+        quantity = float(order.get("quantity") or 0)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    return f"order:{order.get('id')}", str(order.get("supply_sku") or ""), order.get("created_at"), quantity
+
+
+class DemandHistoryStore:
+    """Daily demand per SKU kept as little-endian float64 arrays, one file per SKU.
+
+    Cell ``i`` of a SKU's file holds the units demanded on ``origin + i`` days.
+    New days are appended (days without demand are zero-filled) and same-day
+    demand is added in place, so recording is O(1) amortised. Readers map the
+    files and slice windows straight out of the page cache. ``index.json``
+    holds each SKU's origin, length and a version bumped on every write;
+    ``ingested.txt`` remembers source keys so feeds can be replayed safely.
+
+    API workers, the CLI and backfills may write the same directory, so each
+    write holds an exclusive lock on ``index.lock`` and re-reads the index and
+    any newly ingested keys before changing anything.
+    """
+
+    _registry: Dict[str, "DemandHistoryStore"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.index_path = self.directory / INDEX_FILE
+        self._lock = threading.RLock()
+        self._index: MutableMapping[str, MutableMapping[str, int | str]] = {}
+        self._index_signature: Optional[Tuple[int, int, int]] = None
+        self._ingested: Set[str] = set()
+        self._ingested_offset = 0
+        self._maps: Dict[str, Tuple[int, mmap.mmap]] = {}
+
+    @classmethod
+    def for_data_dir(cls, data_dir: Path) -> "DemandHistoryStore":
+        """Return the process-wide store under ``data_dir/demand_history``."""
+
+        key = str(Path(data_dir).resolve())
+        with cls._registry_lock:
+            store = cls._registry.get(key)
+            if store is None:
+                store = cls(Path(data_dir) / HISTORY_DIR)
+                cls._registry[key] = store
+            return store
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    def _entries(self) -> MutableMapping[str, MutableMapping[str, int | str]]:
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            if self._index_signature is not None:  # removed underneath us
+                self._index, self._index_signature = {}, None
+            return self._index
+        # Every write replaces the file, so the inode changes even within one mtime tick.
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self._index_signature:
+            try:
+                payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                payload = {"skus": {}}
+            self._index = {sku: dict(entry) for sku, entry in payload.get("skus", {}).items()}
+            self._index_signature = signature
+        return self._index
+
+    def _write_index(self) -> None:
+        utils.ensure_directory(self.directory)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory, prefix=INDEX_FILE + ".", suffix=".tmp", delete=False
+        ) as scratch:
+            json.dump({"skus": self._index}, scratch, indent=2, sort_keys=True)
+        os.replace(scratch.name, self.index_path)
+        stat = self.index_path.stat()
+        self._index_signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Hold the thread lock and the cross-process lock for one read-modify-write."""
+
+        with self._lock:
+            utils.ensure_directory(self.directory)
+            with (self.directory / LOCK_FILE).open("a") as handle:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def skus(self) -> List[str]:
+        with self._lock:
+            return sorted(self._entries())
+
+    def versions(self) -> Dict[str, int]:
+        """Write counter of every SKU, read with a single index check."""
+
+        with self._lock:
+            return {sku: int(entry["version"]) for sku, entry in self._entries().items()}
+
+    def version(self, sku: str) -> int:
+        """Write counter for ``sku``; 0 when it has no history."""
+
+        with self._lock:
+            entry = self._entries().get(sku)
+            return int(entry["version"]) if entry else 0
+
+    def span(self, sku: str) -> Optional[Tuple[date, date]]:
+        """First and last day recorded for ``sku``."""
+
+        with self._lock:
+            entry = self._entries().get(sku)
+            if not entry or not int(entry["length"]):
+                return None
+            origin = int(entry["origin"])
+            return date.fromordinal(origin), date.fromordinal(origin + int(entry["length"]) - 1)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _ingested_keys(self) -> Set[str]:
+        """Keys ingested by any process; only lines appended since the last call are read."""
+
+        path = self.directory / INGESTED_FILE
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._ingested_offset:  # replaced or truncated; start over
+            self._ingested, self._ingested_offset = set(), 0
+        if size > self._ingested_offset:
+            with path.open("rb") as handle:
+                handle.seek(self._ingested_offset)
+                data = handle.read(size - self._ingested_offset)
+            # Writers append whole lines under the lock, so ``data`` ends on a newline.
+            self._ingested.update(line for line in data.decode("utf-8").splitlines() if line)
+            self._ingested_offset = size
+        return self._ingested
+
+    def _add(self, sku: str, cells: Mapping[int, float]) -> None:
+        """Add per-day quantities (keyed by date ordinal) to ``sku`` with one file open."""
+
+        entries = self._entries()
+        entry = entries.get(sku)
+        if entry is None:
+            entry = entries[sku] = {"file": f"sku-{len(entries):06d}.f64", "origin": min(cells), "length": 0, "version": 0}
+        path = self.directory / str(entry["file"])
+        origin, length = int(entry["origin"]), int(entry["length"])
+        utils.ensure_directory(self.directory)
+        first = min(cells)
+        if not length:
+            origin = first
+        elif first < origin:
+            # Rare late record before the first day: rewrite with a zero prefix.
+            existing = path.read_bytes()
+            path.write_bytes(bytes(_CELL.size * (origin - first)) + existing)
+            length += origin - first
+            origin = first
+            self._drop_map(path)
+        end = max(length, max(cells) - origin + 1)
+        tail = array("d", bytes(_CELL.size * (end - length)))
+        # A new series starts from an empty file, even if a crashed writer left one behind.
+        with path.open("r+b" if length and path.exists() else "w+b") as handle:
+            for ordinal, quantity in sorted(cells.items()):
+                offset = ordinal - origin
+                if offset >= length:
+                    tail[offset - length] += quantity
+                    continue
+                handle.seek(offset * _CELL.size)
+                (current,) = _CELL.unpack(handle.read(_CELL.size))
+                handle.seek(offset * _CELL.size)
+                handle.write(_CELL.pack(current + quantity))
+            if len(tail):
+                if sys.byteorder != "little":  # pragma: no cover - files are little-endian
+                    tail.byteswap()
+                handle.seek(length * _CELL.size)
+                handle.write(tail.tobytes())
+        entry.update(origin=origin, length=end, version=int(entry["version"]) + 1)
+
+    def record_many(self, records: Iterable[Tuple[str, str, object, float]]) -> int:
+        """Add ``(key, sku, day, quantity)`` records, skipping keys already ingested.
+
+        Records are grouped per SKU so each file is opened once and the index
+        is written once. Returns the number of records applied.
+        """
+
+        with self._write_lock():
+            seen = self._ingested_keys()
+            fresh: List[str] = []
+            by_sku: Dict[str, Dict[int, float]] = {}
+            for key, sku, day, quantity in records:
+                parsed = _to_date(day)
+                sku = str(sku or "").strip()
+                if not sku or parsed is None or key in seen:
+                    continue
+                cells = by_sku.setdefault(sku, {})
+                cells[parsed.toordinal()] = cells.get(parsed.toordinal(), 0.0) + float(quantity)
+                seen.add(key)
+                fresh.append(key)
+            for sku, cells in by_sku.items():
+                self._add(sku, cells)
+            if fresh:
+                self._write_index()
+                lines = "".join(f"{key}\n" for key in fresh).encode("utf-8")
+                with (self.directory / INGESTED_FILE).open("ab") as handle:
+                    handle.write(lines)
+                self._ingested_offset += len(lines)
+        return len(fresh)
+
+    def record_order(self, order: Mapping[str, object]) -> bool:
+        """Record a portal order's quantity on its creation day.
+
+        Orders count once their status is in :data:`DEMAND_STATUSES`; each
+        order is recorded at most once.
+        """
+
+        if str(order.get("status") or "") not in DEMAND_STATUSES:
+            return False
+        record = _order_record(order)
+        return bool(record and self.record_many([record]))
+
+    def sync(self, data_dir: Path) -> Mapping[str, int]:
+        """Ingest fulfilled portal orders and last patient fulfilments from ``data_dir``."""
+
+        records: List[Tuple[str, str, object, float]] = []
+        for order in utils.load_journaled_records(Path(data_dir) / "portal_orders.json", "orders"):
+            record = _order_record(order) if str(order.get("status") or "") in DEMAND_STATUSES else None
+            if record is not None:
+                records.append(record)
+        usage_path = Path(data_dir) / "patient_usage.csv"
+        if usage_path.exists():
+            for row in utils.load_csv(usage_path):
+                fulfilled = row.get("last_fulfillment_date")
+                try:
+                    # The usage feed only carries the latest fulfilment: a 30-day supply.
+                    quantity = max(float(row.get("avg_daily_use") or 0) * 30, 0.0)  # type: ignore[arg-type]
+                except (TypeError, ValueError):
+                    continue
+                key = f"usage:{row.get('patient_id')}:{row.get('supply_sku')}:{fulfilled}"
+                records.append((key, str(row.get("supply_sku") or ""), fulfilled, quantity))
+        return {"candidates": len(records), "applied": self.record_many(records)}
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _drop_map(self, path: Path) -> None:
+        cached = self._maps.pop(str(path), None)
+        if cached is not None:
+            cached[1].close()
+
+    def _map(self, path: Path, length: int) -> Optional[mmap.mmap]:
+        size = length * _CELL.size
+        cached = self._maps.get(str(path))
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        self._drop_map(path)
+        try:
+            with path.open("rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        self._maps[str(path)] = (size, mapped)
+        return mapped
+
+    def window(self, sku: str, end: object, days: int) -> array:
+        """Daily demand for the ``days`` days ending on ``end`` (inclusive), zero-filled."""
+
+        end_day = _to_date(end)
+        result = array("d", bytes(_CELL.size * max(days, 0)))
+        if end_day is None or days <= 0:
+            return result
+        with self._lock:
+            entry = self._entries().get(sku)
+            if not entry or not int(entry["length"]):
+                return result
+            origin, length = int(entry["origin"]), int(entry["length"])
+            mapped = self._map(self.directory / str(entry["file"]), length)
+            if mapped is None:
+                return result
+            first = end_day.toordinal() - days + 1
+            low, high = max(first, origin), min(end_day.toordinal(), origin + length - 1)
+            if low > high:
+                return result
+            values = array("d")
+            values.frombytes(mapped[(low - origin) * _CELL.size:(high - origin + 1) * _CELL.size])
+            if sys.byteorder != "little":  # pragma: no cover - files are little-endian
+                values.byteswap()
+            result[low - first:high - first + 1] = values
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            for _, mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
@@ -1,7 +1,6 @@
 """Financial pulse agent computing ROI metrics."""
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterable, Mapping
@@ -20,14 +19,7 @@ DSO_BASELINE = 45.0
 
 
 def _load_tasks(data_dir: Path) -> Iterable[Mapping[str, object]]:
-    path = data_dir / "tasks.json"
-    if not path.exists():
-        return []
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return []
-    return payload.get("tasks", [])
+    return utils.load_journaled_records(data_dir / "tasks.json", "tasks")
 
 
 def _minutes_saved(tasks: Iterable[Mapping[str, object]]) -> float:
@@ -0,0 +1,212 @@
+"""Fitted per-SKU demand models, cached by history version and refit in parallel."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import utils
+from .demand_history import DemandHistoryStore
+from .predictive_inventory import DemandModel, fit_demand_models, history_series
+
+MODELS_FILE = "models.json"
+# Below this many stale SKUs a process pool costs more than it saves.
+PARALLEL_MIN_SKUS = 256
+CHUNKS_PER_WORKER = 4
+# Past as-of days (backfills, what-ifs) whose fits are kept in memory.
+HISTORICAL_CACHE_SIZE = 8
+
+# (history version, last day fitted as an ordinal)
+_FitKey = Tuple[int, int]
+
+
+def _fit_chunk(args: Tuple[str, Tuple[Tuple[str, int], ...]]) -> Dict[str, Optional[DemandModel]]:
+    data_dir, targets = args
+    store = DemandHistoryStore.for_data_dir(Path(data_dir))
+    series = {sku: history_series(store, sku, date.fromordinal(through)) for sku, through in targets}
+    modelled = [sku for sku, _ in targets if series[sku] is not None]
+    fitted: Dict[str, Optional[DemandModel]] = {sku: None for sku, _ in targets}
+    fitted.update(zip(modelled, fit_demand_models([series[sku] for sku in modelled])))
+    return fitted
+
+
+class ForecastModelService:
+    """Keep one fitted :class:`DemandModel` per SKU and refit only what changed.
+
+    Each SKU is fitted on its whole history and the fit is reused for as long
+    as the SKU's history version stays the same. A later as-of day only
+    advances the model (see :meth:`DemandModel.advanced`). Stale SKUs are
+    refit together, across a process pool when there are many. The
+    parameters are saved next to the history, so a restarted API starts
+    warm. An as-of day before a SKU's last recorded day cannot use that fit,
+    because it has seen the future. Those SKUs are fitted on history up to
+    that day and kept in a small in-memory cache that is never saved.
+    """
+
+    _registry: Dict[str, "ForecastModelService"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, data_dir: Path, *, workers: Optional[int] = None, persist: bool = True) -> None:
+        self.data_dir = Path(data_dir)
+        self.store = DemandHistoryStore.for_data_dir(self.data_dir)
+        self.path = self.store.directory / MODELS_FILE
+        self.workers = workers
+        self.persist = persist
+        self._lock = threading.Lock()
+        # Serialises refits so concurrent requests do not fit the same SKUs twice.
+        self._refit_lock = threading.Lock()
+        self._cache: Dict[str, Tuple[_FitKey, Optional[DemandModel]]] = {}
+        self._historical: "OrderedDict[int, Dict[str, Tuple[int, Optional[DemandModel]]]]" = OrderedDict()
+        self._loaded = False
+        self.last_refresh: Mapping[str, object] = {}
+
+    @classmethod
+    def for_data_dir(cls, data_dir: Path) -> "ForecastModelService":
+        """Return the process-wide service for ``data_dir``."""
+
+        key = str(Path(data_dir).resolve())
+        with cls._registry_lock:
+            service = cls._registry.get(key)
+            if service is None:
+                service = cls(Path(data_dir))
+                cls._registry[key] = service
+            return service
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return
+        for sku, entry in payload.get("models", {}).items():
+            if "through" not in entry:  # fitted per as-of day by an older release; refit
+                continue
+            model = entry.get("model")
+            self._cache[sku] = (
+                (int(entry["version"]), int(entry["through"])),
+                DemandModel(**{**model, "seasonals": tuple(model["seasonals"]), "params": tuple(model["params"])})
+                if model
+                else None,
+            )
+
+    def _save(self) -> None:
+        models = {
+            sku: {"version": key[0], "through": key[1], "model": asdict(model) if model else None}
+            for sku, (key, model) in self._cache.items()
+        }
+        utils.ensure_directory(self.path.parent)
+        # A scratch file per writer: API workers and CLI runs may save at the same time.
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp", delete=False
+        ) as scratch:
+            json.dump({"models": models}, scratch)
+        os.replace(scratch.name, self.path)
+
+    # ------------------------------------------------------------------
+    # Fitting
+    # ------------------------------------------------------------------
+    def _stale(self, versions: Mapping[str, int]) -> List[str]:
+        return [sku for sku, version in versions.items() if sku not in self._cache or self._cache[sku][0][0] != version]
+
+    def refresh(self, *, workers: Optional[int] = None) -> Mapping[str, object]:
+        """Refit every SKU whose history changed since its last fit."""
+
+        with self._refit_lock:
+            with self._lock:
+                self._load()
+                versions = self.store.versions()
+                stale = self._stale(versions)
+            spans = {sku: self.store.span(sku) for sku in stale}
+            targets = [(sku, span[1].toordinal()) for sku, span in spans.items() if span is not None]
+            clock = time.perf_counter()
+            fitted = self._fit(targets, workers)
+            with self._lock:
+                for sku, span in spans.items():
+                    self._cache[sku] = ((versions[sku], span[1].toordinal() if span else 0), fitted.get(sku))
+                for sku in set(self._cache) - set(versions):
+                    del self._cache[sku]
+                if stale and self.persist:
+                    self._save()
+                self.last_refresh = {
+                    "skus": len(versions),
+                    "refit": len(stale),
+                    "reused": len(versions) - len(stale),
+                    "modelled": sum(1 for _, model in self._cache.values() if model is not None),
+                    "elapsed_ms": round((time.perf_counter() - clock) * 1000.0, 1),
+                }
+                return self.last_refresh
+
+    def _fit(self, targets: Sequence[Tuple[str, int]], workers: Optional[int]) -> Dict[str, Optional[DemandModel]]:
+        if not targets:
+            return {}
+        if workers is None:
+            workers = self.workers
+        if workers is None:
+            workers = (os.cpu_count() or 1) if len(targets) >= PARALLEL_MIN_SKUS else 1
+        if workers <= 1 or len(targets) < 2:
+            return _fit_chunk((str(self.data_dir), tuple(targets)))
+        size = max(1, math.ceil(len(targets) / (workers * CHUNKS_PER_WORKER)))
+        chunks = [(str(self.data_dir), tuple(targets[index:index + size])) for index in range(0, len(targets), size)]
+        fitted: Dict[str, Optional[DemandModel]] = {}
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=utils.process_pool_context()) as pool:
+            for partial in pool.map(_fit_chunk, chunks):
+                fitted.update(partial)
+        return fitted
+
+    def _historical_models(
+        self, skus: Sequence[str], ordinal: int, versions: Mapping[str, int]
+    ) -> Dict[str, DemandModel]:
+        with self._refit_lock:
+            with self._lock:
+                cached = self._historical.get(ordinal, {})
+                stale = [sku for sku in skus if cached.get(sku, (None,))[0] != versions.get(sku)]
+            fitted = self._fit([(sku, ordinal) for sku in stale], None)
+            with self._lock:
+                entry = self._historical.setdefault(ordinal, {})
+                entry.update((sku, (versions.get(sku, 0), model)) for sku, model in fitted.items())
+                self._historical.move_to_end(ordinal)
+                while len(self._historical) > HISTORICAL_CACHE_SIZE:
+                    self._historical.popitem(last=False)
+                return {sku: entry[sku][1] for sku in skus if entry[sku][1] is not None}
+
+    def models(self, as_of: date) -> Dict[str, DemandModel]:
+        """Fitted models projected to ``as_of``; only SKUs whose history changed are refit."""
+
+        ordinal = as_of.toordinal()
+        with self._lock:
+            self._load()
+            versions = self.store.versions()
+            fresh = not self._stale(versions)
+        if not fresh:
+            self.refresh()
+        models: Dict[str, DemandModel] = {}
+        earlier: List[str] = []
+        with self._lock:
+            for sku, ((_, through), model) in self._cache.items():
+                if through > ordinal:
+                    earlier.append(sku)
+                elif model is not None:
+                    models[sku] = model.advanced(ordinal - through)
+        if earlier:
+            models.update(self._historical_models(earlier, ordinal, versions))
+        return models
+
+    def status(self) -> Mapping[str, object]:
+        with self._lock:
+            return {"cached": len(self._cache), "historical_days": len(self._historical), **self.last_refresh}
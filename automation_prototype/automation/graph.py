@@ -0,0 +1,228 @@
+"""Agent dependency graph with results memoized per as-of time and input versions."""
+from __future__ import annotations
+
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+from . import engagement, finance, ordering, payments, performance, utils, workforce
+from .datasets import dataset_version
+from .predictive_inventory import forecast_inventory
+
+NodeCompute = Callable[[Path, datetime, Mapping[str, object]], Mapping[str, object]]
+
+AGENT_NAMES = ("ordering", "payments", "workforce", "engagement", "performance", "finance")
+
+MAX_CACHED_RESULTS = 256
+
+
+@dataclass(frozen=True)
+class AgentNode:
+    """One memoizable computation: the files it reads and the nodes it consumes."""
+
+    name: str
+    compute: NodeCompute
+    datasets: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+
+
+NODES: Mapping[str, AgentNode] = {
+    node.name: node
+    for node in (
+        AgentNode(
+            "inventory_forecast",
+            lambda data_dir, as_of, _: forecast_inventory(data_dir, as_of),
+            ("patient_usage.csv", "inventory_levels.csv", "portal_orders.json", "demand_history/index.json"),
+        ),
+        AgentNode(
+            "ordering",
+            lambda data_dir, as_of, inputs: ordering.run(data_dir, as_of, forecasts=inputs["inventory_forecast"]),
+            ("patient_usage.csv", "compliance_status.csv", "inventory_levels.csv", "portal_orders.json"),
+            ("inventory_forecast",),
+        ),
+        AgentNode(
+            "payments",
+            lambda data_dir, as_of, _: payments.reconcile_claims(data_dir, as_of),
+            ("claims_ledger.csv", "payer_status.csv"),
+        ),
+        AgentNode(
+            "workforce",
+            lambda data_dir, as_of, _: workforce.forecast_staffing(data_dir, as_of),
+            ("order_pipeline.csv", "task_benchmarks.json"),
+        ),
+        AgentNode(
+            "engagement",
+            lambda data_dir, as_of, _: engagement.generate_notifications(data_dir, as_of),
+            ("patient_contacts.csv", "order_status.csv", "patient_usage.csv"),
+        ),
+        AgentNode(
+            "performance",
+            lambda data_dir, as_of, _: performance.compute_kpis(data_dir, as_of),
+            ("operational_metrics.csv", "tasks.json", "portal_orders.json"),
+        ),
+        AgentNode(
+            "finance",
+            lambda data_dir, as_of, _: finance.compute_financial_pulse(data_dir, as_of),
+            ("tasks.json", "dashboard_sample.json"),
+        ),
+    )
+}
+
+
+def _naive_utc(as_of: datetime) -> datetime:
+    if as_of.tzinfo:
+        return as_of.astimezone(timezone.utc).replace(tzinfo=None)
+    return as_of
+
+
+class AgentGraph:
+    """Evaluate agent nodes, reusing results while their inputs are unchanged.
+
+    A result is keyed by ``(node, as_of, versions)`` where ``versions`` are the
+    ``(path, mtime, size)`` signatures of every file the node reads directly
+    or through its inputs (JSON snapshots include their journal). Concurrent
+    requests for the same key share one computation.
+    """
+
+    _registry: Dict[str, "AgentGraph"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        nodes: Mapping[str, AgentNode] = NODES,
+        max_entries: int = MAX_CACHED_RESULTS,
+    ) -> None:
+        self.data_dir = Path(data_dir)
+        self.nodes = dict(nodes)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[Hashable, ...], Mapping[str, object]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[Hashable, ...], Future] = {}
+        self._closure: Dict[str, Tuple[str, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_data_dir(cls, data_dir: Path) -> "AgentGraph":
+        """Return the process-wide graph for ``data_dir``."""
+
+        key = str(Path(data_dir).resolve())
+        with cls._registry_lock:
+            graph = cls._registry.get(key)
+            if graph is None:
+                graph = cls(Path(data_dir))
+                cls._registry[key] = graph
+            return graph
+
+    def datasets(self, name: str) -> Tuple[str, ...]:
+        """Every file ``name`` depends on, directly or through its inputs."""
+
+        closure = self._closure.get(name)
+        if closure is None:
+            node = self._node(name)
+            files = set(node.datasets)
+            for dependency in node.inputs:
+                files.update(self.datasets(dependency))
+            closure = self._closure[name] = tuple(sorted(files))
+        return closure
+
+    def versions(self, name: str) -> Tuple[Hashable, ...]:
+        signatures = []
+        for filename in self.datasets(name):
+            path = self.data_dir / filename
+            signatures.append(dataset_version(path))
+            if path.suffix == ".json":
+                signatures.append(dataset_version(utils.journal_path(path)))
+        return tuple(signatures)
+
+    def get(self, name: str, as_of: datetime, *, tolerance: Optional[timedelta] = None) -> Mapping[str, object]:
+        """Return the node result for ``as_of``, computing it (and its inputs) if needed.
+
+        With ``tolerance`` a cached result for a nearby as-of time over the same
+        input versions is accepted, for callers that only need a recent answer.
+        The result is a copy, so callers may modify it without touching the cache.
+        """
+
+        return copy.deepcopy(self._get(name, as_of, tolerance))
+
+    def _get(self, name: str, as_of: datetime, tolerance: Optional[timedelta]) -> Mapping[str, object]:
+        # Returns the cached object itself; nodes only read their inputs.
+        node = self._node(name)
+        as_of = _naive_utc(as_of)
+        versions = self.versions(name)
+        key = (name, as_of, versions)
+        with self._lock:
+            cached = self._lookup(key, tolerance)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            inputs = {dependency: self._get(dependency, as_of, None) for dependency in node.inputs}
+            value = node.compute(self.data_dir, as_of, inputs)
+        except BaseException as exc:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def peek(self, name: str, as_of: datetime) -> Optional[Mapping[str, object]]:
+        """Return a cached result without computing anything."""
+
+        key = (name, _naive_utc(as_of), self.versions(name))
+        with self._lock:
+            cached = self._lookup(key, None)
+        return copy.deepcopy(cached)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _node(self, name: str) -> AgentNode:
+        node = self.nodes.get(name)
+        if node is None:
+            raise ValueError(f"Unknown agent '{name}'")
+        return node
+
+    def _lookup(
+        self, key: Tuple[Hashable, ...], tolerance: Optional[timedelta]
+    ) -> Optional[Mapping[str, object]]:
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            return value
+        if tolerance is None:
+            return None
+        name, as_of, versions = key
+        best: Optional[Tuple[timedelta, Tuple[Hashable, ...]]] = None
+        for candidate in self._cache:
+            if candidate[0] != name or candidate[2] != versions:
+                continue
+            distance = abs(candidate[1] - as_of)  # type: ignore[operator]
+            if distance <= tolerance and (best is None or distance < best[0]):
+                best = (distance, candidate)
+        if best is None:
+            return None
+        self._cache.move_to_end(best[1])
+        return self._cache[best[1]]
@@ -0,0 +1,136 @@
+"""Incremental JSON and NDJSON writers for large agent and event outputs."""
+from __future__ import annotations
+
+import json
+from typing import Callable, Iterable, Iterator, List, Mapping, TextIO, Tuple
+
+FORMATS = ("json", "compact", "ndjson")
+
+_SEPARATORS = {"json": (",", ": "), "compact": (",", ":")}
+_INDENT = {"json": 2, "compact": None}
+
+
+def _is_stream(value: object) -> bool:
+    return isinstance(value, (list, tuple)) or (
+        isinstance(value, Iterable) and not isinstance(value, (str, bytes, Mapping))
+    )
+
+
+def _resolve(value: object) -> object:
+    # Zero-argument callables are evaluated when reached, so a summary such as
+    # a count can follow the streamed list it describes.
+    return value() if callable(value) else value
+
+
+class JsonStreamWriter:
+    """Write JSON to a text handle without materialising lists or generators.
+
+    Mappings are written key by key and lists/iterators element by element;
+    each element is encoded on its own, so peak memory is one element rather
+    than the whole document. ``json`` output is byte-identical to
+    ``json.dumps(value, indent=2)``.
+    """
+
+    def __init__(self, handle: TextIO, *, format: str = "json") -> None:
+        if format not in _SEPARATORS:
+            raise ValueError(f"Unknown JSON stream format '{format}'")
+        self.handle = handle
+        self.indent = _INDENT[format]
+        self.separators = _SEPARATORS[format]
+
+    def write(self, value: object) -> None:
+        self._write(_resolve(value), 0)
+
+    def _newline(self, depth: int) -> str:
+        return "" if self.indent is None else "\n" + " " * (self.indent * depth)
+
+    def _dump(self, value: object, depth: int) -> str:
+        text = json.dumps(value, indent=self.indent, separators=self.separators)
+        if self.indent is None or depth == 0:
+            return text
+        return text.replace("\n", self._newline(depth))
+
+    def _write(self, value: object, depth: int) -> None:
+        write = self.handle.write
+        item_separator, key_separator = self.separators
+        if isinstance(value, Mapping):
+            opened = False
+            for key, item in value.items():
+                write(("{" if not opened else item_separator) + self._newline(depth + 1))
+                write(json.dumps(str(key) if not isinstance(key, str) else key) + key_separator)
+                self._write(_resolve(item), depth + 1)
+                opened = True
+            write(self._newline(depth) + "}" if opened else "{}")
+        elif _is_stream(value):
+            opened = False
+            for item in value:  # type: ignore[union-attr]
+                write(("[" if not opened else item_separator) + self._newline(depth + 1))
+                write(self._dump(item, depth + 1))
+                opened = True
+            write(self._newline(depth) + "]" if opened else "[]")
+        else:
+            write(self._dump(value, depth))
+
+
+# ----------------------------------------------------------------------
+# NDJSON
+# ----------------------------------------------------------------------
+def iter_records(value: object, path: Tuple[str, ...] = ()) -> Iterator[Mapping[str, object]]:
+    """Flatten ``value`` into NDJSON records.
+
+    A top-level list yields its elements unchanged. Inside mappings every list
+    element becomes ``{"path": "a.b", "record": element}``; the scalar fields
+    of each mapping follow as one record for that path, after its lists so
+    deferred summaries are complete.
+    """
+
+    value = _resolve(value)
+    if _is_stream(value):
+        for item in value:  # type: ignore[union-attr]
+            yield {"path": ".".join(path), "record": item} if path else item
+        return
+    if not isinstance(value, Mapping):
+        yield {"path": ".".join(path), "record": value} if path else {"value": value}
+        return
+    scalars: List[Tuple[str, object]] = []
+    for key, item in value.items():
+        if isinstance(item, Mapping) or _is_stream(item):
+            yield from iter_records(item, path + (str(key),))
+        else:
+            scalars.append((str(key), item))
+    if scalars:
+        fields = {key: _resolve(item) for key, item in scalars}
+        yield {"path": ".".join(path), "record": fields} if path else fields
+
+
+def write_ndjson(value: object, handle: TextIO) -> int:
+    """Write one compact JSON document per line; returns the number of lines."""
+
+    count = 0
+    for record in iter_records(value):
+        handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+def write(value: object, handle: TextIO, *, format: str = "json") -> None:
+    """Stream ``value`` to ``handle`` in one of :data:`FORMATS`."""
+
+    if format == "ndjson":
+        write_ndjson(value, handle)
+        return
+    JsonStreamWriter(handle, format=format).write(value)
+    handle.write("\n")
+
+
+def counted(items: Iterable[object]) -> Tuple[Iterator[object], Callable[[], int]]:
+    """Wrap ``items`` so the number yielded can be written after the list."""
+
+    total = [0]
+
+    def _iterate() -> Iterator[object]:
+        for item in items:
+            total[0] += 1
+            yield item
+
+    return _iterate(), lambda: total[0]
@@ -0,0 +1,177 @@
+"""Hash-indexed patient/SKU lookups for assessing single portal orders."""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from .utils import parse_date
+
+_READ_CHUNK = 1 << 20
+
+
+class _TableIndex:
+    """One CSV file indexed by ``key_columns``, kept in step with the file.
+
+    Each refresh stats the file. If it grew and the bytes already indexed
+    are unchanged (checked against a digest of that prefix), only the
+    appended rows are parsed. Any other change triggers a full rebuild.
+    ``keep_first`` decides which duplicate key wins.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        key_columns: Tuple[str, ...],
+        *,
+        keep_first: bool = False,
+        date_columns: Tuple[str, ...] = (),
+    ) -> None:
+        self.path = path
+        self.key_columns = key_columns
+        self.keep_first = keep_first
+        self.date_columns = date_columns
+        self.lock = threading.Lock()
+        self.rows: Dict[Tuple[str, ...], Mapping[str, object]] = {}
+        self.header: Tuple[str, ...] = ()
+        self.signature: Optional[Tuple[int, int]] = None
+        self.offset = 0
+        self.digest = b""
+        # False when the indexed bytes stop mid-line, so an append cannot be parsed on its own.
+        self.line_complete = True
+        self.rebuilds = 0
+        self.appends = 0
+
+    def refresh(self) -> None:
+        stat = self.path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return
+        with self.path.open("rb") as handle:
+            hasher = hashlib.blake2b()
+            appended = False
+            if self.signature is not None and self.line_complete and stat.st_size >= self.offset:
+                remaining = self.offset
+                while remaining:
+                    chunk = handle.read(min(remaining, _READ_CHUNK))
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    remaining -= len(chunk)
+                appended = not remaining and hasher.digest() == self.digest
+            if appended:
+                self.appends += 1
+            else:
+                handle.seek(0)
+                hasher = hashlib.blake2b()
+                self.rows, self.header, self.offset = {}, (), 0
+                self.rebuilds += 1
+            data = handle.read()
+        hasher.update(data)
+        self._index(data)
+        self.offset += len(data)
+        self.digest = hasher.digest()
+        self.line_complete = data.endswith(b"\n") if data else True
+        self.signature = signature
+
+    def _index(self, data: bytes) -> None:
+        reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+        if not self.header:
+            self.header = tuple(next(reader, None) or ())
+        header, width = self.header, len(self.header)
+        dates = [name for name in self.date_columns if name in header]
+        parsed: Dict[str, object] = {}
+        for row in reader:
+            if not row or not width:
+                continue
+            if len(row) < width:
+                row = row + [None] * (width - len(row))
+            # Later duplicate headers win, as with csv.DictReader.
+            record: Dict[str, object] = dict(zip(header, row))
+            for name in dates:
+                value = record[name]
+                if value:
+                    if value not in parsed:
+                        parsed[value] = parse_date(str(value))
+                    record[name] = parsed[value]
+            key = tuple(record.get(name) for name in self.key_columns)
+            if self.keep_first and key in self.rows:
+                continue
+            self.rows[key] = MappingProxyType(record)  # type: ignore[index]
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Mapping[str, object]]:
+        with self.lock:
+            self.refresh()
+            return self.rows.get(key)
+
+    def status(self) -> Mapping[str, object]:
+        with self.lock:
+            return {"rows": len(self.rows), "bytes": self.offset, "rebuilds": self.rebuilds, "appends": self.appends}
+
+
+class OrderLookupService:
+    """Usage, compliance and inventory rows keyed for O(1) order assessment.
+
+    Usage and compliance are keyed on ``(patient_id, supply_sku)``; inventory
+    on ``supply_sku``. Every lookup first checks its file's mtime and size,
+    so edits are picked up on the next request. Appends cost only the new
+    rows.
+    """
+
+    _registry: Dict[str, "OrderLookupService"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, data_dir: Path) -> None:
+        self.data_dir = Path(data_dir)
+        # assess_portal_order has always taken the first usage row but the last compliance/inventory row.
+        self._usage = _TableIndex(
+            self.data_dir / "patient_usage.csv",
+            ("patient_id", "supply_sku"),
+            keep_first=True,
+            date_columns=("last_fulfillment_date",),
+        )
+        self._compliance = _TableIndex(
+            self.data_dir / "compliance_status.csv",
+            ("patient_id", "supply_sku"),
+            date_columns=("next_due_date",),
+        )
+        self._inventory = _TableIndex(self.data_dir / "inventory_levels.csv", ("supply_sku",))
+
+    @classmethod
+    def for_data_dir(cls, data_dir: Path) -> "OrderLookupService":
+        """Return the process-wide service for ``data_dir``."""
+
+        key = str(Path(data_dir).resolve())
+        with cls._registry_lock:
+            service = cls._registry.get(key)
+            if service is None:
+                service = cls(Path(data_dir))
+                cls._registry[key] = service
+            return service
+
+    def usage(self, patient_id: str, supply_sku: str) -> Optional[Mapping[str, object]]:
+        return self._usage.get((patient_id, supply_sku))
+
+    def compliance(self, patient_id: str, supply_sku: str) -> Optional[Mapping[str, object]]:
+        return self._compliance.get((patient_id, supply_sku))
+
+    def inventory(self, supply_sku: str) -> Optional[Mapping[str, object]]:
+        return self._inventory.get((supply_sku,))
+
+    def refresh(self) -> None:
+        """Bring every index up to date, e.g. at startup before the first order."""
+
+        for table in (self._usage, self._compliance, self._inventory):
+            with table.lock:
+                table.refresh()
+
+    def status(self) -> Mapping[str, Mapping[str, object]]:
+        return {
+            "patient_usage": self._usage.status(),
+            "compliance_status": self._compliance.status(),
+            "inventory_levels": self._inventory.status(),
+        }
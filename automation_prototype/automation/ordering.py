@@ -1,16 +1,21 @@
 """Automated ordering & reordering prototype."""
 from __future__ import annotations
 
-import json
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
-from . import utils
+from . import datasets, utils
+from .order_lookup import OrderLookupService
 from .predictive_inventory import forecast_inventory
 
+try:  # NumPy powers the vectorized work-order engine; the Python engine needs nothing extra.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
 PATIENT_REORDER_THRESHOLD_DAYS = 7
 DEFAULT_SUPPLY_DAYS = 30
 
@@ -43,7 +48,36 @@ def _to_int(value: object, default: int = 0) -> int:
         return default
 
 
-def generate_patient_work_orders(data_dir: Path, as_of: datetime) -> Tuple[List[utils.WorkOrder], List[utils.Alert]]:
+WORK_ORDER_ENGINES = {"auto", "python", "numpy"}
+
+
+def generate_patient_work_orders(
+    data_dir: Path,
+    as_of: datetime,
+    *,
+    engine: str = "auto",
+) -> Tuple[List[utils.WorkOrder], List[utils.Alert]]:
+    """Build patient resupply work orders and compliance alerts.
+
+    ``engine="numpy"`` applies the threshold, quantity, compliance and inventory
+    checks as column operations and only materializes qualifying rows;
+    ``engine="python"`` walks every row. ``"auto"`` picks NumPy when available.
+    Both engines return identical results.
+    """
+    if engine not in WORK_ORDER_ENGINES:
+        raise ValueError(f"Unknown work order engine '{engine}'")
+    if engine == "numpy" and np is None:
+        raise RuntimeError("The numpy work order engine requires numpy to be installed")
+    # Aware as_of values cannot be compared with the naive CSV dates in datetime64 space.
+    if engine != "python" and np is not None and as_of.tzinfo is None:
+        return _generate_patient_work_orders_numpy(data_dir, as_of)
+    return _generate_patient_work_orders_python(data_dir, as_of)
+
+
+def _generate_patient_work_orders_python(
+    data_dir: Path,
+    as_of: datetime,
+) -> Tuple[List[utils.WorkOrder], List[utils.Alert]]:
     usage_rows = utils.load_csv(data_dir / "patient_usage.csv", parse_dates=["last_fulfillment_date"])
     compliance_rows = utils.load_csv(data_dir / "compliance_status.csv", parse_dates=["next_due_date"])
     inventory_rows = utils.load_csv(data_dir / "inventory_levels.csv")
@@ -121,10 +155,140 @@ def generate_patient_work_orders(data_dir: Path, as_of: datetime) -> Tuple[List[
     return work_orders, alerts
 
 
+def _generate_patient_work_orders_numpy(
+    data_dir: Path,
+    as_of: datetime,
+) -> Tuple[List[utils.WorkOrder], List[utils.Alert]]:
+    usage = datasets.load_dataset(data_dir / "patient_usage.csv")
+    compliance = datasets.load_dataset(data_dir / "compliance_status.csv")
+    inventory = datasets.load_dataset(data_dir / "inventory_levels.csv")
+
+    days_remaining = np.asarray(usage.float_column("days_supply_remaining"), dtype=float)
+    # ``~(x > t)`` rather than ``x <= t`` so NaN rows qualify, as in the row-wise engine.
+    selected = np.flatnonzero(~(days_remaining > PATIENT_REORDER_THRESHOLD_DAYS))
+    if not selected.size:
+        return [], []
+
+    avg_daily_use = np.asarray(usage.float_column("avg_daily_use"), dtype=float)[selected]
+    standard_quantity = np.maximum(np.trunc(avg_daily_use * DEFAULT_SUPPLY_DAYS), 1)
+    patient_column = usage.column("patient_id")
+    sku_column = usage.column("supply_sku")
+    patient_ids = [patient_column[index] for index in selected.tolist()]
+    skus = [sku_column[index] for index in selected.tolist()]
+    depletion_dates = [as_of + timedelta(days=days) for days in days_remaining[selected].tolist()]
+
+    compliance_index = _last_index_lookup(
+        _composite_keys(compliance.column("patient_id"), compliance.column("supply_sku")),
+        _composite_keys(patient_ids, skus),
+    )
+    has_compliance = compliance_index >= 0
+    row = np.where(has_compliance, compliance_index, 0)
+    if len(compliance):
+        f2f_status = np.asarray(compliance.column("f2f_status"), dtype=object)
+        wopd_status = np.asarray(compliance.column("wopd_status"), dtype=object)
+        prior_auth = np.asarray(compliance.column("prior_auth_status"), dtype=object)
+        due_dates = np.array(
+            [value if isinstance(value, datetime) else None for value in compliance.column("next_due_date", parse_dates=True)],
+            dtype="datetime64[us]",
+        )
+        f2f_expired = has_compliance & (f2f_status != "current")[row]
+        wopd_missing = has_compliance & (wopd_status != "on_file")[row]
+        prior_auth_pending = has_compliance & ((prior_auth != "approved") & (prior_auth != "not_required"))[row]
+        due_before = has_compliance & (due_dates[row] <= np.array(depletion_dates, dtype="datetime64[us]"))
+    else:
+        f2f_expired = wopd_missing = prior_auth_pending = due_before = np.zeros(selected.size, dtype=bool)
+    on_hold = f2f_expired | wopd_missing | prior_auth_pending | due_before
+
+    inventory_index = _last_index_lookup(_string_keys(inventory.column("supply_sku")), _string_keys(skus))
+    has_inventory = inventory_index >= 0
+    on_hand_units = np.array([_to_int(value) for value in inventory.column("on_hand_units")] or [0], dtype=np.int64)
+    on_hand = on_hand_units[np.where(has_inventory, inventory_index, 0)]
+    low_inventory = has_inventory & (on_hand < standard_quantity)
+
+    work_orders: List[utils.WorkOrder] = []
+    alerts: List[utils.Alert] = []
+    flags = zip(
+        has_compliance.tolist(),
+        f2f_expired.tolist(),
+        wopd_missing.tolist(),
+        prior_auth_pending.tolist(),
+        due_before.tolist(),
+        on_hold.tolist(),
+        has_inventory.tolist(),
+        low_inventory.tolist(),
+        on_hand.tolist(),
+    )
+    for position, (known, f2f, wopd, auth, due, hold, stocked, low, units) in enumerate(flags):
+        notes: List[str] = []
+        if not known:
+            compliance_status = "unknown"
+            notes.append("No compliance record")
+        elif hold:
+            compliance_status = "hold"
+            if f2f:
+                notes.append("F2F expired")
+            if wopd:
+                notes.append("WOPD missing")
+            if auth:
+                notes.append("Prior auth pending")
+            if due:
+                notes.append("Compliance due before fulfillment")
+        else:
+            compliance_status = "clear"
+        if not stocked:
+            notes.append("SKU missing from inventory table")
+        elif low:
+            notes.append(f"Low warehouse inventory ({units})")
+
+        patient_id = patient_ids[position]
+        sku = skus[position]
+        joined = "; ".join(notes) if notes else ""
+        work_orders.append(
+            utils.WorkOrder(
+                patient_id=patient_id,
+                supply_sku=sku,
+                required_date=depletion_dates[position],
+                quantity=max(int(avg_daily_use[position] * DEFAULT_SUPPLY_DAYS), 1),
+                compliance_status=compliance_status,
+                notes=joined,
+            )
+        )
+        if compliance_status != "clear":
+            alerts.append(
+                utils.Alert(
+                    severity="high" if compliance_status == "hold" else "medium",
+                    message=f"Compliance issue for patient {patient_id} / {sku}",
+                    metadata={"notes": joined},
+                )
+            )
+
+    return work_orders, alerts
+
+
+def _string_keys(values: Sequence[object]) -> "np.ndarray":
+    return np.array(["" if value is None else str(value) for value in values], dtype=str)
+
+
+def _composite_keys(patients: Sequence[object], skus: Sequence[object]) -> "np.ndarray":
+    return np.char.add(np.char.add(_string_keys(patients), "\x1f"), _string_keys(skus))
+
+
+def _last_index_lookup(keys: "np.ndarray", probes: "np.ndarray") -> "np.ndarray":
+    """Return, per probe, the index of the last equal key (dict semantics) or -1."""
+    if not keys.size or not probes.size:
+        return np.full(probes.size, -1, dtype=np.int64)
+    unique_keys, first_in_reversed = np.unique(keys[::-1], return_index=True)
+    last_index = keys.size - 1 - first_in_reversed
+    positions = np.minimum(np.searchsorted(unique_keys, probes), unique_keys.size - 1)
+    return np.where(unique_keys[positions] == probes, last_index[positions], -1)
+
+
 def recommend_inventory_reorders(
     data_dir: Path,
     as_of: datetime,
     growth_adjustment: float = 0.0,
+    *,
+    forecasts: Optional[Mapping[str, Mapping[str, object]]] = None,
 ) -> List[InventoryRecommendation]:
     inventory_rows = utils.load_csv(data_dir / "inventory_levels.csv")
     usage_rows = utils.load_csv(data_dir / "patient_usage.csv")
@@ -135,7 +299,8 @@ def recommend_inventory_reorders(
         avg_daily_use = _to_float(row.get("avg_daily_use"))
         demand_by_sku[sku] += avg_daily_use * DEFAULT_SUPPLY_DAYS
 
-    forecasts = forecast_inventory(data_dir, as_of, growth_adjustment=growth_adjustment)
+    if forecasts is None:
+        forecasts = forecast_inventory(data_dir, as_of, growth_adjustment=growth_adjustment)
     recommendations: List[InventoryRecommendation] = []
     for row in inventory_rows:
         sku = row["supply_sku"]
@@ -166,10 +331,17 @@ def recommend_inventory_reorders(
     return recommendations
 
 
-def run(data_dir: Path, as_of: datetime) -> Dict[str, Iterable[Dict[str, str]]]:
+def run(
+    data_dir: Path,
+    as_of: datetime,
+    *,
+    forecasts: Optional[Mapping[str, Mapping[str, object]]] = None,
+) -> Dict[str, Iterable[Dict[str, str]]]:
+    """Run the ordering agent; pass ``forecasts`` to reuse an inventory forecast for ``as_of``."""
+
     work_orders, alerts = generate_patient_work_orders(data_dir, as_of)
     portal_orders = _load_portal_orders(data_dir)
-    vendor_orders = recommend_inventory_reorders(data_dir, as_of)
+    vendor_orders = recommend_inventory_reorders(data_dir, as_of, forecasts=forecasts)
 
     for order in portal_orders:
         compliance_status = order.get("ai_compliance_status") or order.get("compliance_status") or "unknown"
@@ -215,27 +387,19 @@ def assess_portal_order(
     requested_date: Optional[str],
     as_of: datetime,
 ) -> Mapping[str, object]:
-    usage_rows = utils.load_csv(data_dir / "patient_usage.csv", parse_dates=["last_fulfillment_date"])
-    compliance_rows = utils.load_csv(data_dir / "compliance_status.csv", parse_dates=["next_due_date"])
-    inventory_rows = utils.load_csv(data_dir / "inventory_levels.csv")
-
-    compliance_lookup = {
-        (row["patient_id"], row["supply_sku"]): row for row in compliance_rows
-    }
-    inventory_lookup = {row["supply_sku"]: row for row in inventory_rows}
+    lookup = OrderLookupService.for_data_dir(data_dir)
 
     recommended_quantity = max(int(quantity or 0), 1)
-    for row in usage_rows:
-        if row["patient_id"] == patient_id and row["supply_sku"] == supply_sku:
-            avg_daily_use = _to_float(row.get("avg_daily_use"))
-            if avg_daily_use:
-                recommended_quantity = max(int(avg_daily_use * DEFAULT_SUPPLY_DAYS), 1)
-            break
+    usage_row = lookup.usage(patient_id, supply_sku)
+    if usage_row:
+        avg_daily_use = _to_float(usage_row.get("avg_daily_use"))
+        if avg_daily_use:
+            recommended_quantity = max(int(avg_daily_use * DEFAULT_SUPPLY_DAYS), 1)
 
     notes: List[str] = []
     compliance_status = "clear"
 
-    compliance_row = compliance_lookup.get((patient_id, supply_sku))
+    compliance_row = lookup.compliance(patient_id, supply_sku)
     if not compliance_row:
         compliance_status = "unknown"
         notes.append("No compliance record on file.")
@@ -250,6 +414,9 @@ def assess_portal_order(
             issues.append("Prior auth pending")
         due_date = compliance_row.get("next_due_date")
         requested_dt = _safe_parse_date(requested_date)
+        if as_of.tzinfo is not None:
+            # CSV due dates are naive UTC; comparing them with an aware as_of raises TypeError.
+            as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
         compare_date = requested_dt or (as_of + timedelta(days=2))
         if isinstance(due_date, datetime) and due_date <= compare_date:
             issues.append("Compliance due before requested ship date")
@@ -258,7 +425,7 @@ def assess_portal_order(
             notes.extend(issues)
 
     recommended_fulfillment = "warehouse"
-    inventory_row = inventory_lookup.get(supply_sku)
+    inventory_row = lookup.inventory(supply_sku)
     if inventory_row:
         on_hand = _to_int(inventory_row.get("on_hand_units"))
         if on_hand < recommended_quantity:
@@ -280,14 +447,7 @@ def assess_portal_order(
 
 
 def _load_portal_orders(data_dir: Path) -> List[Mapping[str, object]]:
-    path = data_dir / "portal_orders.json"
-    if not path.exists():
-        return []
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return []
-    orders = payload.get("orders", []) if isinstance(payload, dict) else payload
+    orders = utils.load_journaled_records(data_dir / "portal_orders.json", "orders")
     return [order for order in orders if order.get("status") not in {"cancelled", "void"}]
 
 
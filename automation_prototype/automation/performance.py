@@ -1,7 +1,6 @@
 """Performance tracking prototype."""
 from __future__ import annotations
 
-import json
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Iterable, List, Mapping
@@ -127,27 +126,12 @@ def _apply_time_savings(snapshot: Dict[str, str], data_dir: Path) -> None:
 
 
 def _load_portal_orders(data_dir: Path) -> List[Mapping[str, object]]:
-    path = data_dir / PORTAL_DATA_FILE
-    if not path.exists():
-        return []
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return []
-    orders = payload.get("orders", []) if isinstance(payload, dict) else payload
+    orders = utils.load_journaled_records(data_dir / PORTAL_DATA_FILE, "orders")
     return [order for order in orders if order.get("source") == "portal"]
 
 
 def _load_tasks(data_dir: Path) -> List[Mapping[str, object]]:
-    path = data_dir / "tasks.json"
-    if not path.exists():
-        return []
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return []
-    tasks = payload.get("tasks", []) if isinstance(payload, dict) else payload
-    return tasks
+    return utils.load_journaled_records(data_dir / "tasks.json", "tasks")
 
 
 def _parse_datetime(value: object | None) -> datetime | None:
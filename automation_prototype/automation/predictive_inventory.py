@@ -1,19 +1,39 @@
 """Predictive inventory forecasting utilities."""
 from __future__ import annotations
 
-import json
+import itertools
 from collections import defaultdict
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 from . import utils
+from .demand_history import DemandHistoryStore
+
+try:  # NumPy evaluates scenario grids as arrays; without it each scenario runs in Python.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
 
 SMOOTHING_ALPHA = 0.6
 DEFAULT_LEAD_TIME_DAYS = 14
 DEFAULT_DAYS = 30
 
+# Daily-history models (see automation.demand_history).
+HISTORY_WINDOW_DAYS = 364
+SEASON_LENGTH = 7
+MIN_HISTORY_DAYS = 28
+MIN_DEMAND_DAYS = 8
+HOLT_ALPHA = 0.3
+HOLT_BETA = 0.05
+HOLT_GAMMA = 0.2
+FIT_ALPHAS = (0.1, 0.3, 0.5, 0.7)
+FIT_BETAS = (0.01, 0.05, 0.15)
+FIT_GAMMAS = (0.05, 0.2, 0.4)
+# Monte-Carlo fields compared in scenario deltas, with their rounding.
+SIMULATED_FIELDS = {"safety_stock": 2, "stockout_probability": 4}
+
 
 @dataclass
 class InventoryForecast:
@@ -41,22 +61,238 @@ def _exponential_smoothing(series: Iterable[float], alpha: float) -> float:
     return forecast
 
 
-def forecast_inventory(
-    data_dir: Path,
-    as_of: datetime,
+@dataclass(frozen=True)
+class DemandModel:
+    """Fitted level/trend/season state; ``seasonals[0]`` applies to the first forecast day."""
+
+    method: str
+    level: float
+    trend: float = 0.0
+    seasonals: Tuple[float, ...] = ()
+    params: Tuple[float, ...] = ()
+    sse: float = 0.0
+    observations: int = 0
+
+    @property
+    def rmse(self) -> float:
+        """One-step-ahead error of the fit, in units per day."""
+
+        return (self.sse / self.observations) ** 0.5 if self.observations else 0.0
+
+    @property
+    def seasonal_prefix(self) -> Tuple[float, ...]:
+        return tuple(itertools.accumulate(self.seasonals, initial=0.0))
+
+    def advanced(self, days: int) -> "DemandModel":
+        """The model projected ``days`` days past its last observation, without new data."""
+
+        if days <= 0:
+            return self
+        shift = days % len(self.seasonals) if self.seasonals else 0
+        return replace(
+            self,
+            level=self.level + days * self.trend,
+            seasonals=self.seasonals[shift:] + self.seasonals[:shift],
+        )
+
+    def horizon_demand(self, days: int) -> float:
+        """Total units forecast over the next ``days`` days."""
+
+        prefix = self.seasonal_prefix
+        seasonal = 0.0
+        if self.seasonals:
+            full, partial = divmod(days, len(self.seasonals))
+            seasonal = full * prefix[-1] + prefix[partial]
+        return max(days * self.level + self.trend * days * (days + 1) / 2 + seasonal, 0.0)
+
+
+def holt(series: Sequence[float], *, alpha: float = HOLT_ALPHA, beta: float = HOLT_BETA) -> DemandModel:
+    """Holt's linear (level + trend) exponential smoothing."""
+
+    level = float(series[0]) if series else 0.0
+    trend = float(series[1] - series[0]) if len(series) > 1 else 0.0
+    sse = 0.0
+    for value in series[1:]:
+        previous = level
+        sse += (value - level - trend) ** 2
+        level = alpha * value + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+    return DemandModel("holt", level, trend, params=(alpha, beta), sse=sse, observations=max(len(series) - 1, 0))
+
+
+def holt_winters(
+    series: Sequence[float],
+    season_length: int = SEASON_LENGTH,
     *,
-    growth_adjustment: float = 0.0,
-    lead_time_days: int = DEFAULT_LEAD_TIME_DAYS,
-) -> Dict[str, Mapping[str, float | str]]:
+    alpha: float = HOLT_ALPHA,
+    beta: float = HOLT_BETA,
+    gamma: float = HOLT_GAMMA,
+) -> DemandModel:
+    """Additive Holt-Winters; needs at least two full seasons of history."""
+
+    m = season_length
+    if len(series) < 2 * m:
+        raise ValueError(f"Holt-Winters needs {2 * m} observations, got {len(series)}")
+    first = sum(series[:m]) / m
+    second = sum(series[m:2 * m]) / m
+    level, trend = first, (second - first) / m
+    seasonals = [float(value) - first for value in series[:m]]
+    sse = 0.0
+    for index, value in enumerate(series):
+        slot = index % m
+        previous_level, previous_season = level, seasonals[slot]
+        if index >= m:
+            sse += (value - level - trend - previous_season) ** 2
+        level = alpha * (value - previous_season) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonals[slot] = gamma * (value - level) + (1 - gamma) * previous_season
+    start = len(series) % m
+    return DemandModel(
+        "holt_winters",
+        level,
+        trend,
+        tuple(seasonals[start:] + seasonals[:start]),
+        params=(alpha, beta, gamma),
+        sse=sse,
+        observations=len(series) - m,
+    )
+
+
+def fit_demand_model(series: Sequence[float]) -> DemandModel:
+    """Pick smoothing parameters by one-step-ahead squared error over a small grid.
+
+    Holt-Winters (weekly season) once there are 8 weeks of history, Holt before.
+    """
+
+    if len(series) >= 8 * SEASON_LENGTH:
+        candidates = (
+            holt_winters(series, alpha=alpha, beta=beta, gamma=gamma)
+            for alpha, beta, gamma in itertools.product(FIT_ALPHAS, FIT_BETAS, FIT_GAMMAS)
+        )
+    else:
+        candidates = (holt(series, alpha=alpha, beta=beta) for alpha, beta in itertools.product(FIT_ALPHAS, FIT_BETAS))
+    return min(candidates, key=lambda model: model.sse)
+
+
+def _fit_group_numpy(series: Sequence[Sequence[float]]) -> List[DemandModel]:
+    """:func:`fit_demand_model` for equal-length series, every SKU and grid point at once."""
+
+    values = np.array(series, dtype=float)
+    count, length = values.shape
+    seasonal = length >= 8 * SEASON_LENGTH
+    grid = list(itertools.product(FIT_ALPHAS, FIT_BETAS, FIT_GAMMAS) if seasonal else itertools.product(FIT_ALPHAS, FIT_BETAS))
+    alpha = np.array([point[0] for point in grid])[None, :]
+    beta = np.array([point[1] for point in grid])[None, :]
+    sse = np.zeros((count, len(grid)))
+    if seasonal:
+        m = SEASON_LENGTH
+        gamma = np.array([point[2] for point in grid])[None, :]
+        first, second = np.zeros(count), np.zeros(count)
+        for column in range(m):
+            first = first + values[:, column]
+            second = second + values[:, m + column]
+        first, second = first / m, second / m
+        level = np.repeat(first[:, None], len(grid), axis=1)
+        trend = np.repeat(((second - first) / m)[:, None], len(grid), axis=1)
+        seasonals = np.repeat((values[:, :m] - first[:, None])[:, None, :], len(grid), axis=1)
+        for index in range(length):
+            slot = index % m
+            value = values[:, index][:, None]
+            previous_level, previous_season = level, seasonals[:, :, slot]
+            if index >= m:
+                sse = sse + (value - level - trend - previous_season) ** 2
+            level = alpha * (value - previous_season) + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous_level) + (1 - beta) * trend
+            seasonals[:, :, slot] = gamma * (value - level) + (1 - gamma) * previous_season
+        seasonals = np.roll(seasonals, -(length % m), axis=2)
+    else:
+        level = np.repeat(values[:, :1], len(grid), axis=1)
+        trend = np.repeat((values[:, 1:2] - values[:, :1]) if length > 1 else np.zeros((count, 1)), len(grid), axis=1)
+        for index in range(1, length):
+            value = values[:, index][:, None]
+            previous = level
+            sse = sse + (value - level - trend) ** 2
+            level = alpha * value + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous) + (1 - beta) * trend
+    best = np.argmin(sse, axis=1)
+    models = []
+    for row, point in enumerate(best.tolist()):
+        models.append(
+            DemandModel(
+                "holt_winters" if seasonal else "holt",
+                float(level[row, point]),
+                float(trend[row, point]),
+                tuple(seasonals[row, point].tolist()) if seasonal else (),
+                params=tuple(grid[point]),
+                sse=float(sse[row, point]),
+                observations=length - SEASON_LENGTH if seasonal else length - 1,
+            )
+        )
+    return models
+
+
+def fit_demand_models(series: Sequence[Sequence[float]]) -> List[DemandModel]:
+    """Fit many SKUs; with NumPy, SKUs of equal history length share one array pass."""
+
+    if np is None:
+        return [fit_demand_model(values) for values in series]
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for position, values in enumerate(series):
+        groups[len(values)].append(position)
+    models: List[Optional[DemandModel]] = [None] * len(series)
+    for length, positions in groups.items():
+        if length < 2:
+            fitted = [fit_demand_model(series[position]) for position in positions]
+        else:
+            fitted = _fit_group_numpy([series[position] for position in positions])
+        for position, model in zip(positions, fitted):
+            models[position] = model
+    return models  # type: ignore[return-value]
+
+
+def history_series(store: DemandHistoryStore, sku: str, as_of: date) -> Optional[Sequence[float]]:
+    """Daily demand up to ``as_of``, or ``None`` when there is too little to model."""
+
+    span = store.span(sku)
+    if span is None or span[0] > as_of:
+        return None
+    days = min((as_of - span[0]).days + 1, HISTORY_WINDOW_DAYS)
+    if days < MIN_HISTORY_DAYS:
+        return None
+    series = store.window(sku, as_of, days)
+    if sum(1 for value in series if value) < MIN_DEMAND_DAYS:
+        return None
+    return series
+
+
+def history_model(store: DemandHistoryStore, sku: str, as_of: date) -> Optional[DemandModel]:
+    """Fit the daily history of ``sku`` up to ``as_of`` (``None`` when too short)."""
+
+    series = history_series(store, sku, as_of)
+    return fit_demand_model(series) if series is not None else None
+
+
+@dataclass
+class InventoryInputs:
+    """Per-SKU demand history and inventory metadata, parsed once for any number of forecasts."""
+
+    skus: List[str]
+    history: List[List[float]]
+    inventory: Mapping[str, Mapping[str, object]]
+    models: Mapping[str, DemandModel] = field(default_factory=dict)
+
+    def smoothed(self) -> List[float]:
+        return [_exponential_smoothing(series, SMOOTHING_ALPHA) for series in self.history]
+
+
+def load_inventory_inputs(data_dir: Path, as_of: datetime) -> InventoryInputs:
+    """Read usage, inventory levels and recent portal orders into per-SKU series."""
+
     if as_of.tzinfo:
         as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
     usage_rows = utils.load_csv(data_dir / "patient_usage.csv")
     inventory_rows = utils.load_csv(data_dir / "inventory_levels.csv")
-    portal_path = data_dir / "portal_orders.json"
-    try:
-        portal_rows = json.loads(portal_path.read_text(encoding='utf-8')).get('orders', []) if portal_path.exists() else []
-    except json.JSONDecodeError:
-        portal_rows = []
+    portal_rows = utils.load_journaled_records(data_dir / "portal_orders.json", "orders")
 
     usage_by_sku: Dict[str, List[float]] = defaultdict(list)
     inventory_index: Dict[str, Mapping[str, object]] = {}
@@ -95,47 +331,196 @@ def forecast_inventory(
             except ValueError:
                 usage_by_sku[str(sku)].append(0.0)
 
+    # SKUs with enough daily history are forecast from their fitted models;
+    # the rest keep the smoothed usage rates above.
+    from .forecast_models import ForecastModelService
+
+    models = ForecastModelService.for_data_dir(data_dir).models(as_of.date())
+    for sku in models:
+        usage_by_sku.setdefault(sku, [])
+
+    return InventoryInputs(
+        skus=list(usage_by_sku),
+        history=list(usage_by_sku.values()),
+        inventory=inventory_index,
+        models=models,
+    )
+
+
+def _meta_float(meta: Mapping[str, object], name: str) -> float:
+    try:
+        return float(meta.get(name, 0) or 0)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _lead_time_override(meta: Mapping[str, object]) -> Optional[int]:
+    """The SKU's own lead time, or ``None`` when the scenario default applies."""
+
+    value = meta.get("lead_time_days")
+    if not value:
+        return None
+    try:
+        return int(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+def _forecast_entry(
+    sku: str,
+    horizon_demand: float,
+    buffer: float,
+    sku_lead_time: int,
+    meta: Mapping[str, object],
+    method: str,
+) -> Mapping[str, float | str]:
+    on_hand = _meta_float(meta, "on_hand_units")
+    reorder_point = _meta_float(meta, "reorder_point_units")
+    if on_hand < horizon_demand:
+        action = "reorder"
+    elif on_hand < reorder_point:
+        action = "watch"
+    else:
+        action = "buffer_ok"
+    return InventoryForecast(
+        supply_sku=sku,
+        forecast_units=horizon_demand,
+        recommended_buffer=buffer,
+    ).to_dict() | {
+        "on_hand": round(on_hand, 2),
+        "reorder_point": round(reorder_point, 2),
+        "lead_time_days": sku_lead_time,
+        "vendor": str(meta.get("vendor") or ""),
+        "action": action,
+        "model": method,
+    }
+
+
+def forecast_inventory(
+    data_dir: Path,
+    as_of: datetime,
+    *,
+    growth_adjustment: float = 0.0,
+    lead_time_days: int = DEFAULT_LEAD_TIME_DAYS,
+    inputs: Optional[InventoryInputs] = None,
+) -> Dict[str, Mapping[str, float | str]]:
+    inputs = inputs or load_inventory_inputs(data_dir, as_of)
     forecasts: Dict[str, Mapping[str, float | str]] = {}
-    for sku, series in usage_by_sku.items():
-        smoothed = _exponential_smoothing(series, SMOOTHING_ALPHA)
+    for sku, smoothed in zip(inputs.skus, inputs.smoothed()):
         adjusted = smoothed * (1 + growth_adjustment)
-        inventory_meta = inventory_index.get(sku, {})
-        try:
-            sku_lead_time = int(inventory_meta.get("lead_time_days", lead_time_days) or lead_time_days)
-        except (TypeError, ValueError):
-            sku_lead_time = lead_time_days
-        horizon_demand = adjusted * (DEFAULT_DAYS + sku_lead_time)
-        buffer = max(horizon_demand * 0.15, 5)
-        try:
-            on_hand = float(inventory_meta.get("on_hand_units", 0) or 0)
-        except (TypeError, ValueError):
-            on_hand = 0.0
-        try:
-            reorder_point = float(inventory_meta.get("reorder_point_units", 0) or 0)
-        except (TypeError, ValueError):
-            reorder_point = 0.0
-        if on_hand < horizon_demand:
-            action = "reorder"
-        elif on_hand < reorder_point:
-            action = "watch"
+        inventory_meta = inputs.inventory.get(sku, {})
+        override = _lead_time_override(inventory_meta)
+        sku_lead_time = lead_time_days if override is None else override
+        model = inputs.models.get(sku)
+        if model is not None:
+            horizon_demand = model.horizon_demand(DEFAULT_DAYS + sku_lead_time) * (1 + growth_adjustment)
         else:
-            action = "buffer_ok"
-        vendor = inventory_meta.get("vendor") or ""
-        forecasts[sku] = InventoryForecast(
-            supply_sku=sku,
-            forecast_units=horizon_demand,
-            recommended_buffer=buffer,
-        ).to_dict() | {
-            "on_hand": round(on_hand, 2),
-            "reorder_point": round(reorder_point, 2),
-            "lead_time_days": sku_lead_time,
-            "vendor": str(vendor),
-            "action": action,
-        }
-
+            horizon_demand = adjusted * (DEFAULT_DAYS + sku_lead_time)
+        buffer = max(horizon_demand * 0.15, 5)
+        forecasts[sku] = _forecast_entry(
+            sku, horizon_demand, buffer, sku_lead_time, inventory_meta, model.method if model else "smoothing"
+        )
     return forecasts
 
 
+# ----------------------------------------------------------------------
+# Batched scenarios
+# ----------------------------------------------------------------------
+def _smooth_matrix(values: "np.ndarray", mask: "np.ndarray", alpha: float) -> "np.ndarray":
+    """Exponential smoothing of every row of a left-aligned, masked SKU x history matrix."""
+
+    forecast = values[:, 0].copy() if values.shape[1] else np.zeros(values.shape[0])
+    for column in range(1, values.shape[1]):
+        present = mask[:, column]
+        forecast = np.where(present, alpha * values[:, column] + (1 - alpha) * forecast, forecast)
+    return forecast
+
+
+def history_matrix(inputs: InventoryInputs) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Pack the per-SKU series into a zero-padded matrix and its presence mask."""
+
+    lengths = np.fromiter((len(series) for series in inputs.history), dtype=np.int64, count=len(inputs.history))
+    width = int(lengths.max()) if lengths.size else 0
+    values = np.zeros((len(inputs.history), width), dtype=float)
+    mask = np.arange(width)[None, :] < lengths[:, None]
+    if width:
+        values[mask] = np.fromiter(itertools.chain.from_iterable(inputs.history), dtype=float)
+    return values, mask
+
+
+def _model_horizon_matrix(inputs: InventoryInputs, days: "np.ndarray") -> "np.ndarray":
+    """:meth:`DemandModel.horizon_demand` for a scenario x SKU array of horizons."""
+
+    fallback = DemandModel("smoothing", 0.0)
+    models = [inputs.models.get(sku, fallback) for sku in inputs.skus]
+    levels = np.array([model.level for model in models], dtype=float)
+    trends = np.array([model.trend for model in models], dtype=float)
+    prefix = np.zeros((len(models), SEASON_LENGTH + 1), dtype=float)
+    for row, model in enumerate(models):
+        if len(model.seasonals) == SEASON_LENGTH:
+            prefix[row] = model.seasonal_prefix
+    full, partial = np.divmod(days, SEASON_LENGTH)
+    seasonal = full * prefix[:, -1][None, :] + np.take_along_axis(
+        np.broadcast_to(prefix, (days.shape[0],) + prefix.shape), partial[..., None], axis=2
+    )[..., 0]
+    return np.maximum(days * levels[None, :] + trends[None, :] * days * (days + 1) / 2 + seasonal, 0.0)
+
+
+def forecast_scenarios(
+    data_dir: Path,
+    as_of: datetime,
+    levers: Sequence[Tuple[float, int]],
+    *,
+    inputs: Optional[InventoryInputs] = None,
+) -> List[Dict[str, Mapping[str, float | str]]]:
+    """Forecast every ``(growth_adjustment, lead_time_days)`` lever from one read of the inputs.
+
+    Matches calling :func:`forecast_inventory` once per lever. With NumPy the
+    smoothing runs once over the SKU x history matrix and all levers are
+    evaluated as a single scenario x SKU array; without it each lever reuses
+    the parsed inputs.
+    """
+
+    inputs = inputs or load_inventory_inputs(data_dir, as_of)
+    if np is None or not levers:
+        return [
+            forecast_inventory(data_dir, as_of, growth_adjustment=growth, lead_time_days=lead_time, inputs=inputs)
+            for growth, lead_time in levers
+        ]
+
+    values, mask = history_matrix(inputs)
+    smoothed = _smooth_matrix(values, mask, SMOOTHING_ALPHA)
+    metas = [inputs.inventory.get(sku, {}) for sku in inputs.skus]
+    overrides = [_lead_time_override(meta) for meta in metas]
+    has_override = np.array([value is not None for value in overrides], dtype=bool)
+    override_days = np.array([value or 0 for value in overrides], dtype=np.int64)
+    growth = np.array([float(growth) for growth, _ in levers], dtype=float)
+    fallback_days = np.array([int(lead_time) for _, lead_time in levers], dtype=np.int64)
+
+    lead_times = np.where(has_override[None, :], override_days[None, :], fallback_days[:, None])
+    horizon_demand = (smoothed[None, :] * (1 + growth[:, None])) * (DEFAULT_DAYS + lead_times)
+    if inputs.models:
+        horizon_demand = np.where(
+            np.array([sku in inputs.models for sku in inputs.skus], dtype=bool)[None, :],
+            _model_horizon_matrix(inputs, DEFAULT_DAYS + lead_times) * (1 + growth[:, None]),
+            horizon_demand,
+        )
+    buffers = np.maximum(horizon_demand * 0.15, 5)
+    methods = [inputs.models[sku].method if sku in inputs.models else "smoothing" for sku in inputs.skus]
+
+    results: List[Dict[str, Mapping[str, float | str]]] = []
+    for demand_row, buffer_row, lead_row in zip(horizon_demand.tolist(), buffers.tolist(), lead_times.tolist()):
+        results.append(
+            {
+                sku: _forecast_entry(sku, demand, buffer, lead_time, meta, method)
+                for sku, demand, buffer, lead_time, meta, method in zip(
+                    inputs.skus, demand_row, buffer_row, lead_row, metas, methods
+                )
+            }
+        )
+    return results
+
+
 def _select_skus(
     data: Mapping[str, Mapping[str, float | str]],
     skus: Optional[Sequence[str]] = None,
@@ -165,10 +550,92 @@ def _compute_delta(
             base_value = float(base_entry.get(field_name) or 0)
             scenario_value = float(scenario_entry.get(field_name) or 0)
             entry_delta[field_name] = round(scenario_value - base_value, 2)
+        for field_name, digits in SIMULATED_FIELDS.items():
+            if field_name in scenario_entry and field_name in base_entry:
+                base_value = float(base_entry.get(field_name) or 0)
+                scenario_value = float(scenario_entry.get(field_name) or 0)
+                entry_delta[field_name] = round(scenario_value - base_value, digits)
         deltas[sku] = entry_delta
     return deltas
 
 
+def _lead_time_applied(lead_time_delta: int) -> int:
+    return max(DEFAULT_LEAD_TIME_DAYS + int(lead_time_delta), 1)
+
+
+def scenario_grid(
+    growth_percents: Sequence[float],
+    lead_time_deltas: Sequence[int],
+) -> List[Tuple[float, int]]:
+    """Every ``(growth_percent, lead_time_delta)`` combination, growth-major."""
+
+    return [
+        (float(growth), int(delta))
+        for growth in growth_percents or [0.0]
+        for delta in lead_time_deltas or [0]
+    ]
+
+
+def run_inventory_scenarios(
+    data_dir: Path,
+    as_of: datetime,
+    scenarios: Sequence[Tuple[float, int]],
+    *,
+    skus: Optional[Sequence[str]] = None,
+    baseline: Optional[Mapping[str, Mapping[str, float | str]]] = None,
+    simulate: bool = False,
+    service_level: Optional[float] = None,
+    paths: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Mapping[str, object]:
+    """Compare the baseline forecast with many ``(growth_percent, lead_time_delta)`` scenarios.
+
+    Inputs are read once and every scenario (and the baseline, unless the
+    caller passes one) is evaluated in a single :func:`forecast_scenarios` pass.
+    With ``simulate`` each forecast also gets Monte-Carlo safety stock and
+    stockout probability (see :mod:`automation.safety_stock`), drawn from the
+    same random paths so scenario deltas reflect the levers, not sampling noise.
+    """
+
+    levers = [(growth / 100.0, _lead_time_applied(delta)) for growth, delta in scenarios]
+    if baseline is None:
+        levers.insert(0, (0.0, DEFAULT_LEAD_TIME_DAYS))
+    inputs = load_inventory_inputs(data_dir, as_of)
+    forecasts = forecast_scenarios(data_dir, as_of, levers, inputs=inputs)
+    if simulate:
+        from .safety_stock import simulate_forecasts
+
+        if baseline is not None:
+            forecasts.insert(0, baseline)
+        forecasts = simulate_forecasts(
+            data_dir, as_of, forecasts, inputs=inputs, service_level=service_level, paths=paths, seed=seed
+        )
+        baseline = forecasts.pop(0)
+    elif baseline is None:
+        baseline = forecasts.pop(0)
+
+    filtered_baseline = _select_skus(baseline, skus)
+    results: List[Mapping[str, object]] = []
+    for (growth_percent, lead_time_delta), forecast in zip(scenarios, forecasts):
+        filtered_scenario = _select_skus(forecast, skus)
+        results.append(
+            {
+                "growth_percent": round(growth_percent, 2),
+                "lead_time_delta": int(lead_time_delta),
+                "lead_time_applied": _lead_time_applied(lead_time_delta),
+                "scenario": filtered_scenario,
+                "deltas": _compute_delta(filtered_baseline, filtered_scenario),
+            }
+        )
+    selected = results[0]["scenario"] if results else filtered_baseline
+    return {
+        "generated_at": datetime.now(timezone.utc),
+        "skus": list(selected.keys()),  # type: ignore[union-attr]
+        "baseline": filtered_baseline,
+        "scenarios": results,
+    }
+
+
 def run_inventory_scenario(
     data_dir: Path,
     as_of: datetime,
@@ -176,36 +643,36 @@ def run_inventory_scenario(
     growth_percent: float = 0.0,
     lead_time_delta: int = 0,
     skus: Optional[Sequence[str]] = None,
+    baseline: Optional[Mapping[str, Mapping[str, float | str]]] = None,
+    simulate: bool = False,
+    service_level: Optional[float] = None,
+    paths: Optional[int] = None,
+    seed: Optional[int] = None,
 ) -> Mapping[str, object]:
-    """Compare baseline inventory forecast to a scenario with adjusted levers."""
+    """Compare baseline inventory forecast to a scenario with adjusted levers.
 
-    baseline = forecast_inventory(
-        data_dir,
-        as_of,
-        growth_adjustment=0.0,
-        lead_time_days=DEFAULT_LEAD_TIME_DAYS,
-    )
+    ``baseline`` may be a default-lever forecast the caller already has.
+    """
 
-    adjusted_lead_time = max(DEFAULT_LEAD_TIME_DAYS + int(lead_time_delta), 1)
-    scenario = forecast_inventory(
+    batch = run_inventory_scenarios(
         data_dir,
         as_of,
-        growth_adjustment=growth_percent / 100.0,
-        lead_time_days=adjusted_lead_time,
+        [(growth_percent, lead_time_delta)],
+        skus=skus,
+        baseline=baseline,
+        simulate=simulate,
+        service_level=service_level,
+        paths=paths,
+        seed=seed,
     )
-
-    filtered_baseline = _select_skus(baseline, skus)
-    filtered_scenario = _select_skus(scenario, skus)
-    deltas = _compute_delta(filtered_baseline, filtered_scenario)
-
-    generated_at = datetime.now(timezone.utc)
+    result = batch["scenarios"][0]  # type: ignore[index]
     return {
-        "generated_at": generated_at,
-        "growth_percent": round(growth_percent, 2),
-        "lead_time_delta": int(lead_time_delta),
-        "lead_time_applied": adjusted_lead_time,
-        "skus": list(filtered_scenario.keys()),
-        "baseline": filtered_baseline,
-        "scenario": filtered_scenario,
-        "deltas": deltas,
+        "generated_at": batch["generated_at"],
+        "growth_percent": result["growth_percent"],
+        "lead_time_delta": result["lead_time_delta"],
+        "lead_time_applied": result["lead_time_applied"],
+        "skus": batch["skus"],
+        "baseline": batch["baseline"],
+        "scenario": result["scenario"],
+        "deltas": result["deltas"],
     }
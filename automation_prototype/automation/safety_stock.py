@@ -0,0 +1,173 @@
+"""Monte-Carlo safety stock and stockout risk for inventory forecasts."""
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .predictive_inventory import DEFAULT_DAYS, InventoryInputs, load_inventory_inputs
+
+try:  # The simulation is array-only; there is no per-path Python fallback.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_PATHS = 2000
+MAX_PATHS = 10000
+# SKU x path cells simulated at once (8 MB per float64 array), so memory stays
+# bounded however many SKUs there are.
+CHUNK_CELLS = 1 << 20
+# Draws for up to this many cells are kept between runs; larger simulators
+# regenerate each chunk's draws from its seed instead.
+CACHED_CELLS = 1 << 22
+SIMULATION_SEED = 20240901
+# Demand variability assumed for SKUs forecast from usage rates rather than history.
+DEFAULT_DEMAND_CV = 0.35
+MAX_DEMAND_CV = 3.0
+LEAD_TIME_CV = 0.25
+
+
+def demand_cv(inputs: InventoryInputs) -> Dict[str, float]:
+    """Daily demand coefficient of variation per SKU.
+
+    Modelled SKUs use their one-step forecast error relative to the fitted
+    level; the rest fall back to :data:`DEFAULT_DEMAND_CV`.
+    """
+
+    cvs: Dict[str, float] = {}
+    for sku in inputs.skus:
+        model = inputs.models.get(sku)
+        if model is None or model.level <= 0 or not model.observations:
+            cvs[sku] = DEFAULT_DEMAND_CV
+        else:
+            cvs[sku] = min(model.rmse / model.level, MAX_DEMAND_CV)
+    return cvs
+
+
+class SafetyStockSimulator:
+    """Shared random draws for simulating many forecasts of the same SKUs.
+
+    Each path draws a lead-time multiplier (gamma, mean 1) and a standard
+    normal demand shock per SKU. SKUs are simulated in chunks of at most
+    :data:`CHUNK_CELLS` cells, each chunk drawing from its own stream of
+    ``seed``, so every forecast passed to :meth:`run` sees the same draws:
+    scenarios are compared on common random numbers and the same ``seed``
+    always gives the same answer.
+    """
+
+    def __init__(
+        self,
+        skus: Sequence[str],
+        cvs: Mapping[str, float],
+        *,
+        paths: int = DEFAULT_PATHS,
+        seed: Optional[int] = None,
+    ) -> None:
+        if np is None:
+            raise RuntimeError("Safety stock simulation requires numpy to be installed")
+        if not 1 <= paths <= MAX_PATHS:
+            raise ValueError(f"paths must be between 1 and {MAX_PATHS}")
+        self.skus = list(skus)
+        self.paths = paths
+        self.seed = SIMULATION_SEED if seed is None else seed
+        self.chunk_rows = max(1, CHUNK_CELLS // paths)
+        self._position = {sku: index for index, sku in enumerate(self.skus)}
+        self._cv = np.array([cvs.get(sku, DEFAULT_DEMAND_CV) for sku in self.skus], dtype=float)
+        self._cache: Optional[Dict[int, Tuple["np.ndarray", "np.ndarray"]]] = (
+            {} if len(self.skus) * paths <= CACHED_CELLS else None
+        )
+
+    def _draws(self, chunk: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Lead-time factors and demand shocks for the SKUs in ``chunk``."""
+
+        if self._cache is not None and chunk in self._cache:
+            return self._cache[chunk]
+        rows = min(self.chunk_rows, len(self.skus) - chunk * self.chunk_rows)
+        rng = np.random.default_rng([self.seed, chunk])
+        shape = 1.0 / LEAD_TIME_CV**2
+        draws = (
+            rng.gamma(shape, 1.0 / shape, size=(rows, self.paths)),
+            rng.standard_normal((rows, self.paths)),
+        )
+        if self._cache is not None:
+            self._cache[chunk] = draws
+        return draws
+
+    def run(
+        self,
+        forecasts: Mapping[str, Mapping[str, object]],
+        *,
+        service_level: float = DEFAULT_SERVICE_LEVEL,
+    ) -> Dict[str, Mapping[str, float]]:
+        """Simulate demand over review period plus lead time for each forecast entry.
+
+        ``safety_stock`` is the ``service_level`` quantile of simulated demand
+        less its expected value; ``stockout_probability`` is the share of
+        paths where that demand exceeds ``on_hand``.
+        """
+
+        if not 0 < service_level < 1:
+            raise ValueError("service_level must be between 0 and 1")
+        skus = [sku for sku in forecasts if sku in self._position]
+        if not skus:
+            return {}
+        positions = np.array([self._position[sku] for sku in skus])
+        lead = np.array([float(forecasts[sku].get("lead_time_days") or 0) for sku in skus])
+        horizon_units = np.array([float(forecasts[sku].get("forecast_units") or 0) for sku in skus])
+        on_hand = np.array([float(forecasts[sku].get("on_hand") or 0) for sku in skus])
+        daily = horizon_units / np.maximum(DEFAULT_DAYS + lead, 1)
+        sigma = daily * self._cv[positions]
+        expected = daily * (DEFAULT_DAYS + lead)
+
+        quantile = np.empty(len(skus))
+        stockout = np.empty(len(skus))
+        chunks = positions // self.chunk_rows
+        for chunk in np.unique(chunks).tolist():
+            index = np.flatnonzero(chunks == chunk)
+            lead_factor, shock = self._draws(chunk)
+            rows = positions[index] - chunk * self.chunk_rows
+            days = DEFAULT_DAYS + lead[index, None] * lead_factor[rows]
+            demand = np.maximum(
+                daily[index, None] * days + sigma[index, None] * np.sqrt(days) * shock[rows], 0.0
+            )
+            quantile[index] = np.quantile(demand, service_level, axis=1)
+            stockout[index] = (demand > on_hand[index, None]).mean(axis=1)
+        safety = np.maximum(quantile - expected, 0.0)
+
+        return {
+            sku: {
+                "safety_stock": round(units, 2),
+                "simulated_demand": round(level, 2),
+                "stockout_probability": round(probability, 4),
+                "service_level": service_level,
+            }
+            for sku, units, level, probability in zip(skus, safety.tolist(), quantile.tolist(), stockout.tolist())
+        }
+
+
+def with_safety_stock(
+    forecasts: Mapping[str, Mapping[str, object]],
+    simulated: Mapping[str, Mapping[str, float]],
+) -> Dict[str, Mapping[str, object]]:
+    """Merge simulation fields into forecast entries, leaving existing fields as they are."""
+
+    return {sku: {**entry, **simulated.get(sku, {})} for sku, entry in forecasts.items()}
+
+
+def simulate_forecasts(
+    data_dir: Path,
+    as_of: datetime,
+    forecasts: Sequence[Mapping[str, Mapping[str, object]]],
+    *,
+    inputs: Optional[InventoryInputs] = None,
+    service_level: Optional[float] = None,
+    paths: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Mapping[str, object]]]:
+    """Add simulated safety stock to each forecast, sharing one set of draws."""
+
+    inputs = inputs or load_inventory_inputs(data_dir, as_of)
+    level = DEFAULT_SERVICE_LEVEL if service_level is None else service_level
+    simulator = SafetyStockSimulator(inputs.skus, demand_cv(inputs), paths=paths or DEFAULT_PATHS, seed=seed)
+    return [with_safety_stock(forecast, simulator.run(forecast, service_level=level)) for forecast in forecasts]
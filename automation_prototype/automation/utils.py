@@ -1,8 +1,10 @@
 """Utility helpers for the Global Rounds automation prototype."""
 from __future__ import annotations
 
-import csv
 import json
+import multiprocessing
+import os
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -10,6 +12,7 @@ from typing import Dict, Iterable, List, Mapping, Sequence
 
 
 DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d"]
+JOURNAL_SUFFIX = ".journal.jsonl"
 
 
 def parse_date(value: str) -> datetime:
@@ -22,18 +25,15 @@ def parse_date(value: str) -> datetime:
     raise ValueError(f"Unsupported date format: {value}")
 
 
-def load_csv(path: Path, parse_dates: Sequence[str] | None = None) -> List[Dict[str, object]]:
-    data: List[Dict[str, object]] = []
-    with path.open("r", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            record: Dict[str, object] = dict(row)
-            if parse_dates:
-                for column in parse_dates:
-                    if column in record and record[column]:
-                        record[column] = parse_date(str(record[column]))
-            data.append(record)
-    return data
+def load_csv(path: Path, parse_dates: Sequence[str] | None = None) -> List[Mapping[str, object]]:
+    """Return CSV rows as read-only mappings served from the shared dataset cache.
+
+    The file is parsed once per (path, mtime, size); later calls from any agent
+    reuse the cached columns and date parsing instead of rereading the disk.
+    """
+    from .datasets import load_dataset
+
+    return list(load_dataset(path).rows(parse_dates))
 
 
 def load_json(path: Path) -> Mapping[str, float]:
@@ -41,6 +41,74 @@ def load_json(path: Path) -> Mapping[str, float]:
         return json.load(file)
 
 
+def journal_path(snapshot: Path) -> Path:
+    """Return the append-only journal that accompanies a JSON snapshot file."""
+    return snapshot.with_name(snapshot.stem + JOURNAL_SUFFIX)
+
+
+def replace_file(path: Path, data: bytes) -> None:
+    """Atomically replace ``path`` with ``data`` via a scratch file unique to this writer."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as scratch:
+        scratch.write(data)
+    os.replace(scratch.name, path)
+
+
+def process_pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for process pools created inside the threaded API server.
+
+    Forking a process that runs worker threads can copy a lock another thread
+    holds, deadlocking the child; forkserver (spawn where unavailable) starts
+    workers from a clean interpreter instead.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def load_journaled_records(snapshot: Path, collection: str, id_field: str = "id") -> List[Dict[str, object]]:
+    """Load ``{collection: [...]}`` from ``snapshot`` and replay its journal on top.
+
+    Journal lines are ``{"op": "put", "record": {...}}`` entries holding the full
+    record after a mutation, so replaying a prefix twice is harmless. A torn
+    final line from an interrupted write is ignored. Records without an
+    ``id_field`` value cannot replace anything and are appended as they come,
+    like id-less records in the snapshot.
+    """
+    records: List[Dict[str, object]] = []
+    if snapshot.exists():
+        try:
+            payload = json.loads(snapshot.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            payload = {collection: []}
+        raw = payload.get(collection, []) if isinstance(payload, dict) else payload
+        records = [dict(record) for record in raw]
+
+    journal = journal_path(snapshot)
+    if not journal.exists():
+        return records
+    positions = {record.get(id_field): index for index, record in enumerate(records) if record.get(id_field)}
+    with journal.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict) or entry.get("op") != "put":
+                continue
+            record = entry.get("record")
+            if not isinstance(record, dict):
+                continue
+            key = record.get(id_field)
+            if not key:
+                records.append(dict(record))
+            elif key in positions:
+                records[positions[key]] = dict(record)
+            else:
+                positions[key] = len(records)
+                records.append(dict(record))
+    return records
+
+
 @dataclass
 class WorkOrder:
     patient_id: str
@@ -89,7 +157,10 @@ def ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def export_json(data: Iterable[Mapping[str, object]], destination: Path) -> None:
+def export_json(data: Iterable[Mapping[str, object]], destination: Path, *, format: str = "json") -> None:
+    """Write ``data`` record by record (``json``, ``compact`` or ``ndjson``)."""
+    from .jsonstream import write
+
     ensure_directory(destination.parent)
-    payload: List[Mapping[str, object]] = [dict(item) for item in data]
-    destination.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    with destination.open("w", encoding="utf-8") as handle:
+        write((dict(item) for item in data), handle, format=format)
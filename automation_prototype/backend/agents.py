@@ -1,18 +1,44 @@
 """Agent orchestration for the automation prototype."""
 from __future__ import annotations
 
+import logging
 import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, MutableMapping
+from typing import Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
 # Ensure the automation package is importable when running from /backend
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from automation import engagement, ordering, payments, performance, workforce, finance  # noqa: E402
+from automation.graph import AGENT_NAMES, AgentGraph  # noqa: E402
+from automation.utils import process_pool_context  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+EXECUTION_MODES = {"serial", "thread", "process"}
+
+
+def _run_agent(agent: str, data_dir: Path, as_of: datetime) -> Mapping[str, object]:
+    if agent not in AGENT_NAMES:
+        raise ValueError(f"Unknown agent '{agent}'")
+    return AgentGraph.for_data_dir(data_dir).get(agent, as_of.replace(tzinfo=None))
+
+
+def _timed_run(agent: str, data_dir: Path, as_of: datetime) -> Tuple[Mapping[str, object], datetime, float]:
+    """Pool entry point (module level so process pools can pickle it)."""
+
+    started_at = datetime.now(timezone.utc)
+    clock = time.perf_counter()
+    payload = _run_agent(agent, data_dir, as_of)
+    return payload, started_at, (time.perf_counter() - clock) * 1000.0
 
 
 @dataclass
@@ -20,58 +46,336 @@ class AgentResult:
     name: str
     payload: Mapping[str, object]
     run_at: datetime
+    as_of: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+    # For a failed run, the most recent successful result it replaced.
+    last_success: Optional["AgentResult"] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def latest_good(self) -> Optional["AgentResult"]:
+        return self if self.ok else self.last_success
 
 
 @dataclass
 class AgentOrchestrator:
+    """Runs agents serially or concurrently on a thread or process pool.
+
+    Agents only read the fixtures, so they run independently. Timeouts count
+    from submission; an agent that overruns is reported as failed and its
+    worker is left to finish in the background.
+    """
+
     data_dir: Path
     results: MutableMapping[str, AgentResult] = field(default_factory=dict)
+    mode: str = "thread"
+    max_workers: int = len(AGENT_NAMES)
+    timeout_seconds: Optional[float] = None
+    agent_timeouts: Mapping[str, float] = field(default_factory=dict)
+    _executor: Optional[Executor] = field(default=None, init=False, repr=False)
+    _executor_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown agent execution mode '{self.mode}'")
 
     def run_agents(self, agents: Iterable[str], as_of: datetime) -> Dict[str, Mapping[str, object]]:
+        names = list(dict.fromkeys(agent.lower() for agent in agents))
+        unknown = [name for name in names if name not in AGENT_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown agent '{unknown[0]}'")
+        if self.mode == "serial" or len(names) <= 1:
+            results = [self._run_inline(name, as_of) for name in names]
+        else:
+            results = self._run_pooled(names, as_of)
         responses: Dict[str, Mapping[str, object]] = {}
-        for agent in agents:
-            payload = self._run_single(agent, as_of)
-            responses[agent] = payload
-            self.results[agent] = AgentResult(name=agent, payload=payload, run_at=datetime.now(timezone.utc))
+        for result in results:
+            result.as_of = as_of
+            previous = self.results.get(result.name)
+            if not result.ok and previous is not None:
+                result.last_success = previous.latest_good
+            self.results[result.name] = result
+            responses[result.name] = result.payload
         return responses
 
-    def _run_single(self, agent: str, as_of: datetime) -> Mapping[str, object]:
-        agent = agent.lower()
-        if agent == "ordering":
-            return ordering.run(self.data_dir, as_of.replace(tzinfo=None))
-        if agent == "payments":
-            return payments.reconcile_claims(self.data_dir, as_of.replace(tzinfo=None))
-        if agent == "workforce":
-            return workforce.forecast_staffing(self.data_dir, as_of.replace(tzinfo=None))
-        if agent == "engagement":
-            return engagement.generate_notifications(self.data_dir, as_of.replace(tzinfo=None))
-        if agent == "performance":
-            return performance.compute_kpis(self.data_dir, as_of.replace(tzinfo=None))
-        if agent == "finance":
-            return finance.compute_financial_pulse(self.data_dir, as_of.replace(tzinfo=None))
-        raise ValueError(f"Unknown agent '{agent}'")
+    def _run_inline(self, name: str, as_of: datetime) -> AgentResult:
+        started_at = datetime.now(timezone.utc)
+        clock = time.perf_counter()
+        try:
+            payload, started_at, duration_ms = _timed_run(name, self.data_dir, as_of)
+        except Exception as exc:
+            return self._failure(name, started_at, (time.perf_counter() - clock) * 1000.0, exc)
+        return AgentResult(name, payload, datetime.now(timezone.utc), started_at=started_at, duration_ms=duration_ms)
 
-    def run_all(self, as_of: datetime) -> Dict[str, Mapping[str, object]]:
-        return self.run_agents(
-            ["ordering", "payments", "workforce", "engagement", "performance", "finance"],
-            as_of,
+    def _run_pooled(self, names: Sequence[str], as_of: datetime) -> List[AgentResult]:
+        executor = self._pool()
+        submitted_at = datetime.now(timezone.utc)
+        clock = time.monotonic()
+        futures = [(name, executor.submit(_timed_run, name, self.data_dir, as_of)) for name in names]
+        results: List[AgentResult] = []
+        for name, future in futures:
+            limit = self.agent_timeouts.get(name, self.timeout_seconds)
+            remaining = None if limit is None else max(0.0, clock + limit - time.monotonic())
+            try:
+                payload, started_at, duration_ms = future.result(timeout=remaining)
+            except FutureTimeout:
+                future.cancel()
+                elapsed = (time.monotonic() - clock) * 1000.0
+                error = TimeoutError(f"timed out after {limit:g}s")
+                results.append(self._failure(name, submitted_at, elapsed, error))
+                continue
+            except Exception as exc:
+                results.append(self._failure(name, submitted_at, (time.monotonic() - clock) * 1000.0, exc))
+                continue
+            results.append(
+                AgentResult(name, payload, datetime.now(timezone.utc), started_at=started_at, duration_ms=duration_ms)
+            )
+        return results
+
+    @staticmethod
+    def _failure(name: str, started_at: datetime, duration_ms: float, exc: BaseException) -> AgentResult:
+        logger.error("Agent %s failed: %s", name, exc, exc_info=not isinstance(exc, TimeoutError))
+        message = f"{type(exc).__name__}: {exc}"
+        return AgentResult(
+            name,
+            {"error": message},
+            datetime.now(timezone.utc),
+            started_at=started_at,
+            duration_ms=duration_ms,
+            error=message,
         )
 
+    def _pool(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # The server runs threads; forking it could copy a held lock into workers.
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_pool_context())
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent")
+            return self._executor
+
+    def close(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run_all(self, as_of: datetime) -> Dict[str, Mapping[str, object]]:
+        return self.run_agents(list(AGENT_NAMES), as_of)
+
     def status(self) -> List[Mapping[str, object]]:
         statuses: List[Mapping[str, object]] = []
-        for name in ["ordering", "payments", "workforce", "engagement", "performance", "finance"]:
+        for name in AGENT_NAMES:
             result = self.results.get(name)
+            good = result.latest_good if result else None
             statuses.append(
                 {
                     "agent": name,
                     "last_run": result.run_at.isoformat() if result else None,
-                    "records": _estimate_records(result.payload) if result else 0,
+                    "last_success": good.run_at.isoformat() if good else None,
+                    "records": _estimate_records(good.payload) if good else 0,
+                    "duration_ms": round(result.duration_ms, 1) if result and result.duration_ms is not None else None,
+                    "last_error": result.error if result else None,
                 }
             )
         return statuses
 
+    def cached_node(self, name: str) -> Optional[Mapping[str, object]]:
+        """Return a graph node computed during the latest ordering run, if still current."""
+
+        latest = self.results.get("ordering")
+        if latest is None or latest.as_of is None or latest.error:
+            return None
+        return AgentGraph.for_data_dir(self.data_dir).peek(name, latest.as_of.replace(tzinfo=None))
+
     def snapshot(self) -> Mapping[str, object]:
-        return {name: result.payload for name, result in self.results.items()}
+        """Latest payload per agent; a failed run keeps the last good payload with its ``error`` added."""
+
+        snapshot: Dict[str, Mapping[str, object]] = {}
+        for name, result in self.results.items():
+            good = result.latest_good
+            if result.ok or good is None:
+                snapshot[name] = result.payload
+            else:
+                snapshot[name] = {**good.payload, "error": result.error}
+        return snapshot
+
+
+# ----------------------------------------------------------------------
+# Debounced background reruns
+# ----------------------------------------------------------------------
+RecomputeCallback = Callable[[Sequence[str], datetime, Sequence[Mapping[str, object]]], None]
+
+
+class AgentRecomputeScheduler:
+    """Coalesce agent reruns requested by portal mutations into background runs.
+
+    ``request`` marks agents dirty and returns at once. A worker thread waits
+    until no request has arrived for ``debounce_seconds`` (or the oldest one
+    is ``max_delay_seconds`` old) and then runs every dirty agent once, as of
+    the latest requested time. Until ``start`` is called requests run inline.
+    """
+
+    def __init__(
+        self,
+        orchestrator: AgentOrchestrator,
+        *,
+        debounce_seconds: float = 0.5,
+        max_delay_seconds: float = 5.0,
+        on_complete: Optional[RecomputeCallback] = None,
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.on_complete = on_complete
+        self._cond = threading.Condition()
+        self._dirty: Dict[str, datetime] = {}
+        self._in_flight: Dict[str, datetime] = {}
+        self._as_of: Optional[datetime] = None
+        self._triggers: List[Mapping[str, object]] = []
+        self._first_request = 0.0
+        self._last_request = 0.0
+        self._requested = 0
+        self._completed = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name="agent-recompute", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 60.0) -> None:
+        """Run whatever is still dirty, then return to inline mode."""
+
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def request(
+        self,
+        agents: Iterable[str],
+        as_of: datetime,
+        *,
+        trigger: str,
+        order_id: Optional[str] = None,
+    ) -> int:
+        """Mark ``agents`` dirty and return the request's generation number."""
+
+        names = [name.lower() for name in agents]
+        unknown = [name for name in names if name not in AGENT_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown agent '{unknown[0]}'")
+        as_of = as_of if as_of.tzinfo else as_of.replace(tzinfo=timezone.utc)
+        context = {"trigger": trigger, "order_id": order_id}
+        with self._cond:
+            self._requested += 1
+            generation = self._requested
+            if not self._running:
+                taken = generation
+            else:
+                now = datetime.now(timezone.utc)
+                for name in names:
+                    self._dirty.setdefault(name, now)
+                self._as_of = as_of if self._as_of is None else max(self._as_of, as_of)
+                self._triggers.append(context)
+                self._last_request = time.monotonic()
+                if len(self._triggers) == 1:
+                    self._first_request = self._last_request
+                self._cond.notify_all()
+                return generation
+        try:
+            self._execute(names, as_of, [context])
+        finally:
+            self._finish(taken)
+        return generation
+
+    def wait_until_fresh(self, timeout: Optional[float] = None) -> bool:
+        """Block until every request made so far has been run."""
+
+        with self._cond:
+            target = self._requested
+            return self._cond.wait_for(lambda: self._completed >= target, timeout)
+
+    def status(self) -> List[Mapping[str, object]]:
+        """Orchestrator status plus whether each agent has a rerun pending."""
+
+        with self._cond:
+            # An agent both running and dirty again has been stale since the older mark.
+            pending = {**self._dirty, **self._in_flight}
+        statuses: List[Mapping[str, object]] = []
+        for entry in self.orchestrator.status():
+            name = str(entry["agent"])
+            since = pending.get(name)
+            statuses.append(
+                {
+                    **entry,
+                    "stale": since is not None,
+                    "pending_since": since.isoformat() if since else None,
+                }
+            )
+        return statuses
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._dirty and self._running:
+                    self._cond.wait()
+                if not self._dirty:
+                    return
+                while self._running:
+                    deadline = min(
+                        self._last_request + self.debounce_seconds,
+                        self._first_request + self.max_delay_seconds,
+                    )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                agents = [name for name in AGENT_NAMES if name in self._dirty]
+                self._in_flight = dict(self._dirty)
+                self._dirty.clear()
+                as_of = self._as_of or datetime.now(timezone.utc)
+                triggers = self._triggers
+                self._as_of, self._triggers = None, []
+                taken = self._requested
+            try:
+                self._execute(agents, as_of, triggers)
+            finally:
+                self._finish(taken)
+
+    def _execute(self, agents: Sequence[str], as_of: datetime, triggers: Sequence[Mapping[str, object]]) -> None:
+        # Per-agent failures are captured in AgentResult; this only guards the thread.
+        try:
+            self.orchestrator.run_agents(agents, as_of)
+        except Exception:  # pragma: no cover - defensive logging
+            logger.exception("Agent recompute failed for %s", list(agents))
+            return
+        if self.on_complete is not None:
+            try:
+                self.on_complete(agents, as_of, triggers)
+            except Exception:
+                logger.exception("Agent recompute callback failed for %s", list(agents))
+
+    def _finish(self, generation: int) -> None:
+        with self._cond:
+            self._completed = max(self._completed, generation)
+            self._in_flight = {}
+            self._cond.notify_all()
 
 
 def _estimate_records(payload: Mapping[str, object]) -> int:
@@ -11,10 +11,10 @@ import binascii
 from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, Sequence
+from typing import Any, Dict, List, Mapping, Sequence, Union
 
 import httpx
-from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
@@ -26,15 +26,17 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from backend.agents import AgentOrchestrator  # noqa: E402
+from backend.agents import AgentOrchestrator, AgentRecomputeScheduler  # noqa: E402
 from backend.compliance import scan_compliance  # noqa: E402
 from backend.config import load_infrastructure_config  # noqa: E402
+from backend.migrations import run_migrations  # noqa: E402
+from backend.storage import open_storage  # noqa: E402
 from backend.audit import AuditVault  # noqa: E402
-from backend.events import EventDispatcher, load_recent_events  # noqa: E402
+from backend.events import EventDispatcher, load_event_page  # noqa: E402
 from backend.patient_links import PatientLinkStore  # noqa: E402
 from backend.partners import PartnerOrderStore  # noqa: E402
 from backend.payers import PayerConnector  # noqa: E402
-from backend.portal import PortalOrderStore, assess_order  # noqa: E402
+from backend.portal import PortalOrderStore, assess_order, subscribe_order_demand  # noqa: E402
 from backend.provider import create_esign_stub, render_f2f_template, render_wopd_template  # noqa: E402
 from backend.tasks import TaskStore, ensure_task_for_portal_hold, create_patient_action_task  # noqa: E402
 from backend.ingestion import ingest_portal_holds  # noqa: E402
@@ -46,11 +48,19 @@ from backend.webhooks import (  # noqa: E402
     WebhookRegistry,
     WebhookDeliveryWorker,
 )
+from automation.demand_history import DemandHistoryStore  # noqa: E402
+from automation.forecast_models import ForecastModelService  # noqa: E402
+from automation.graph import AgentGraph  # noqa: E402
+from automation.order_lookup import OrderLookupService  # noqa: E402
 from automation.predictive_inventory import (  # noqa: E402
     forecast_inventory,
     run_inventory_scenario,
+    run_inventory_scenarios,
+    scenario_grid,
 )
+from automation.safety_stock import DEFAULT_PATHS, DEFAULT_SERVICE_LEVEL, MAX_PATHS, simulate_forecasts  # noqa: E402
 from backend.schemas import (  # noqa: E402
+    MAX_INVENTORY_SCENARIOS,
     AgentRunRequest,
     AgentRunResponse,
     AgentStatusResponse,
@@ -69,6 +79,7 @@ from backend.schemas import (  # noqa: E402
     PatientLinkCreateRequest,
     PatientLinkResponse,
     PatientLinkSessionResponse,
+    InventoryScenarioBatchResponse,
     InventoryScenarioRequest,
     InventoryScenarioResponse,
     PayerEligibilityRequest,
@@ -102,6 +113,7 @@ from backend.schemas import (  # noqa: E402
     SlaEvaluateRequest,
     SlaScoreResponse,
     SlaPolicyResponse,
+    SlaPortfolioResponse,
     PatientIntakeRequest,
     PatientIntakeResponse,
     LexiconExpandRequest,
@@ -159,21 +171,79 @@ if PATIENT_STATIC_DIR.exists():
 if DEFAULT_DATA_DIR.exists():
     app.mount("/data", StaticFiles(directory=DEFAULT_DATA_DIR), name="data")
 
-orchestrator = AgentOrchestrator(data_dir=DEFAULT_DATA_DIR)
-portal_store = PortalOrderStore(data_dir=DEFAULT_DATA_DIR)
-task_store = TaskStore(data_dir=DEFAULT_DATA_DIR)
-event_dispatcher = EventDispatcher(data_dir=DEFAULT_DATA_DIR)
+infrastructure_config = load_infrastructure_config()
+record_storage = open_storage(DEFAULT_DATA_DIR, infrastructure_config.storage)
+_agent_timeout = os.getenv("AUTOMATION_AGENT_TIMEOUT_SECONDS", "").strip()
+orchestrator = AgentOrchestrator(
+    data_dir=DEFAULT_DATA_DIR,
+    mode=os.getenv("AUTOMATION_AGENT_MODE", "thread").strip().lower() or "thread",
+    timeout_seconds=float(_agent_timeout) if _agent_timeout else None,
+)
+portal_store = PortalOrderStore(data_dir=DEFAULT_DATA_DIR, storage=record_storage)
+task_store = TaskStore(data_dir=DEFAULT_DATA_DIR, storage=record_storage)
+_segment_period = os.getenv("AUTOMATION_EVENT_SEGMENT_PERIOD", "daily").strip().lower()
+_segment_compression = os.getenv("AUTOMATION_EVENT_SEGMENT_COMPRESSION", "gzip").strip().lower()
+event_dispatcher = EventDispatcher(
+    data_dir=DEFAULT_DATA_DIR,
+    fsync_every=256,
+    fsync_interval_ms=200.0,
+    segment_period=None if _segment_period in {"", "off", "none"} else _segment_period,
+    compression=None if _segment_compression in {"", "off", "none"} else _segment_compression,
+)
 sla_service = SlaService(data_dir=DEFAULT_DATA_DIR, dispatcher=event_dispatcher, task_store=task_store)
+demand_history = DemandHistoryStore.for_data_dir(DEFAULT_DATA_DIR)
+subscribe_order_demand(event_dispatcher, portal_store, demand_history)
+forecast_models = ForecastModelService.for_data_dir(DEFAULT_DATA_DIR)
+order_lookup = OrderLookupService.for_data_dir(DEFAULT_DATA_DIR)
+
+
+async def _warm_forecast_models() -> None:
+    """Fit stale SKU models off the request path so the first forecast is served warm."""
+
+    try:
+        summary = await asyncio.to_thread(forecast_models.refresh)
+    except Exception:  # pragma: no cover - logged, forecasts fall back to fitting on demand
+        logger.exception("Forecast model warm-up failed")
+        return
+    if summary.get("refit"):
+        logger.info("Fitted %s SKU forecast models in %sms", summary["refit"], summary["elapsed_ms"])
+
+
+def _publish_agent_completed(
+    agents: Sequence[str], as_of: datetime, triggers: Sequence[Mapping[str, object]]
+) -> None:
+    order_ids = [str(context["order_id"]) for context in triggers if context.get("order_id")]
+    names = list(dict.fromkeys(str(context["trigger"]) for context in triggers))
+    payload: Dict[str, object] = {
+        "agents": list(agents),
+        "as_of": as_of.isoformat(),
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "trigger": names[0] if len(names) == 1 else "coalesced",
+        "triggers": names,
+        "order_ids": order_ids,
+    }
+    if len(order_ids) == 1:
+        payload["order_id"] = order_ids[0]
+    event_dispatcher.publish("agent.completed", payload)
+
+
+agent_graph = AgentGraph.for_data_dir(DEFAULT_DATA_DIR)
+# Inventory endpoints accept a baseline forecast this old if its inputs are unchanged.
+INVENTORY_FORECAST_MAX_AGE = timedelta(minutes=5)
+agent_scheduler = AgentRecomputeScheduler(
+    orchestrator,
+    debounce_seconds=float(os.getenv("AUTOMATION_AGENT_DEBOUNCE_MS", "500")) / 1000.0,
+    on_complete=_publish_agent_completed,
+)
 audit_vault = AuditVault(data_dir=DEFAULT_DATA_DIR)
-patient_link_store = PatientLinkStore(data_dir=DEFAULT_DATA_DIR)
-partner_order_store = PartnerOrderStore(data_dir=DEFAULT_DATA_DIR)
-webhook_registry = WebhookRegistry(data_dir=DEFAULT_DATA_DIR)
+patient_link_store = PatientLinkStore(data_dir=DEFAULT_DATA_DIR, storage=record_storage)
+partner_order_store = PartnerOrderStore(data_dir=DEFAULT_DATA_DIR, storage=record_storage)
+webhook_registry = WebhookRegistry(data_dir=DEFAULT_DATA_DIR, storage=record_storage)
 webhook_outbox = WebhookOutbox(data_dir=DEFAULT_DATA_DIR)
 webhook_dispatcher = WebhookDispatcher(webhook_registry, webhook_outbox)
 event_dispatcher.subscribe("*", webhook_dispatcher.handle_event)
-webhook_worker = WebhookDeliveryWorker(webhook_outbox)
+webhook_worker = WebhookDeliveryWorker(webhook_outbox, registry=webhook_registry)
 llm_client = GuardedNarrativeClient()
-infrastructure_config = load_infrastructure_config()
 payer_connector = PayerConnector(
     data_dir=DEFAULT_DATA_DIR,
     dispatcher=event_dispatcher,
@@ -181,6 +251,7 @@ payer_connector = PayerConnector(
 )
 logger = logging.getLogger(__name__)
 _compliance_task: asyncio.Task | None = None
+_warm_task: asyncio.Task | None = None
 COMPLIANCE_SCAN_INTERVAL_SECONDS = 15 * 60
 
 
@@ -302,6 +373,8 @@ def _build_dashboard_context(context: Mapping[str, Any] | None) -> str:
     inventory_context = payload.get("inventory_forecast")
     if inventory_context is None:
         inventory_context = snapshot.get("inventory_forecast")
+    if inventory_context is None and data_candidate is None:
+        inventory_context = orchestrator.cached_node("inventory_forecast")
 
     agent_activity = payload.get("agent_activity")
     if not isinstance(agent_activity, list):
@@ -644,15 +717,33 @@ async def _schedule_compliance_scans() -> None:
 
 @app.on_event("startup")
 async def _on_startup() -> None:
-    global _compliance_task
+    global _compliance_task, _warm_task
+    if infrastructure_config.database.migrate_on_startup:
+        database = infrastructure_config.database
+        applied = await asyncio.to_thread(
+            run_migrations,
+            database.url,
+            history_table=database.migration_table,
+        )
+        if applied:
+            logger.info("Applied schema migrations: %s", [entry["version"] for entry in applied])
+    event_dispatcher.start()
+    agent_scheduler.start()
     if _compliance_task is None:
         _compliance_task = asyncio.create_task(_schedule_compliance_scans())
     webhook_worker.start()
+    if _warm_task is None:
+        _warm_task = asyncio.create_task(_warm_forecast_models())
+    try:
+        # Index usage/compliance/inventory now so the first portal order is not the one to build them.
+        await asyncio.to_thread(order_lookup.refresh)
+    except FileNotFoundError as exc:  # pragma: no cover - indexes build on first lookup instead
+        logger.warning("Order lookup indexes not built: %s", exc)
 
 
 @app.on_event("shutdown")
 async def _on_shutdown() -> None:
-    global _compliance_task
+    global _compliance_task, _warm_task
     if _compliance_task:
         _compliance_task.cancel()
         try:
@@ -660,7 +751,16 @@ async def _on_shutdown() -> None:
         except asyncio.CancelledError:  # pragma: no cover - expected on shutdown
             pass
         _compliance_task = None
+    if _warm_task:
+        # The fit runs in a worker thread; cancelling only stops awaiting it.
+        _warm_task.cancel()
+        _warm_task = None
+    await asyncio.to_thread(agent_scheduler.stop)
+    orchestrator.close()
+    await asyncio.to_thread(event_dispatcher.stop)
     await webhook_worker.stop()
+    webhook_outbox.flush()
+    task_store.compact()
 
 
 def _parse_as_of(date_str: str | None) -> datetime:
@@ -697,11 +797,19 @@ def _coerce_datetime(value: str | None) -> datetime:
     return dt.replace(tzinfo=timezone.utc)
 
 
+def _run_diagnostics(agents: Sequence[str]) -> Dict[str, Dict[str, object]]:
+    results = [orchestrator.results[name] for name in agents if name in orchestrator.results]
+    return {
+        "durations_ms": {result.name: round(result.duration_ms or 0.0, 1) for result in results},
+        "errors": {result.name: result.error for result in results if result.error},
+    }
+
+
 @app.post("/api/agents/run", response_model=AgentRunResponse)
 async def run_agents(request: AgentRunRequest) -> AgentRunResponse:
     agents = _validate_agents(request.agents)
     as_of = _parse_as_of(request.as_of)
-    payload = orchestrator.run_agents(agents, as_of)
+    payload = await asyncio.to_thread(orchestrator.run_agents, agents, as_of)
     run_at = datetime.now(timezone.utc)
     event_dispatcher.publish(
         "agent.completed",
@@ -712,13 +820,13 @@ async def run_agents(request: AgentRunRequest) -> AgentRunResponse:
             "trigger": "api",
         },
     )
-    return AgentRunResponse(run_at=run_at, agents=agents, payload=payload)
+    return AgentRunResponse(run_at=run_at, agents=agents, payload=payload, **_run_diagnostics(agents))
 
 
 @app.post("/api/run-all", response_model=AgentRunResponse)
 async def run_all(request: AgentRunRequest | None = None) -> AgentRunResponse:
     as_of = _parse_as_of(request.as_of if request else None)
-    payload = orchestrator.run_all(as_of)
+    payload = await asyncio.to_thread(orchestrator.run_all, as_of)
     run_at = datetime.now(timezone.utc)
     event_dispatcher.publish(
         "agent.completed",
@@ -729,12 +837,19 @@ async def run_all(request: AgentRunRequest | None = None) -> AgentRunResponse:
             "trigger": "run_all",
         },
     )
-    return AgentRunResponse(run_at=run_at, agents=list(payload.keys()), payload=payload)
+    return AgentRunResponse(
+        run_at=run_at,
+        agents=list(payload.keys()),
+        payload=payload,
+        **_run_diagnostics(list(payload.keys())),
+    )
 
 
 @app.get("/api/agents/status", response_model=list[AgentStatusResponse])
-async def agent_status() -> list[AgentStatusResponse]:
-    statuses = orchestrator.status()
+async def agent_status(wait: bool = False, timeout: float = 30.0) -> list[AgentStatusResponse]:
+    if wait:
+        await asyncio.to_thread(agent_scheduler.wait_until_fresh, timeout)
+    statuses = agent_scheduler.status()
     return [AgentStatusResponse(**status) for status in statuses]
 
 
@@ -810,16 +925,11 @@ async def create_portal_order(request: PortalOrderCreateRequest) -> PortalOrderR
                 "order_id": order.get("id"),
             },
         )
-    orchestrator.run_agents(["ordering", "performance", "finance"], as_of)
-    event_dispatcher.publish(
-        "agent.completed",
-        {
-            "agents": ["ordering", "performance"],
-            "as_of": as_of.isoformat(),
-            "run_at": datetime.now(timezone.utc).isoformat(),
-            "trigger": "portal_order_created",
-            "order_id": order.get("id"),
-        },
+    agent_scheduler.request(
+        ["ordering", "performance", "finance"],
+        as_of,
+        trigger="portal_order_created",
+        order_id=order.get("id"),
     )
     return PortalOrderResponse(**order)
 
@@ -846,16 +956,11 @@ async def approve_portal_order(order_id: str) -> PortalOrderResponse:
         {"order_id": order_id, "patient_id": order.get("patient_id"), "status": order.get("status")},
     )
     now = datetime.now(timezone.utc)
-    orchestrator.run_agents(["ordering", "performance", "finance"], now)
-    event_dispatcher.publish(
-        "agent.completed",
-        {
-            "agents": ["ordering", "performance"],
-            "as_of": now.isoformat(),
-            "run_at": datetime.now(timezone.utc).isoformat(),
-            "trigger": "portal_order_approved",
-            "order_id": order_id,
-        },
+    agent_scheduler.request(
+        ["ordering", "performance", "finance"],
+        now,
+        trigger="portal_order_approved",
+        order_id=order_id,
     )
     return PortalOrderResponse(**order)
 
@@ -866,6 +971,13 @@ async def get_sla_policy() -> SlaPolicyResponse:
     return SlaPolicyResponse(**snapshot)
 
 
+@app.get("/api/sla/portfolio", response_model=SlaPortfolioResponse)
+async def get_sla_portfolio() -> SlaPortfolioResponse:
+    # Pool size is the service's choice; clients must not size server processes.
+    portfolio = await asyncio.to_thread(sla_service.portfolio)
+    return SlaPortfolioResponse(**portfolio.to_dict())
+
+
 @app.post("/api/sla/evaluate", response_model=SlaScoreResponse)
 async def evaluate_sla(request: SlaEvaluateRequest) -> SlaScoreResponse:
     score = sla_service.score(request.order_id, emit=request.refresh)
@@ -1089,16 +1201,11 @@ async def provider_complete_task(task_id: str, request: ProviderTaskCompleteRequ
     )
 
     now = datetime.now(timezone.utc)
-    orchestrator.run_agents(["ordering", "performance", "finance"], now)
-    event_dispatcher.publish(
-        "agent.completed",
-        {
-            "agents": ["ordering", "performance"],
-            "as_of": now.isoformat(),
-            "run_at": datetime.now(timezone.utc).isoformat(),
-            "trigger": "provider_clearance",
-            "order_id": order_id,
-        },
+    agent_scheduler.request(
+        ["ordering", "performance", "finance"],
+        now,
+        trigger="provider_clearance",
+        order_id=order_id,
     )
     sla_service.score(order_id, emit=True)
 
@@ -1121,9 +1228,21 @@ async def provider_complete_task(task_id: str, request: ProviderTaskCompleteRequ
         esign_envelope=request.esign_envelope,
     )
 @app.get("/api/events/recent", response_model=EventListResponse)
-async def recent_events(limit: int = 50) -> EventListResponse:
-    events = load_recent_events(DEFAULT_DATA_DIR, limit=limit)
-    return EventListResponse(events=events)
+async def recent_events(
+    request: Request,
+    limit: int = 50,
+    topics: str | None = None,
+    before: int | None = None,
+) -> EventListResponse:
+    topic_values = request.query_params.getlist("topic")
+    if topic_values:
+        selected = [value.strip() for value in topic_values if value.strip()]
+    elif topics:
+        selected = [topic.strip() for topic in topics.split(",") if topic.strip()]
+    else:
+        selected = []
+    events, cursor = load_event_page(DEFAULT_DATA_DIR, limit=limit, topics=selected, before=before)
+    return EventListResponse(events=events, next_before=cursor)
 
 
 @app.get("/api/events/stream")
@@ -1194,13 +1313,36 @@ async def provider_wopd_form(patient_id: str, supply_sku: str) -> ProviderFormRe
 
 
 @app.get("/api/inventory/forecast")
-async def inventory_forecast(growth: float | None = None) -> Mapping[str, Mapping[str, float | str]]:
+async def inventory_forecast(
+    growth: float | None = None,
+    simulate: bool = False,
+    service_level: float = Query(default=DEFAULT_SERVICE_LEVEL, gt=0.5, lt=1.0),
+    paths: int = Query(default=DEFAULT_PATHS, ge=100, le=MAX_PATHS),
+    seed: int | None = None,
+) -> Mapping[str, Mapping[str, float | str]]:
     adjustment = float(growth) if growth is not None else 0.0
-    forecasts = forecast_inventory(
-        DEFAULT_DATA_DIR,
-        as_of=datetime.now(timezone.utc),
-        growth_adjustment=adjustment,
-    )
+    # A cache miss fits demand models, so keep both paths off the event loop.
+    if adjustment:
+        forecasts = await asyncio.to_thread(
+            forecast_inventory,
+            DEFAULT_DATA_DIR,
+            as_of=datetime.now(timezone.utc),
+            growth_adjustment=adjustment,
+        )
+    else:
+        forecasts = await asyncio.to_thread(
+            agent_graph.get, "inventory_forecast", datetime.now(timezone.utc), tolerance=INVENTORY_FORECAST_MAX_AGE
+        )
+    if simulate:
+        (forecasts,) = await asyncio.to_thread(
+            simulate_forecasts,
+            DEFAULT_DATA_DIR,
+            datetime.now(timezone.utc),
+            [forecasts],
+            service_level=service_level,
+            paths=paths,
+            seed=seed,
+        )
     event_dispatcher.publish(
         "inventory.forecast",
         {
@@ -1212,14 +1354,63 @@ async def inventory_forecast(growth: float | None = None) -> Mapping[str, Mappin
     return forecasts
 
 
-@app.post("/api/inventory/scenario", response_model=InventoryScenarioResponse)
-async def inventory_scenario(request: InventoryScenarioRequest) -> InventoryScenarioResponse:
-    scenario = run_inventory_scenario(
+@app.get("/api/inventory/forecast/models")
+async def inventory_forecast_models() -> Mapping[str, object]:
+    """Cache state of the fitted per-SKU demand models."""
+
+    return forecast_models.status()
+
+
+@app.post(
+    "/api/inventory/scenario",
+    response_model=Union[InventoryScenarioResponse, InventoryScenarioBatchResponse],
+)
+async def inventory_scenario(
+    request: InventoryScenarioRequest,
+) -> Union[InventoryScenarioResponse, InventoryScenarioBatchResponse]:
+    baseline = await asyncio.to_thread(
+        agent_graph.get, "inventory_forecast", datetime.now(timezone.utc), tolerance=INVENTORY_FORECAST_MAX_AGE
+    )
+    if request.is_batch:
+        levers = [(lever.growth_percent, lever.lead_time_delta) for lever in request.scenarios or []]
+        if request.growth_percents or request.lead_time_deltas:
+            levers.extend(scenario_grid(request.growth_percents or [], request.lead_time_deltas or []))
+        if len(levers) > MAX_INVENTORY_SCENARIOS:
+            raise HTTPException(status_code=422, detail=f"At most {MAX_INVENTORY_SCENARIOS} scenarios per request")
+        batch = await asyncio.to_thread(
+            run_inventory_scenarios,
+            DEFAULT_DATA_DIR,
+            datetime.now(timezone.utc),
+            levers,
+            skus=request.skus,
+            baseline=baseline,
+            simulate=request.simulate,
+            service_level=request.service_level,
+            paths=request.paths,
+            seed=request.seed,
+        )
+        event_dispatcher.publish(
+            "inventory.scenario",
+            {
+                "scenarios": [[growth, delta] for growth, delta in levers],
+                "skus": batch["skus"],
+                "generated_at": batch["generated_at"].isoformat(),
+            },
+        )
+        return InventoryScenarioBatchResponse(**batch)
+
+    scenario = await asyncio.to_thread(
+        run_inventory_scenario,
         DEFAULT_DATA_DIR,
         as_of=datetime.now(timezone.utc),
         growth_percent=request.growth_percent,
         lead_time_delta=request.lead_time_delta,
         skus=request.skus,
+        baseline=baseline,
+        simulate=request.simulate,
+        service_level=request.service_level,
+        paths=request.paths,
+        seed=request.seed,
     )
     event_dispatcher.publish(
         "inventory.scenario",
@@ -1477,16 +1668,11 @@ async def patient_intake(request: PatientIntakeRequest) -> PatientIntakeResponse
         )
 
     # 5) Run agents to push toward fulfillment
-    orchestrator.run_agents(["ordering", "performance", "finance"], as_of)
-    event_dispatcher.publish(
-        "agent.completed",
-        {
-            "agents": ["ordering", "performance", "finance"],
-            "as_of": as_of.isoformat(),
-            "run_at": datetime.now(timezone.utc).isoformat(),
-            "trigger": "patient_intake",
-            "order_id": order.get("id"),
-        },
+    agent_scheduler.request(
+        ["ordering", "performance", "finance"],
+        as_of,
+        trigger="patient_intake",
+        order_id=order.get("id"),
     )
 
     # 6) Optionally create partner order if approved
@@ -1650,7 +1836,7 @@ async def patient_action(payload: Mapping[str, object]) -> TaskResponse:
         action=action,
         notes=str(notes or ""),
     )
-    orchestrator.run_agents(["finance"], datetime.now(timezone.utc))
+    agent_scheduler.request(["finance"], datetime.now(timezone.utc), trigger="patient_action", order_id=record["order_id"])
     event_dispatcher.publish(
         "patient.action",
         {
@@ -0,0 +1,307 @@
+"""Persistent byte-offset index over the JSONL event log."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from array import array
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple
+
+EVENT_INDEX_SUFFIX = ".index.jsonl"
+
+
+def _hour_bucket(value: object) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return int(stamp.timestamp() // 3600)
+
+
+def _complete(raw: bytes) -> bool:
+    try:
+        return isinstance(json.loads(raw), Mapping)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return False
+
+
+class EventLogIndex:
+    """Offsets of event lines grouped by order id, topic and hourly time bucket.
+
+    The index is mirrored to a sidecar JSONL file next to the log so restarts
+    only replay the compact index records plus any log bytes appended since.
+    The sidecar starts with the log's inode and device, and the entry for the
+    first line carries a digest of it, so a sidecar left behind by a log that
+    was replaced or rewritten is rebuilt rather than trusted.
+    """
+
+    _registry: Dict[str, "EventLogIndex"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = Path(log_path)
+        self.path = self.log_path.with_name(self.log_path.name.replace(".jsonl", "") + EVENT_INDEX_SUFFIX)
+        self._lock = threading.RLock()
+        self._covered = 0
+        self._identity: Optional[Tuple[int, int]] = None
+        self._all: array = array("q")
+        self._by_order: MutableMapping[str, array] = {}
+        self._by_topic: MutableMapping[str, array] = {}
+        self._by_hour: MutableMapping[int, array] = {}
+        self._unbucketed: array = array("q")
+        self._load()
+
+    @classmethod
+    def for_log(cls, log_path: Path) -> "EventLogIndex":
+        """Return the process-wide index for ``log_path``."""
+
+        key = str(Path(log_path).resolve())
+        with cls._registry_lock:
+            index = cls._registry.get(key)
+            if index is None:
+                index = cls(Path(log_path))
+                cls._registry[key] = index
+            return index
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _reset(self) -> None:
+        self._covered = 0
+        self._all = array("q")
+        self._by_order = {}
+        self._by_topic = {}
+        self._by_hour = {}
+        self._unbucketed = array("q")
+
+    def _log_identity(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.log_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_dev
+
+    def _head_digest(self, end: int) -> str:
+        with self.log_path.open("rb") as log:
+            return hashlib.sha256(log.read(end)).hexdigest()
+
+    def _load(self) -> None:
+        self._reset()
+        identity = self._log_identity()
+        header: Optional[Mapping[str, object]] = None
+        head: Optional[Mapping[str, object]] = None
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                        if header is None and isinstance(record, dict) and "log" in record:
+                            header = record["log"]
+                            continue
+                        offset = int(record["o"])
+                        end = int(record["e"])
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        continue
+                    if offset < self._covered:
+                        continue
+                    if offset == 0:
+                        head = record
+                    if not record.get("skip"):
+                        self._add(offset, record.get("t"), record.get("id"), record.get("h"))
+                    self._covered = end
+        log_size = self.log_path.stat().st_size if identity is not None else 0
+        if self._covered and not self._matches(identity, header, head, log_size):
+            # The log was truncated, replaced or rewritten underneath the sidecar; start over.
+            self._reset()
+            self.path.unlink(missing_ok=True)
+        self._identity = identity
+        self._catch_up()
+
+    def _matches(
+        self,
+        identity: Optional[Tuple[int, int]],
+        header: Optional[Mapping[str, object]],
+        head: Optional[Mapping[str, object]],
+        log_size: int,
+    ) -> bool:
+        if identity is None or self._covered > log_size or not isinstance(header, Mapping) or head is None:
+            return False
+        if (header.get("ino"), header.get("dev")) != identity:
+            return False
+        return head.get("d") == self._head_digest(int(head["e"]))
+
+    def _open_sidecar(self):
+        sidecar = self.path.open("a", encoding="utf-8")
+        if sidecar.tell() == 0:
+            self._identity = self._log_identity()
+            if self._identity is not None:
+                ino, dev = self._identity
+                sidecar.write(json.dumps({"log": {"ino": ino, "dev": dev}}) + "\n")
+        return sidecar
+
+    def _add(self, offset: int, topic: object, order_id: object, hour: object) -> None:
+        self._all.append(offset)
+        if isinstance(order_id, str) and order_id:
+            self._by_order.setdefault(order_id, array("q")).append(offset)
+        if topic:
+            self._by_topic.setdefault(str(topic), array("q")).append(offset)
+        if isinstance(hour, int):
+            self._by_hour.setdefault(hour, array("q")).append(offset)
+        else:
+            self._unbucketed.append(offset)
+
+    def _index_line(self, offset: int, raw: bytes, sidecar) -> None:
+        end = offset + len(raw)
+        try:
+            event = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            event = None
+        if not isinstance(event, Mapping):
+            # Undecodable lines are covered but never returned.
+            entry = {"o": offset, "e": end, "skip": True}
+            if offset == 0:
+                entry["d"] = hashlib.sha256(raw).hexdigest()
+            sidecar.write(json.dumps(entry) + "\n")
+            self._covered = end
+            return
+        self._record(offset, end, event, sidecar)
+
+    def _record(self, offset: int, end: int, event: Mapping[str, object], sidecar) -> None:
+        payload = event.get("payload")
+        order_id = payload.get("order_id") if isinstance(payload, Mapping) else None
+        topic = str(event.get("topic") or "")
+        hour = _hour_bucket(event.get("timestamp"))
+        entry = {"o": offset, "e": end, "t": topic}
+        if isinstance(order_id, str) and order_id:
+            entry["id"] = order_id
+        if hour is not None:
+            entry["h"] = hour
+        if offset == 0:
+            entry["d"] = self._head_digest(end)
+        sidecar.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._add(offset, topic, order_id, hour)
+        self._covered = end
+
+    def _catch_up(self) -> None:
+        """Index complete log lines written after the last covered byte.
+
+        A final line without a trailing newline is indexed once it decodes
+        as a JSON object; anything else there is a partial write and is
+        picked up next time.
+        """
+
+        if not self.log_path.exists():
+            return
+        with self.log_path.open("rb") as log, self._open_sidecar() as sidecar:
+            log.seek(self._covered)
+            offset = self._covered
+            for raw in log:
+                if not raw.endswith(b"\n") and not _complete(raw):
+                    break
+                if raw.strip():
+                    self._index_line(offset, raw, sidecar)
+                offset += len(raw)
+                self._covered = offset
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def record(self, offset: int, length: int, event: Mapping[str, object]) -> None:
+        """Register a line the dispatcher just appended at ``offset``."""
+
+        with self._lock:
+            if offset != self._covered:
+                # Another writer appended in between; index everything up to EOF.
+                self._catch_up()
+                return
+            with self._open_sidecar() as sidecar:
+                self._record(offset, offset + length, event, sidecar)
+
+    def record_many(self, entries: Sequence[Tuple[int, int, Mapping[str, object]]]) -> None:
+        """Register a batch of ``(offset, length, event)`` lines written back to back."""
+
+        with self._lock:
+            if not entries or entries[0][0] != self._covered:
+                self._catch_up()
+                return
+            with self._open_sidecar() as sidecar:
+                for offset, length, event in entries:
+                    self._record(offset, offset + length, event, sidecar)
+
+    def reset(self) -> None:
+        """Forget everything, e.g. after the log was sealed into a segment."""
+
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self._reset()
+            self._catch_up()
+
+    def refresh(self) -> None:
+        with self._lock:
+            try:
+                stat = self.log_path.stat()
+            except FileNotFoundError:
+                stat = None
+            size = stat.st_size if stat is not None else 0
+            replaced = stat is not None and self._identity is not None and (stat.st_ino, stat.st_dev) != self._identity
+            if size < self._covered or replaced:
+                self.path.unlink(missing_ok=True)
+                self._reset()
+            if size != self._covered:
+                self._catch_up()
+
+    def offsets(
+        self,
+        *,
+        order_id: Optional[str] = None,
+        topics: Optional[Sequence[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[int]:
+        """Return sorted candidate offsets; callers still apply exact filters."""
+
+        self.refresh()
+        with self._lock:
+            candidates: Optional[Set[int]] = None
+            if order_id is not None:
+                candidates = set(self._by_order.get(order_id, ()))
+            if topics:
+                matched: Set[int] = set()
+                for topic, offsets in self._by_topic.items():
+                    if any(pattern == "*" or fnmatchcase(topic, pattern) for pattern in topics):
+                        matched.update(offsets)
+                candidates = matched if candidates is None else candidates & matched
+            if since is not None or until is not None:
+                low = _hour_bucket(since.isoformat()) if since is not None else None
+                high = _hour_bucket(until.isoformat()) if until is not None else None
+                in_range: Set[int] = set()
+                for hour, offsets in self._by_hour.items():
+                    if (low is None or hour >= low) and (high is None or hour <= high):
+                        in_range.update(offsets)
+                if since is None:
+                    in_range.update(self._unbucketed)
+                candidates = in_range if candidates is None else candidates & in_range
+            if candidates is None:
+                return list(self._all)
+            return sorted(candidates)
+
+    def read(self, offsets: Iterable[int]) -> Iterator[Mapping[str, object]]:
+        """Decode the event lines stored at ``offsets``."""
+
+        with self.log_path.open("rb") as handle:
+            for offset in offsets:
+                handle.seek(offset)
+                raw = handle.readline()
+                try:
+                    event = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(event, Mapping):
+                    yield event
@@ -0,0 +1,279 @@
+"""Sealed, optionally compressed segments of the event log and their manifest."""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Mapping, MutableMapping, Optional, Sequence
+
+try:  # optional dependency for zstd-compressed segments
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+SEGMENT_DIR = "event_segments"
+MANIFEST_FILE = "manifest.json"
+SEGMENT_PERIODS = {"hourly": 3600, "daily": 86400}
+COMPRESSIONS = {None, "gzip", "zstd"}
+_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+_UNSET = object()
+
+
+def _parse_timestamp(value: object) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+
+
+def period_bucket(value: datetime, period_seconds: int) -> int:
+    stamp = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return int(stamp.timestamp() // period_seconds)
+
+
+class EventSegmentStore:
+    """Manifest of sealed event-log segments next to the active ``events.jsonl``.
+
+    Each manifest entry records the segment's byte range in the logical log
+    (``base`` + ``bytes``), its min/max timestamp, and its topic and order-id
+    sets. Readers use these to skip segments that cannot match a query.
+    """
+
+    _registry: Dict[str, "EventSegmentStore"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, log_path: Path, *, compression: Optional[str] = None) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown segment compression '{compression}'")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd segment compression requires the 'zstandard' package")
+        self.log_path = Path(log_path)
+        self.directory = self.log_path.parent / SEGMENT_DIR
+        self.manifest_path = self.directory / MANIFEST_FILE
+        self.compression = compression
+        self._lock = threading.RLock()
+        self._entries: List[MutableMapping[str, object]] = []
+        self._manifest_mtime: Optional[int] = None
+
+    @classmethod
+    def for_log(cls, log_path: Path, *, compression: object = _UNSET) -> "EventSegmentStore":
+        """Return the process-wide segment store for ``log_path``.
+
+        Readers omit ``compression``; the writer passes the codec used for
+        segments it seals from then on.
+        """
+
+        key = str(Path(log_path).resolve())
+        with cls._registry_lock:
+            store = cls._registry.get(key)
+            if store is None:
+                store = cls(Path(log_path), compression=None if compression is _UNSET else compression)  # type: ignore[arg-type]
+                cls._registry[key] = store
+            elif compression is not _UNSET:
+                if compression not in COMPRESSIONS:
+                    raise ValueError(f"Unknown segment compression '{compression}'")
+                if compression == "zstd" and zstandard is None:
+                    raise RuntimeError("zstd segment compression requires the 'zstandard' package")
+                store.compression = compression  # type: ignore[assignment]
+            return store
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def entries(self) -> List[Mapping[str, object]]:
+        """Return manifest entries oldest first, re-reading the file if it changed."""
+
+        with self._lock:
+            try:
+                mtime = self.manifest_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                self._entries, self._manifest_mtime = [], None
+                return []
+            if mtime != self._manifest_mtime:
+                try:
+                    payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    payload = {"segments": []}
+                self._entries = list(payload.get("segments", []))
+                self._manifest_mtime = mtime
+            return [dict(entry) for entry in self._entries]
+
+    def _write_manifest(self, entries: Sequence[Mapping[str, object]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        scratch = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        scratch.write_text(json.dumps({"segments": list(entries)}, indent=2), encoding="utf-8")
+        os.replace(scratch, self.manifest_path)
+        self._manifest_mtime = None
+
+    def active_base(self) -> int:
+        """Logical byte position where the active log starts."""
+
+        entries = self.entries()
+        if not entries:
+            return 0
+        last = entries[-1]
+        return int(last["base"]) + int(last["bytes"])
+
+    # ------------------------------------------------------------------
+    # Sealing
+    # ------------------------------------------------------------------
+    def seal(self) -> Optional[Mapping[str, object]]:
+        """Move the active log into a new segment; callers hold the writer lock."""
+
+        if not self.log_path.exists() or self.log_path.stat().st_size == 0:
+            return None
+        with self._lock:
+            entries = self.entries()
+            sequence = int(entries[-1]["sequence"]) + 1 if entries else 1
+            base = self.active_base()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            raw_path = self.directory / f"events-{sequence:06d}.jsonl"
+            os.replace(self.log_path, raw_path)
+            self.log_path.touch()
+            entry = dict(self._summarize(raw_path), sequence=sequence, base=base, file=raw_path.name, compression=None)
+            entries.append(entry)
+            self._write_manifest(entries)
+        if self.compression:
+            threading.Thread(
+                target=self._compress, args=(sequence, raw_path), name="event-segment-compress", daemon=True
+            ).start()
+        return entry
+
+    @staticmethod
+    def _summarize(path: Path) -> Mapping[str, object]:
+        topics: set = set()
+        orders: set = set()
+        low: Optional[datetime] = None
+        high: Optional[datetime] = None
+        count = 0
+        with path.open("rb") as handle:
+            for raw in handle:
+                try:
+                    event = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if not isinstance(event, Mapping):
+                    continue
+                count += 1
+                topics.add(str(event.get("topic") or ""))
+                payload = event.get("payload")
+                if isinstance(payload, Mapping) and isinstance(payload.get("order_id"), str):
+                    orders.add(payload["order_id"])
+                stamp = _parse_timestamp(event.get("timestamp"))
+                if stamp is not None:
+                    low = stamp if low is None or stamp < low else low
+                    high = stamp if high is None or stamp > high else high
+        return {
+            "bytes": path.stat().st_size,
+            "count": count,
+            "min_ts": low.isoformat() if low else None,
+            "max_ts": high.isoformat() if high else None,
+            "topics": sorted(topics),
+            "orders": sorted(orders),
+        }
+
+    def _compress(self, sequence: int, raw_path: Path) -> None:
+        compression = self.compression
+        target = raw_path.with_name(raw_path.name + _SUFFIXES[compression])
+        scratch = target.with_name(target.name + ".tmp")
+        with raw_path.open("rb") as source, _open_writer(scratch, compression) as sink:
+            while True:
+                chunk = source.read(1024 * 1024)
+                if not chunk:
+                    break
+                sink.write(chunk)
+        os.replace(scratch, target)
+        with self._lock:
+            entries = self.entries()
+            for entry in entries:
+                if int(entry["sequence"]) == sequence:
+                    entry["file"] = target.name
+                    entry["compression"] = compression
+            self._write_manifest(entries)
+        # Readers that opened the raw file keep their handle; new readers use the manifest.
+        raw_path.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def select(
+        self,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        topics: Sequence[str] = (),
+        order_id: Optional[str] = None,
+    ) -> List[Mapping[str, object]]:
+        """Return manifest entries whose recorded range and sets can satisfy the filters."""
+
+        selected = []
+        for entry in self.entries():
+            low = _parse_timestamp(entry.get("min_ts"))
+            high = _parse_timestamp(entry.get("max_ts"))
+            if since is not None and high is not None and high < since:
+                continue
+            if until is not None and low is not None and low > until:
+                continue
+            if order_id is not None and order_id not in set(entry.get("orders") or ()):
+                continue
+            if topics and not any(
+                pattern == "*" or fnmatchcase(topic, pattern)
+                for topic in entry.get("topics") or ()
+                for pattern in topics
+            ):
+                continue
+            selected.append(entry)
+        return selected
+
+    def read_lines(self, entry: Mapping[str, object]) -> Iterator[bytes]:
+        """Yield the raw lines of a sealed segment, decompressing as needed."""
+
+        for _ in range(2):
+            path = self.directory / str(entry["file"])
+            try:
+                handle = _open_reader(path, entry.get("compression"))
+            except FileNotFoundError:
+                # Compression finished in between; pick up the new file name.
+                refreshed = [item for item in self.entries() if item["sequence"] == entry["sequence"]]
+                if not refreshed:
+                    return
+                entry = refreshed[0]
+                continue
+            with handle:
+                yield from handle
+            return
+
+    def read_events(self, entry: Mapping[str, object]) -> Iterator[Mapping[str, object]]:
+        for raw in self.read_lines(entry):
+            try:
+                event = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(event, Mapping):
+                yield event
+
+
+def _open_reader(path: Path, compression: object) -> IO[bytes]:
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd segments requires the 'zstandard' package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True))
+    return path.open("rb")
+
+
+def _open_writer(path: Path, compression: object) -> IO[bytes]:
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).stream_writer(path.open("wb"), closefd=True)
+    return path.open("wb")
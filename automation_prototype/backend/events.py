@@ -2,27 +2,86 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import heapq
+import itertools
 import json
+import os
+import queue
 import threading
+import time
+from collections import deque
 from datetime import datetime, timezone
 from fnmatch import fnmatchcase
 from pathlib import Path
-from typing import Callable, Dict, List, Mapping, MutableMapping, Sequence, Tuple
+from typing import BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
 from automation import utils as automation_utils
+from backend.event_index import EventLogIndex
+from backend.event_segments import SEGMENT_PERIODS, EventSegmentStore, period_bucket
+from backend.topics import TopicRouter
 
 EVENT_LOG_FILE = "events.jsonl"
+EVENT_BUFFER_SIZE = 10_000
+DISPATCH_QUEUE_SIZE = 256
+# Events buffered by iter_replay_events to put slightly out-of-order writes back in order.
+REPLAY_REORDER_WINDOW = 1024
 
 
 class EventDispatcher:
-    """Minimal event dispatcher persisting to JSONL for replay/debug."""
-
-    def __init__(self, data_dir: Path) -> None:
+    """Minimal event dispatcher persisting to JSONL for replay/debug.
+
+    Until :meth:`start` is called, ``publish`` writes and notifies inline.
+    Once started, ``publish`` only appends to an in-memory ring buffer: a
+    writer thread drains it in batches with one write per batch, with an
+    fsync every ``fsync_every`` events or ``fsync_interval_ms`` (group
+    commit), and hands each written batch to a dispatch thread over a bounded
+    queue so listeners never run on the request path.
+
+    With ``segment_period`` (``"hourly"``/``"daily"``) or ``segment_bytes``
+    set, the active log is sealed into ``event_segments/`` whenever the
+    period rolls over or the file grows past the limit, and sealed segments
+    are compressed with ``compression`` in the background.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        buffer_size: int = EVENT_BUFFER_SIZE,
+        dispatch_queue_size: int = DISPATCH_QUEUE_SIZE,
+        fsync_every: int = 0,
+        fsync_interval_ms: float = 0.0,
+        segment_period: str | None = None,
+        segment_bytes: int | None = None,
+        compression: str | None = "gzip",
+    ) -> None:
+        if segment_period is not None and segment_period not in SEGMENT_PERIODS:
+            raise ValueError(f"Unknown segment period '{segment_period}'")
         self.data_dir = data_dir
         self.path = self.data_dir / EVENT_LOG_FILE
+        self.segment_seconds = SEGMENT_PERIODS[segment_period] if segment_period else None
+        self.segment_bytes = segment_bytes
+        self._segments = (
+            EventSegmentStore.for_log(self.path, compression=compression)
+            if segment_period or segment_bytes
+            else None
+        )
+        self._active_started: datetime | None = None
+        self.buffer_size = buffer_size
+        self.dispatch_queue_size = dispatch_queue_size
+        self.fsync_every = fsync_every
+        self.fsync_interval_ms = fsync_interval_ms
         self._lock = threading.Lock()
-        self._subscribers: MutableMapping[str, List[EventListener]] = {}
-        self._pattern_subscribers: MutableMapping[str, List[EventListener]] = {}
+        self._router: TopicRouter[EventListener] = TopicRouter()
+        self._buffer: Deque[Mapping[str, object]] = deque()
+        self._cond = threading.Condition()
+        self._published = 0
+        self._written = 0
+        self._running = False
+        self._writer: threading.Thread | None = None
+        self._dispatcher: threading.Thread | None = None
+        self._dispatch_queue: "queue.Queue[List[Mapping[str, object]] | None] | None" = None
 
     def publish(self, topic: str, payload: Mapping[str, object]) -> Mapping[str, object]:
         event = {
@@ -30,29 +89,133 @@ class EventDispatcher:
             "payload": dict(payload),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
-        self._append_to_log(event)
-        self._notify(topic, event)
+        if not self._running:
+            self._append_to_log(event)
+            self._notify(topic, event)
+            return event
+        with self._cond:
+            # Listeners may publish from the dispatch thread; blocking there
+            # would deadlock against a writer waiting on the dispatch queue.
+            while len(self._buffer) >= self.buffer_size and not self._on_dispatch_thread() and self._running:
+                self._cond.wait()
+            self._buffer.append(event)
+            self._published += 1
+            self._cond.notify_all()
         return event
 
+    # ------------------------------------------------------------------
+    # Background publishing
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Switch to buffered publishing with background writer and dispatch threads."""
+
+        if self._running:
+            return
+        self._dispatch_queue = queue.Queue(maxsize=self.dispatch_queue_size)
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, name="event-writer", daemon=True)
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="event-dispatch", daemon=True)
+        self._writer.start()
+        self._dispatcher.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain buffered events, run their listeners and return to inline publishing."""
+
+        if not self._running:
+            return
+        self.flush(timeout=timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in (self._writer, self._dispatcher):
+            if thread is not None:
+                thread.join(timeout)
+        self._writer = self._dispatcher = None
+        self._dispatch_queue = None
+
+    def wait_until_written(self, timeout: float | None = None) -> bool:
+        """Block until every event published so far is in the log file."""
+
+        if not self._running or self._on_dispatch_thread():
+            return True
+        with self._cond:
+            target = self._published
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until buffered events are written and their listeners have run."""
+
+        if not self.wait_until_written(timeout):
+            return False
+        if self._dispatch_queue is not None and not self._on_dispatch_thread():
+            self._dispatch_queue.join()
+        return True
+
+    def _on_dispatch_thread(self) -> bool:
+        return threading.current_thread() is self._dispatcher
+
+    def _write_loop(self) -> None:
+        assert self._dispatch_queue is not None
+        interval = self.fsync_interval_ms / 1000.0 if self.fsync_interval_ms > 0 else None
+        unsynced = 0
+        last_sync = time.monotonic()
+        automation_utils.ensure_directory(self.path.parent)
+        handle = self.path.open("ab")
+        try:
+            while True:
+                with self._cond:
+                    while not self._buffer and self._running:
+                        wait = None
+                        if unsynced and interval is not None:
+                            wait = max(0.0, interval - (time.monotonic() - last_sync))
+                            if wait == 0.0:
+                                break
+                        self._cond.wait(wait)
+                    if not self._buffer and not self._running:
+                        break
+                    batch = list(self._buffer)
+                    self._buffer.clear()
+                    self._cond.notify_all()
+                if batch:
+                    handle = self._write_batch(batch, handle)
+                    unsynced += len(batch)
+                due = interval is not None and time.monotonic() - last_sync >= interval
+                if unsynced and ((self.fsync_every and unsynced >= self.fsync_every) or due):
+                    os.fsync(handle.fileno())
+                    unsynced = 0
+                    last_sync = time.monotonic()
+                if batch:
+                    with self._cond:
+                        self._written += len(batch)
+                        self._cond.notify_all()
+                    # Blocks when listeners fall behind, which in turn bounds the ring buffer.
+                    self._dispatch_queue.put(batch)
+            if unsynced and (self.fsync_every or interval is not None):
+                os.fsync(handle.fileno())
+        finally:
+            handle.close()
+        self._dispatch_queue.put(None)
+
+    def _dispatch_loop(self) -> None:
+        assert self._dispatch_queue is not None
+        dispatch_queue = self._dispatch_queue
+        while True:
+            batch = dispatch_queue.get()
+            try:
+                if batch is None:
+                    return
+                for event in batch:
+                    self._notify(str(event.get("topic", "")), event)
+            finally:
+                dispatch_queue.task_done()
+
     def subscribe(self, topic: str, listener: "EventListener") -> None:
-        with self._lock:
-            normalized = (topic or "*").strip() or "*"
-            target = self._pattern_subscribers if self._is_pattern(normalized) else self._subscribers
-            target.setdefault(normalized, []).append(listener)
+        normalized = (topic or "*").strip() or "*"
+        self._router.add(normalized, listener)
 
     def unsubscribe(self, topic: str, listener: "EventListener") -> None:
-        with self._lock:
-            normalized = (topic or "*").strip() or "*"
-            target = self._pattern_subscribers if self._is_pattern(normalized) else self._subscribers
-            listeners = target.get(normalized)
-            if not listeners:
-                return
-            try:
-                listeners.remove(listener)
-            except ValueError:
-                return
-            if not listeners:
-                target.pop(normalized, None)
+        normalized = (topic or "*").strip() or "*"
+        self._router.remove(normalized, listener)
 
     def subscribe_queue(
         self, topics: Sequence[str], maxsize: int = 100
@@ -61,22 +224,34 @@ class EventDispatcher:
 
         queue: "asyncio.Queue[Mapping[str, object]]" = asyncio.Queue(maxsize=maxsize)
         listeners: List[Tuple[str, EventListener]] = []
+        try:
+            loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        def _put(event: Mapping[str, object], *, _queue=queue) -> None:
+            try:
+                _queue.put_nowait(event)
+            except asyncio.QueueFull:
+                try:
+                    _queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                try:
+                    _queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    pass
 
         for topic in topics:
             normalized = (topic or "*").strip() or "*"
 
-            def _listener(event: Mapping[str, object], *, _queue=queue) -> None:
-                try:
-                    _queue.put_nowait(dict(event))
-                except asyncio.QueueFull:
-                    try:
-                        _queue.get_nowait()
-                    except asyncio.QueueEmpty:
-                        pass
-                    try:
-                        _queue.put_nowait(dict(event))
-                    except asyncio.QueueFull:
-                        pass
+            def _listener(event: Mapping[str, object]) -> None:
+                # Listeners run on the dispatch thread once the dispatcher is
+                # started; asyncio queues must only be touched from their loop.
+                if loop is not None and not loop.is_closed():
+                    loop.call_soon_threadsafe(_put, dict(event))
+                else:
+                    _put(dict(event))
 
             listeners.append((normalized, _listener))
             self.subscribe(normalized, _listener)
@@ -92,41 +267,273 @@ class EventDispatcher:
     # ------------------------------------------------------------------
     def _append_to_log(self, event: Mapping[str, object]) -> None:
         automation_utils.ensure_directory(self.path.parent)
-        line = json.dumps(event, default=str)
+        handle = self.path.open("ab")
+        try:
+            handle = self._write_batch([event], handle)
+        finally:
+            handle.close()
+
+    def _write_batch(self, events: Sequence[Mapping[str, object]], handle: BinaryIO) -> BinaryIO:
+        """Append ``events`` with one write; returns the handle to keep using after a rotation."""
+
+        lines = [(json.dumps(event, default=str) + "\n").encode("utf-8") for event in events]
         with self._lock:
-            with self.path.open("a", encoding="utf-8") as handle:
-                handle.write(line + "\n")
+            if self._handle_stale(handle):
+                # Sealed by rotate() or another process; continue in the fresh file.
+                handle.close()
+                handle = self.path.open("ab")
+            if self._rotation_due(events[0], handle):
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+                assert self._segments is not None
+                self._segments.seal()
+                EventLogIndex.for_log(self.path).reset()
+                self._active_started = None
+                handle = self.path.open("ab")
+            handle.seek(0, os.SEEK_END)
+            offset = handle.tell()
+            handle.write(b"".join(lines))
+            handle.flush()
+            entries = []
+            for line, event in zip(lines, events):
+                entries.append((offset, len(line), event))
+                offset += len(line)
+            EventLogIndex.for_log(self.path).record_many(entries)
+            if self._active_started is None:
+                self._active_started = _parse_event_time(events[0].get("timestamp"))
+        return handle
+
+    def _handle_stale(self, handle: BinaryIO) -> bool:
+        try:
+            return os.stat(self.path).st_ino != os.fstat(handle.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _rotation_due(self, next_event: Mapping[str, object], handle: BinaryIO) -> bool:
+        if self._segments is None:
+            return False
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        if size == 0:
+            return False
+        if self.segment_bytes and size >= self.segment_bytes:
+            return True
+        if self.segment_seconds is None:
+            return False
+        if self._active_started is None:
+            self._active_started = self._first_logged_time()
+        upcoming = _parse_event_time(next_event.get("timestamp"))
+        if self._active_started is None or upcoming is None:
+            return False
+        return period_bucket(upcoming, self.segment_seconds) != period_bucket(self._active_started, self.segment_seconds)
+
+    def _first_logged_time(self) -> datetime | None:
+        with self.path.open("rb") as handle:
+            for raw in handle:
+                try:
+                    event = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(event, Mapping):
+                    stamp = _parse_event_time(event.get("timestamp"))
+                    if stamp is not None:
+                        return stamp
+        return None
+
+    def rotate(self) -> Mapping[str, object] | None:
+        """Seal the active log into a segment now, regardless of the rotation policy."""
+
+        segments = self._segments or EventSegmentStore.for_log(self.path)
+        with self._lock:
+            entry = segments.seal()
+            if entry is not None:
+                EventLogIndex.for_log(self.path).reset()
+                self._active_started = None
+        return entry
 
     def _notify(self, topic: str, event: Mapping[str, object]) -> None:
-        listeners = list(self._subscribers.get(topic, []))
-        listeners.extend(self._subscribers.get("*", []))
-        for pattern, callbacks in self._pattern_subscribers.items():
-            if fnmatchcase(topic, pattern):
-                listeners.extend(callbacks)
-        for listener in listeners:
+        for listener in self._router.match(topic):
             try:
                 listener(event)
             except Exception:  # pragma: no cover - defensive
                 continue
 
-    @staticmethod
-    def _is_pattern(topic: str) -> bool:
-        return any(char in topic for char in {"*", "?", "["})
-
 EventListener = Callable[[Mapping[str, object]], None]
 
-def load_recent_events(data_dir: Path, limit: int = 50) -> List[Mapping[str, object]]:
+
+def _parse_event_time(value: object) -> datetime | None:
+    if not value:
+        return None
+    try:
+        stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+
+def load_recent_events(
+    data_dir: Path,
+    limit: int = 50,
+    *,
+    topics: Sequence[str] | None = None,
+    before: int | None = None,
+) -> List[Mapping[str, object]]:
+    events, _ = load_event_page(data_dir, limit=limit, topics=topics, before=before)
+    return events
+
+
+def load_event_page(
+    data_dir: Path,
+    *,
+    limit: int = 50,
+    topics: Sequence[str] | None = None,
+    before: int | None = None,
+) -> Tuple[List[Mapping[str, object]], int | None]:
+    """Return up to ``limit`` newest events (oldest first) and a paging cursor.
+
+    The log is read backwards in fixed-size blocks from end-of-file (or from
+    the ``before`` byte offset), so memory and latency do not depend on the
+    size of the log. Compressed segments are streamed instead, holding at
+    most ``limit`` events. The returned cursor is the byte offset of the oldest
+    event returned; pass it back as ``before`` to fetch the previous page. It
+    is ``None`` once the start of the log has been reached.
+    """
+
     path = data_dir / EVENT_LOG_FILE
-    if not path.exists():
-        return []
-    lines = path.read_text(encoding="utf-8").strip().splitlines()[-limit:]
-    events: List[Mapping[str, object]] = []
-    for line in lines:
+    segments = EventSegmentStore.for_log(path)
+    sealed = segments.entries()
+    if limit <= 0 or (not path.exists() and not sealed):
+        return [], None
+
+    topic_patterns = [str(topic).strip() for topic in topics or [] if str(topic).strip()]
+
+    def _match(raw: bytes) -> Mapping[str, object] | None:
+        if not raw.strip():
+            return None
         try:
-            events.append(json.loads(line))
-        except json.JSONDecodeError:
-            continue
-    return events
+            event = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not isinstance(event, Mapping):
+            return None
+        if topic_patterns:
+            topic = str(event.get("topic") or "")
+            if not any(pattern == "*" or fnmatchcase(topic, pattern) for pattern in topic_patterns):
+                return None
+        return event
+
+    # Cursors are positions in the logical log: sealed segments first, then
+    # the active file starting at ``active_base``.
+    active_base = segments.active_base()
+    sources: List[Tuple[int, Mapping[str, object] | None]] = []
+    if path.exists() and (before is None or before > active_base):
+        sources.append((active_base, None))
+    for entry in reversed(sealed):
+        base = int(entry["base"])
+        if before is None or before > base:
+            sources.append((base, entry))
+
+    newest_first: List[Mapping[str, object]] = []
+    cursor: int | None = None
+    for base, entry in sources:
+        end = None if before is None else before - base
+        if entry is None:
+            matches = _matches_reversed(path, end=end, match=_match)
+        else:
+            matches = _segment_matches_reversed(segments, entry, end=end, keep=limit - len(newest_first), match=_match)
+        for offset, event in matches:
+            newest_first.append(event)
+            cursor = base + offset
+            if len(newest_first) >= limit:
+                break
+        if len(newest_first) >= limit:
+            break
+    if len(newest_first) < limit or cursor == 0:
+        cursor = None
+    newest_first.reverse()
+    return newest_first, cursor
+
+
+EventMatcher = Callable[[bytes], "Mapping[str, object] | None"]
+
+
+def _matches_reversed(
+    path: Path, *, end: int | None, match: EventMatcher
+) -> Iterator[Tuple[int, Mapping[str, object]]]:
+    with path.open("rb") as handle:
+        for offset, raw in _iter_lines_reversed(handle, end=end):
+            event = match(raw)
+            if event is not None:
+                yield offset, event
+
+
+def _segment_matches_reversed(
+    segments: EventSegmentStore,
+    entry: Mapping[str, object],
+    *,
+    end: int | None,
+    keep: int,
+    match: EventMatcher,
+) -> Iterator[Tuple[int, Mapping[str, object]]]:
+    """Newest-first matches from a sealed segment without decompressing it into memory.
+
+    Raw segments are read backwards like the active file. Compressed ones
+    cannot seek, so they are streamed forward keeping only the last ``keep``
+    matches before ``end``.
+    """
+
+    if not entry.get("compression"):
+        try:
+            handle = (segments.directory / str(entry["file"])).open("rb")
+        except FileNotFoundError:
+            pass  # Compressed in the meantime; read_lines picks up the new file.
+        else:
+            with handle:
+                for offset, raw in _iter_lines_reversed(handle, end=end):
+                    event = match(raw)
+                    if event is not None:
+                        yield offset, event
+            return
+    window: Deque[Tuple[int, Mapping[str, object]]] = deque(maxlen=max(keep, 1))
+    offset = 0
+    for raw in segments.read_lines(entry):
+        if end is not None and offset >= end:
+            break
+        event = match(raw)
+        if event is not None:
+            window.append((offset, event))
+        offset += len(raw)
+    yield from reversed(window)
+
+
+def _iter_lines_reversed(
+    handle: BinaryIO,
+    *,
+    end: int | None = None,
+    block_size: int = 64 * 1024,
+) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(offset, line)`` pairs from the end of ``handle`` towards the start."""
+
+    handle.seek(0, os.SEEK_END)
+    position = handle.tell()
+    if end is not None:
+        position = max(min(end, position), 0)
+    remainder = b""
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        handle.seek(position)
+        lines = (handle.read(read_size) + remainder).split(b"\n")
+        # The first piece may continue in the previous block; carry it over.
+        remainder = lines[0]
+        offset = position + len(remainder) + 1
+        complete: List[Tuple[int, bytes]] = []
+        for line in lines[1:]:
+            complete.append((offset, line))
+            offset += len(line) + 1
+        yield from reversed(complete)
+    if remainder:
+        yield 0, remainder
 
 
 def load_events_for_order(data_dir: Path, order_id: str, limit: int | None = None) -> List[Mapping[str, object]]:
@@ -136,17 +543,19 @@ def load_events_for_order(data_dir: Path, order_id: str, limit: int | None = Non
         return []
 
     path = data_dir / EVENT_LOG_FILE
+    segments = EventSegmentStore.for_log(path)
+    events: List[Mapping[str, object]] = []
+    for entry in segments.select(order_id=order_id):
+        for event in segments.read_events(entry):
+            payload = event.get("payload", {})
+            if isinstance(payload, Mapping) and payload.get("order_id") == order_id:
+                events.append(event)
     if not path.exists():
-        return []
+        events.sort(key=lambda item: item.get("timestamp", ""))
+        return events[-limit:] if limit is not None else events
 
-    events: List[Mapping[str, object]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            event = json.loads(line)
-        except json.JSONDecodeError:
-            continue
+    index = EventLogIndex.for_log(path)
+    for event in index.read(index.offsets(order_id=order_id)):
         payload = event.get("payload", {})
         if isinstance(payload, Mapping) and payload.get("order_id") == order_id:
             events.append(event)
@@ -157,6 +566,62 @@ def load_events_for_order(data_dir: Path, order_id: str, limit: int | None = Non
     return events
 
 
+def tail_order_events(
+    data_dir: Path, order_id: str, since: int = 0
+) -> Tuple[List[Mapping[str, object]], int]:
+    """Return ``order_id``'s events logged at or after position ``since``, and where to resume.
+
+    Positions are logical log offsets, the same as :func:`load_event_page`
+    cursors, so ``since=0`` reads the whole timeline. Events written by other
+    processes are included, and each event is returned by exactly one call
+    when the resume position is passed back in.
+    """
+
+    path = data_dir / EVENT_LOG_FILE
+    segments = EventSegmentStore.for_log(path)
+    while True:
+        active_base = segments.active_base()
+        events: List[Mapping[str, object]] = []
+        resume = max(since, active_base)
+        for entry in segments.select(order_id=order_id):
+            base = int(entry["base"])
+            if base + int(entry["bytes"]) <= since:
+                continue
+            offset = base
+            for raw in segments.read_lines(entry):
+                if offset >= since:
+                    event = _order_event(raw, order_id)
+                    if event is not None:
+                        events.append(event)
+                offset += len(raw)
+        if path.exists():
+            index = EventLogIndex.for_log(path)
+            offsets = index.offsets(order_id=order_id)
+            offsets = offsets[bisect.bisect_left(offsets, since - active_base) :]
+            for event in index.read(offsets):
+                payload = event.get("payload", {})
+                if isinstance(payload, Mapping) and payload.get("order_id") == order_id:
+                    events.append(event)
+            if offsets:
+                resume = max(resume, active_base + offsets[-1] + 1)
+        # A rotation in between moves active lines into a segment we may have missed.
+        if segments.active_base() == active_base:
+            return events, resume
+
+
+def _order_event(raw: bytes, order_id: str) -> Mapping[str, object] | None:
+    try:
+        event = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(event, Mapping):
+        return None
+    payload = event.get("payload", {})
+    if isinstance(payload, Mapping) and payload.get("order_id") == order_id:
+        return event
+    return None
+
+
 def replay_events(
     data_dir: Path,
     *,
@@ -167,9 +632,34 @@ def replay_events(
 ) -> List[Mapping[str, object]]:
     """Replay events filtered by time range, topics, or order id."""
 
+    events = list(iter_replay_events(data_dir, since=since, until=until, topics=topics, order_id=order_id))
+    events.sort(key=lambda item: item.get("timestamp", ""))
+    return events
+
+
+def iter_replay_events(
+    data_dir: Path,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    topics: Sequence[str] | None = None,
+    order_id: str | None = None,
+    reorder_window: int = REPLAY_REORDER_WINDOW,
+) -> Iterator[Mapping[str, object]]:
+    """Yield the events :func:`replay_events` returns without holding them all.
+
+    The log is appended in publish order, so a heap of ``reorder_window``
+    events is enough to restore timestamp order while keeping memory flat.
+    That is the guarantee: an event logged more than ``reorder_window``
+    events after a later-stamped one (e.g. a log merged by hand) comes out
+    late here, whereas :func:`replay_events` sorts the whole result.
+    """
+
     path = data_dir / EVENT_LOG_FILE
-    if not path.exists():
-        return []
+    segments = EventSegmentStore.for_log(path)
+    sealed = segments.entries()
+    if not path.exists() and not sealed:
+        return
 
     topic_patterns = [str(topic).strip() for topic in topics or [] if str(topic).strip()]
 
@@ -186,14 +676,16 @@ def replay_events(
         except ValueError:
             return None
 
-    events: List[Mapping[str, object]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            event = json.loads(line)
-        except json.JSONDecodeError:
-            continue
+    candidates: List[Iterable[Mapping[str, object]]] = [
+        segments.read_events(entry)
+        for entry in segments.select(since=since, until=until, topics=topic_patterns, order_id=order_id or None)
+    ]
+    if path.exists():
+        index = EventLogIndex.for_log(path)
+        offsets = index.offsets(order_id=order_id or None, topics=topic_patterns, since=since, until=until)
+        candidates.append(index.read(offsets))
+    pending: List[Tuple[str, int, Mapping[str, object]]] = []
+    for sequence, event in enumerate(itertools.chain.from_iterable(candidates)):
         topic = str(event.get("topic") or "")
         if not topic or not _matches(topic):
             continue
@@ -205,7 +697,10 @@ def replay_events(
             continue
         if until and timestamp and timestamp > until:
             continue
-        events.append(event)
-
-    events.sort(key=lambda item: item.get("timestamp", ""))
-    return events
+        entry = (str(event.get("timestamp", "")), sequence, event)
+        if len(pending) < reorder_window:
+            heapq.heappush(pending, entry)
+        else:
+            yield heapq.heappushpop(pending, entry)[2]
+    while pending:
+        yield heapq.heappop(pending)[2]
@@ -1,4 +1,4 @@
 """Database schema definitions for the automation prototype."""
 
 from .v001_init import INITIAL_STATEMENTS, generate_statements  # noqa: F401
-
+from .runner import MigrationRunner, discover_migrations, run_migrations  # noqa: F401
@@ -0,0 +1,244 @@
+"""Apply ``vNNN_*.py`` schema migrations and record them in the history table."""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import inspect
+import pkgutil
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+MIGRATION_PATTERN = re.compile(r"^v(\d{3})_(\w+)$")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    def statements(self, dialect: str) -> List[str]:
+        generate = getattr(self.module, "generate_statements")
+        if "dialect" in inspect.signature(generate).parameters:
+            return [str(statement) for statement in generate(dialect=dialect)]
+        return [str(statement) for statement in generate()]
+
+    def checksum(self, dialect: str) -> str:
+        digest = hashlib.sha256("\n;\n".join(self.statements(dialect)).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def to_dict(self) -> Mapping[str, object]:
+        return {"version": self.version, "name": self.name}
+
+
+def discover_migrations(package: str = "backend.migrations") -> List[Migration]:
+    """Import every ``vNNN_name`` module in ``package`` sorted by version."""
+
+    root = importlib.import_module(package)
+    migrations: List[Migration] = []
+    seen = {}
+    for info in pkgutil.iter_modules(root.__path__):
+        match = MIGRATION_PATTERN.match(info.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f"Duplicate migration version {version}: {seen[version]} and {info.name}")
+        seen[version] = info.name
+        module = importlib.import_module(f"{package}.{info.name}")
+        migrations.append(Migration(version=version, name=match.group(2), module=module))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+# ----------------------------------------------------------------------
+# Connections
+# ----------------------------------------------------------------------
+def _parse_url(url: str) -> Tuple[str, str]:
+    """Return ``(dialect, target)`` for a SQLAlchemy-style database URL."""
+
+    scheme, _, rest = url.partition("://")
+    base = scheme.split("+", 1)[0].lower()
+    if base == "sqlite":
+        # sqlite:///relative.db, sqlite:////abs/path.db, sqlite:///:memory:
+        return "sqlite", rest[1:] if rest.startswith("/") else rest
+    if base in {"postgres", "postgresql"}:
+        return "postgres", f"postgresql://{rest}"
+    raise ValueError(f"Unsupported database URL scheme '{scheme}'")
+
+
+def _connect(dialect: str, target: str) -> Any:
+    if dialect == "sqlite":
+        if target != ":memory:":
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+        # Generous busy timeout: a concurrent runner may hold the write lock for a whole migration.
+        return sqlite3.connect(target, isolation_level=None, timeout=60.0)
+    try:
+        import psycopg  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency
+        try:
+            import psycopg2 as psycopg  # type: ignore
+        except ImportError as exc:
+            raise RuntimeError("Postgres migrations require psycopg or psycopg2 to be installed") from exc
+    connection = psycopg.connect(target)
+    connection.autocommit = True
+    return connection
+
+
+class MigrationRunner:
+    """Apply pending migrations, one transaction per version.
+
+    Each transaction takes the database write lock (SQLite) or an advisory
+    lock (Postgres) before re-reading the history table, so several runners
+    starting together apply each version exactly once. Applied versions
+    whose statements have since changed fail the run with their checksums.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        history_table: str = "schema_history",
+        migrations: Optional[Sequence[Migration]] = None,
+    ) -> None:
+        if not _IDENTIFIER.match(history_table):
+            raise ValueError(f"Invalid migration table name '{history_table}'")
+        self.url = url
+        self.dialect, self._target = _parse_url(url)
+        self.history_table = history_table
+        self.migrations = list(migrations) if migrations is not None else discover_migrations()
+        self._param = "?" if self.dialect == "sqlite" else "%s"
+        digest = hashlib.sha256(f"migrations:{history_table}".encode("utf-8")).digest()
+        self._lock_key = int.from_bytes(digest[:8], "big") >> 1  # fits a signed bigint
+
+    def _execute(self, connection: Any, sql: str, params: Sequence[object] = ()) -> Any:
+        cursor = connection.cursor()
+        cursor.execute(sql, tuple(params))
+        return cursor
+
+    def _ensure_history(self, connection: Any) -> None:
+        self._execute(
+            connection,
+            f"CREATE TABLE IF NOT EXISTS {self.history_table} ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(128) NOT NULL, "
+            "checksum VARCHAR(64) NOT NULL, "
+            "applied_at VARCHAR(40) NOT NULL)",
+        )
+
+    def _begin(self, connection: Any) -> None:
+        if self.dialect == "sqlite":
+            # Take the write lock up front so a concurrent runner waits instead of racing.
+            self._execute(connection, "BEGIN IMMEDIATE")
+        else:
+            self._execute(connection, "BEGIN")
+            self._execute(connection, "SELECT pg_advisory_xact_lock(%s)", (self._lock_key,))
+
+    def _mismatched(self, applied: Mapping[int, Mapping[str, object]]) -> List[Mapping[str, object]]:
+        mismatched: List[Mapping[str, object]] = []
+        for migration in self.migrations:
+            if migration.version not in applied:
+                continue
+            recorded, current = applied[migration.version]["checksum"], migration.checksum(self.dialect)
+            if recorded != current:
+                mismatched.append({**migration.to_dict(), "recorded": recorded, "current": current})
+        return mismatched
+
+    def _applied(self, connection: Any) -> Mapping[int, Mapping[str, object]]:
+        rows = self._execute(
+            connection,
+            f"SELECT version, name, checksum, applied_at FROM {self.history_table} ORDER BY version",
+        ).fetchall()
+        return {
+            int(version): {"version": int(version), "name": name, "checksum": checksum, "applied_at": applied_at}
+            for version, name, checksum, applied_at in rows
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def status(self) -> Mapping[str, object]:
+        connection = _connect(self.dialect, self._target)
+        try:
+            self._ensure_history(connection)
+            applied = self._applied(connection)
+        finally:
+            connection.close()
+        pending = [migration.to_dict() for migration in self.migrations if migration.version not in applied]
+        return {
+            "dialect": self.dialect,
+            "history_table": self.history_table,
+            "applied": list(applied.values()),
+            "pending": pending,
+            "modified": self._mismatched(applied),
+        }
+
+    def apply(self, *, target: Optional[int] = None) -> List[Mapping[str, object]]:
+        """Apply pending migrations up to ``target`` (inclusive) and return what ran."""
+
+        connection = _connect(self.dialect, self._target)
+        ran: List[Mapping[str, object]] = []
+        try:
+            self._begin(connection)
+            try:
+                self._ensure_history(connection)
+                modified = self._mismatched(self._applied(connection))
+            except Exception:
+                self._execute(connection, "ROLLBACK")
+                raise
+            self._execute(connection, "COMMIT")
+            if modified:
+                details = ", ".join(
+                    f"v{entry['version']:03d}_{entry['name']} (recorded {entry['recorded']}, now {entry['current']})"
+                    for entry in modified
+                )
+                raise RuntimeError(f"Applied migrations were modified: {details}")
+            for migration in self.migrations:
+                if target is not None and migration.version > target:
+                    break
+                if self._apply_one(connection, migration):
+                    ran.append(migration.to_dict())
+        finally:
+            connection.close()
+        return ran
+
+    def _apply_one(self, connection: Any, migration: Migration) -> bool:
+        """Apply ``migration`` unless another runner already did; returns whether it ran."""
+
+        # Both SQLite and Postgres run DDL transactionally, so a failing
+        # statement leaves neither partial schema nor a history row behind.
+        self._begin(connection)
+        try:
+            if migration.version in self._applied(connection):
+                self._execute(connection, "COMMIT")
+                return False
+            for statement in migration.statements(self.dialect):
+                self._execute(connection, statement)
+            self._execute(
+                connection,
+                f"INSERT INTO {self.history_table} (version, name, checksum, applied_at) "
+                f"VALUES ({', '.join([self._param] * 4)})",
+                (
+                    migration.version,
+                    migration.name,
+                    migration.checksum(self.dialect),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+        except Exception:
+            self._execute(connection, "ROLLBACK")
+            raise
+        self._execute(connection, "COMMIT")
+        return True
+
+
+def run_migrations(url: str, *, history_table: str = "schema_history", target: Optional[int] = None) -> List[Mapping[str, object]]:
+    """Convenience wrapper used by the CLI and FastAPI startup."""
+
+    return MigrationRunner(url, history_table=history_table).apply(target=target)
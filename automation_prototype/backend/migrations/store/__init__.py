@@ -0,0 +1 @@
+"""Schema migrations for the SQLite record store (see ``backend.storage``)."""
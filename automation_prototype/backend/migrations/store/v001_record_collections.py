@@ -0,0 +1,32 @@
+"""Tables for the record collections kept in the SQLite store."""
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+# (collection, indexed columns) as of this version; later changes need a new migration.
+COLLECTIONS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("tasks", ("status", "task_type", "metadata_order_id", "metadata_compliance_key", "metadata_sla_key")),
+    ("portal_orders", ("status", "patient_id")),
+    ("partner_orders", ("partner_id", "status")),
+    ("patient_links", ("patient_id", "order_id")),
+    ("webhooks", ()),
+)
+
+
+def generate_statements(dialect: str = "sqlite") -> Iterable[str]:
+    """Yield one table per collection plus its revision and lookup indexes (SQLite only)."""
+
+    for name, columns in COLLECTIONS:
+        table = f"store_{name}"
+        extra = "".join(f",\n    {column} TEXT" for column in columns)
+        yield (
+            f"CREATE TABLE IF NOT EXISTS {table} (\n"
+            "    seq INTEGER PRIMARY KEY AUTOINCREMENT,\n"
+            "    id TEXT NOT NULL UNIQUE,\n"
+            "    rev INTEGER NOT NULL,\n"
+            f"    body TEXT{extra}\n"
+            ")"
+        )
+        yield f"CREATE INDEX IF NOT EXISTS ix_{table}_rev ON {table} (rev)"
+        for column in columns:
+            yield f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})"
@@ -51,9 +51,58 @@ INITIAL_STATEMENTS: List[str] = [
 ]
 
 
-def generate_statements() -> Iterable[str]:
+SQLITE_STATEMENTS: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS automation_tasks (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        owner TEXT,
+        due_at TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        metadata TEXT NOT NULL DEFAULT '{}'
+    );
+    """.strip(),
+    """
+    CREATE TABLE IF NOT EXISTS automation_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    """.strip(),
+    """
+    CREATE TABLE IF NOT EXISTS automation_webhooks (
+        id TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        topics TEXT NOT NULL,
+        secret TEXT,
+        description TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    """.strip(),
+    """
+    CREATE TABLE IF NOT EXISTS automation_webhook_outbox (
+        id TEXT PRIMARY KEY,
+        webhook_id TEXT REFERENCES automation_webhooks(id) ON DELETE CASCADE,
+        url TEXT NOT NULL,
+        topic TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        timestamp TEXT,
+        queued_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        status TEXT NOT NULL DEFAULT 'pending'
+    );
+    """.strip(),
+]
+
+
+def generate_statements(dialect: str = "postgres") -> Iterable[str]:
     """Yield initial schema statements."""
 
-    for statement in INITIAL_STATEMENTS:
+    statements = SQLITE_STATEMENTS if dialect == "sqlite" else INITIAL_STATEMENTS
+    for statement in statements:
         yield statement
 
@@ -0,0 +1,12 @@
+"""Performance indexes for event, task and outbox scans."""
+from __future__ import annotations
+
+from typing import Iterable
+
+
+def generate_statements(dialect: str = "postgres") -> Iterable[str]:
+    """Yield index statements; the SQL is identical for both dialects."""
+
+    yield "CREATE INDEX IF NOT EXISTS ix_automation_events_topic_timestamp ON automation_events (topic, timestamp)"
+    yield "CREATE INDEX IF NOT EXISTS ix_automation_tasks_status ON automation_tasks (status)"
+    yield "CREATE INDEX IF NOT EXISTS ix_automation_webhook_outbox_status ON automation_webhook_outbox (status, queued_at)"
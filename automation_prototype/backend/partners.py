@@ -7,10 +7,13 @@ from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, MutableMapping, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence
 
 from automation import utils as automation_utils
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from backend.storage import SqliteStorage
+
 DEFAULT_ORDER_FEE = 18.0  # synthetic billing assumption per compliant order
 
 
@@ -49,27 +52,46 @@ class PartnerOrder:
 class PartnerOrderStore:
     """Persist partner-submitted orders and compute usage charges."""
 
-    def __init__(self, data_dir: Path) -> None:
+    def __init__(self, data_dir: Path, *, storage: "SqliteStorage | None" = None) -> None:
         self.data_dir = Path(data_dir)
         self.path = self.data_dir / "partner_orders.json"
+        self._collection = storage.collection("partner_orders") if storage is not None else None
+        self._rev = 0
         self._orders: Dict[str, Mapping[str, object]] = {}
         self._load()
 
     # ------------------------------------------------------------------
     # Persistence
     # ------------------------------------------------------------------
-    def _load(self) -> None:
+    def _read_json(self) -> List[Mapping[str, object]]:
         if not self.path.exists():
-            self._orders = {}
-            return
+            return []
         try:
             payload = json.loads(self.path.read_text(encoding="utf-8"))
         except json.JSONDecodeError:
             payload = {"orders": []}
-        records = payload.get("orders", []) if isinstance(payload, dict) else payload
+        return payload.get("orders", []) if isinstance(payload, dict) else payload
+
+    def _load(self) -> None:
+        if self._collection is not None:
+            self._collection.import_if_empty(self._read_json)
+            records, self._rev = self._collection.load_all()
+        else:
+            records = self._read_json()
         self._orders = {str(entry.get("order_id")): dict(entry) for entry in records}
 
-    def _persist(self) -> None:
+    def _sync(self) -> None:
+        if self._collection is None:
+            return
+        changed, self._rev = self._collection.changes(self._rev)
+        for order_id, record in changed:
+            if record is not None:
+                self._orders[order_id] = dict(record)
+
+    def _persist(self, changed: Sequence[Mapping[str, object]] = ()) -> None:
+        if self._collection is not None:
+            self._collection.put_many(changed)
+            return
         automation_utils.ensure_directory(self.path.parent)
         snapshot = {"orders": list(self._orders.values())}
         self.path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
@@ -103,7 +125,7 @@ class PartnerOrderStore:
             metadata=metadata or {},
         ).to_dict()
         self._orders[order_id] = record
-        self._persist()
+        self._persist([record])
         return dict(record)
 
     def update_order(
@@ -115,6 +137,7 @@ class PartnerOrderStore:
         amount_paid: Optional[float] = None,
         metadata_updates: Optional[Mapping[str, object]] = None,
     ) -> Mapping[str, object]:
+        self._sync()
         if order_id not in self._orders:
             raise KeyError(f"Partner order {order_id} not found")
         record = dict(self._orders[order_id])
@@ -131,10 +154,11 @@ class PartnerOrderStore:
         record["metadata"] = metadata
         record["updated_at"] = datetime.now(timezone.utc).isoformat()
         self._orders[order_id] = record
-        self._persist()
+        self._persist([record])
         return dict(record)
 
     def list_orders(self, *, partner_id: Optional[str] = None) -> List[Mapping[str, object]]:
+        self._sync()
         orders = list(self._orders.values())
         if partner_id:
             orders = [order for order in orders if str(order.get("partner_id")) == partner_id]
@@ -5,19 +5,23 @@ import json
 import secrets
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Mapping
+from typing import TYPE_CHECKING, Dict, List, Mapping
 
 from automation import utils as automation_utils
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from backend.storage import SqliteStorage
+
 TOKEN_FILE = "patient_links.json"
 
 
 class PatientLinkStore:
-    def __init__(self, data_dir: Path) -> None:
+    def __init__(self, data_dir: Path, *, storage: "SqliteStorage | None" = None) -> None:
         self.path = data_dir / TOKEN_FILE
+        self._collection = storage.collection("patient_links") if storage is not None else None
         self._load()
 
-    def _load(self) -> None:
+    def _read_json(self) -> List[Mapping[str, object]]:
         if self.path.exists():
             try:
                 raw = json.loads(self.path.read_text(encoding='utf-8'))
@@ -25,9 +29,20 @@ class PatientLinkStore:
                 raw = {"links": []}
         else:
             raw = {"links": []}
-        self._links: List[Mapping[str, object]] = raw.get("links", [])
+        return raw.get("links", [])
+
+    def _load(self) -> None:
+        if self._collection is not None:
+            self._collection.import_if_empty(self._read_json)
+            # Tokens are looked up by primary key, so nothing is cached in memory.
+            self._links: List[Mapping[str, object]] = []
+            return
+        self._links = self._read_json()
 
-    def _persist(self) -> None:
+    def _persist(self, record: Mapping[str, object]) -> None:
+        if self._collection is not None:
+            self._collection.put(record)
+            return
         automation_utils.ensure_directory(self.path.parent)
         payload = {"links": self._links}
         self.path.write_text(json.dumps(payload, indent=2), encoding='utf-8')
@@ -42,13 +57,24 @@ class PatientLinkStore:
             "created_at": now.isoformat(),
             "expires_at": (now + timedelta(minutes=expires_minutes)).isoformat(),
         }
-        self._links.append(record)
-        self._persist()
+        if self._collection is None:
+            self._links.append(record)
+        self._persist(record)
         return record
 
+    def list_links(self) -> List[Mapping[str, object]]:
+        if self._collection is not None:
+            return self._collection.load_all()[0]
+        return [dict(record) for record in self._links]
+
     def validate(self, token: str) -> Mapping[str, object] | None:
         now = datetime.now(timezone.utc)
-        for record in self._links:
+        if self._collection is not None:
+            stored = self._collection.get(token)
+            candidates = [stored] if stored else []
+        else:
+            candidates = self._links
+        for record in candidates:
             if record.get("token") != token:
                 continue
             expires_at = record.get("expires_at")
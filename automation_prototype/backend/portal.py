@@ -3,14 +3,26 @@ from __future__ import annotations
 
 import json
 import threading
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Mapping, MutableMapping, Optional
+from typing import TYPE_CHECKING, Dict, List, Mapping, MutableMapping, Optional, Sequence
 
 from automation import ordering
 from automation import utils as automation_utils
+from backend.tasks import JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_SECONDS
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from automation.demand_history import DemandHistoryStore
+    from backend.events import EventDispatcher
+    from backend.storage import SqliteStorage
+
+# Topics after which a portal order may count as SKU demand. Orders approved by
+# the compliance checks at creation only ever publish their *created* topic;
+# ``DemandHistoryStore.record_order`` skips orders not yet in a demand status.
+DEMAND_TOPICS = ("order.created", "intake.order.created", "order.approved")
 
 
 @dataclass
@@ -32,42 +44,122 @@ class OrderAssessment:
 
 
 class PortalOrderStore:
-    """Lightweight persistence for portal-submitted orders."""
+    """Lightweight persistence for portal-submitted orders.
 
-    def __init__(self, data_dir: Path) -> None:
+    With ``storage`` the orders live in the shared SQLite database. For the
+    agents that read ``portal_orders.json``, each write also appends the
+    changed orders to ``portal_orders.journal.jsonl``, and a background
+    compactor folds that journal into the snapshot like ``TaskStore`` does,
+    so writes cost the same however many orders there are. An empty database
+    imports the files on first open. Without ``storage`` every change
+    rewrites ``portal_orders.json``.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        storage: "SqliteStorage | None" = None,
+        compact_bytes: int = JOURNAL_COMPACT_BYTES,
+        compact_seconds: float = JOURNAL_COMPACT_SECONDS,
+    ) -> None:
         self.data_dir = data_dir
         self.path = self.data_dir / "portal_orders.json"
+        self.journal_path = automation_utils.journal_path(self.path)
+        self._collection = storage.collection("portal_orders") if storage is not None else None
+        self._rev = 0
+        self.compact_bytes = compact_bytes
+        self.compact_seconds = compact_seconds
         self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compactor: threading.Thread | None = None
+        self._last_compacted = time.monotonic()
         self._orders: MutableMapping[str, MutableMapping[str, object]] = {}
         self._load()
 
     # ------------------------------------------------------------------
     # Persistence helpers
     # ------------------------------------------------------------------
+    def _read_json(self) -> List[Mapping[str, object]]:
+        return automation_utils.load_journaled_records(self.path, "orders")
+
     def _load(self) -> None:
-        if not self.path.exists():
-            self._orders = {}
+        if self._collection is not None:
+            self._collection.import_if_empty(self._read_json)
+            records, self._rev = self._collection.load_all()
+            self._orders = {str(record.get("id")): dict(record) for record in records}
+            # Bring the mirror up to date with writes made while it was not kept.
+            self.compact()
             return
-        try:
-            payload = json.loads(self.path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            payload = {"orders": []}
-        records = payload.get("orders", []) if isinstance(payload, dict) else payload
         self._orders = {
             record.get("id", str(uuid.uuid4())): dict(record)
-            for record in records
+            for record in self._read_json()
         }
+        if self.journal_path.exists():
+            # Leftover journal from SQLite mode: fold it so it cannot shadow new writes.
+            self._write_snapshot(list(self._orders.values()))
+            self.journal_path.unlink()
+
+    def _sync(self) -> None:
+        if self._collection is None:
+            return
+        changed, self._rev = self._collection.changes(self._rev)
+        for order_id, record in changed:
+            if record is not None:
+                self._orders[order_id] = dict(record)
 
-    def _persist(self) -> None:
+    def _persist(self, changed: Sequence[Mapping[str, object]] = ()) -> None:
+        """Record ``changed`` orders; callers hold ``self._lock``."""
+        if self._collection is None:
+            self._write_snapshot(list(self._orders.values()))
+            return
+        self._collection.put_many(changed)
+        automation_utils.ensure_directory(self.journal_path.parent)
+        lines = "".join(
+            json.dumps({"op": "put", "record": record}, separators=(",", ":"), default=str) + "\n"
+            for record in changed
+        )
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            handle.write(lines)
+            size = handle.tell()
+        due = time.monotonic() - self._last_compacted >= self.compact_seconds
+        if size >= self.compact_bytes or due:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(target=self.compact, name="portal-journal-compactor", daemon=True)
+                self._compactor.start()
+
+    def _write_snapshot(self, records: List[Mapping[str, object]]) -> None:
         automation_utils.ensure_directory(self.path.parent)
-        snapshot = {"orders": list(self._orders.values())}
-        self.path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        automation_utils.replace_file(self.path, json.dumps({"orders": records}, indent=2).encode("utf-8"))
+
+    def compact(self) -> None:
+        """Fold the journal into ``portal_orders.json`` (SQLite mode only)."""
+        if self._collection is None:
+            return
+        with self._compact_lock:
+            with self._lock:
+                # As in TaskStore.compact: every journal line in the measured
+                # prefix was appended after its row committed, so the synced
+                # snapshot already holds it.
+                folded = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+                self._sync()
+                records = [dict(order) for order in self._orders.values()]
+            self._write_snapshot(records)
+            with self._lock:
+                self._last_compacted = time.monotonic()
+                if not folded:
+                    return
+                with self.journal_path.open("rb") as handle:
+                    handle.seek(folded)
+                    tail = handle.read()
+                automation_utils.replace_file(self.journal_path, tail)
 
     # ------------------------------------------------------------------
     # CRUD operations
     # ------------------------------------------------------------------
     def list_orders(self, status: Optional[str] = None) -> List[Mapping[str, object]]:
         with self._lock:
+            self._sync()
             orders = list(self._orders.values())
             if status:
                 desired = {state.strip().lower() for state in status.split(",")}
@@ -77,6 +169,7 @@ class PortalOrderStore:
 
     def get_order(self, order_id: str) -> Optional[Mapping[str, object]]:
         with self._lock:
+            self._sync()
             order = self._orders.get(order_id)
             return dict(order) if order else None
 
@@ -87,6 +180,7 @@ class PortalOrderStore:
         as_of: datetime,
     ) -> Mapping[str, object]:
         with self._lock:
+            self._sync()
             order_id = payload.get("id") or self._generate_id()
             now = datetime.now(timezone.utc)
             recommended_quantity = assessment.recommended_quantity or int(payload.get("quantity", 0) or 0)
@@ -120,11 +214,12 @@ class PortalOrderStore:
                     self._event_entry("approved", "automation", "Automatically approved by compliance checks."),
                 )
             self._orders[order_id] = order
-            self._persist()
+            self._persist([order])
             return dict(order)
 
     def update_status(self, order_id: str, status: str, actor: str, note: str | None = None) -> Mapping[str, object]:
         with self._lock:
+            self._sync()
             if order_id not in self._orders:
                 raise KeyError(f"Order {order_id} not found")
             now = datetime.now(timezone.utc)
@@ -134,16 +229,17 @@ class PortalOrderStore:
             order.setdefault("events", []).append(
                 self._event_entry(status, actor, note or f"Status updated to {status} by {actor}"),
             )
-            self._persist()
+            self._persist([order])
             return dict(order)
 
     def append_event(self, order_id: str, code: str, actor: str, note: str) -> Mapping[str, object]:
         with self._lock:
+            self._sync()
             if order_id not in self._orders:
                 raise KeyError(f"Order {order_id} not found")
             order = self._orders[order_id]
             order.setdefault("events", []).append(self._event_entry(code, actor, note))
-            self._persist()
+            self._persist([order])
             return dict(order)
 
     def update_ai_disposition(
@@ -155,6 +251,7 @@ class PortalOrderStore:
         actor: str = "provider",
     ) -> Mapping[str, object]:
         with self._lock:
+            self._sync()
             if order_id not in self._orders:
                 raise KeyError(f"Order {order_id} not found")
             order = self._orders[order_id]
@@ -168,7 +265,7 @@ class PortalOrderStore:
             order.setdefault("events", []).append(
                 self._event_entry(f"ai_{disposition}", actor, f"AI disposition updated to {disposition} via {actor}"),
             )
-            self._persist()
+            self._persist([order])
             return dict(order)
 
     # ------------------------------------------------------------------
@@ -224,3 +321,19 @@ def assess_order(
         recommended_quantity=int(summary.get("recommended_quantity", quantity) or quantity),
         recommended_fulfillment=summary.get("recommended_fulfillment", "warehouse"),
     )
+
+
+def subscribe_order_demand(
+    dispatcher: "EventDispatcher", store: PortalOrderStore, history: "DemandHistoryStore"
+) -> None:
+    """Record each portal order in ``history`` once it is created approved or approved later."""
+
+    def _record(event: Mapping[str, object]) -> None:
+        payload = event.get("payload")
+        order_id = payload.get("order_id") if isinstance(payload, Mapping) else None
+        order = store.get_order(str(order_id)) if order_id else None
+        if order is not None:
+            history.record_order(order)
+
+    for topic in DEMAND_TOPICS:
+        dispatcher.subscribe(topic, _record)
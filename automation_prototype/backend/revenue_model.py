@@ -5,9 +5,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Mapping
 
-from automation.performance import compute_kpis
-from automation.finance import compute_financial_pulse
-from automation.workforce import forecast_staffing, SHIFT_HOURS
+from automation.graph import AgentGraph
+from automation.workforce import SHIFT_HOURS
 
 LABOR_RATE_USD = 28.0
 PAYMENT_RECOVERY_MULTIPLIER = 1.0
@@ -47,9 +46,11 @@ def _to_timezone_aware(as_of: datetime) -> datetime:
 def build_revenue_model(data_dir: Path, as_of: datetime) -> Mapping[str, object]:
     as_of_utc = _to_timezone_aware(as_of)
     as_of_naive = as_of_utc.replace(tzinfo=None)
-    performance_kpis = compute_kpis(data_dir, as_of_naive)
-    finance_snapshot = compute_financial_pulse(data_dir, as_of_naive)
-    workforce_projection = forecast_staffing(data_dir, as_of_naive)
+    # Reuses the agent results the orchestrator already produced for this as-of time.
+    graph = AgentGraph.for_data_dir(data_dir)
+    performance_kpis = graph.get("performance", as_of_naive)
+    finance_snapshot = graph.get("finance", as_of_naive)
+    workforce_projection = graph.get("workforce", as_of_naive)
 
     performance_latest = _extract_latest(performance_kpis, 'latest_snapshot')
     finance_latest = _extract_latest(finance_snapshot, 'latest_snapshot')
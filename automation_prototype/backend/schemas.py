@@ -6,6 +6,8 @@ from typing import Any, List, Mapping, Optional
 
 from pydantic import AnyHttpUrl, BaseModel, Field, validator
 
+MAX_INVENTORY_SCENARIOS = 500
+
 
 class AgentRunRequest(BaseModel):
     agents: Optional[List[str]] = Field(
@@ -28,12 +30,19 @@ class AgentRunResponse(BaseModel):
     run_at: datetime
     agents: List[str]
     payload: Mapping[str, object]
+    durations_ms: Mapping[str, float] = Field(default_factory=dict)
+    errors: Mapping[str, str] = Field(default_factory=dict, description="Agents that failed or timed out.")
 
 
 class AgentStatusResponse(BaseModel):
     agent: str
     last_run: Optional[datetime]
+    last_success: Optional[datetime] = None
     records: int
+    duration_ms: Optional[float] = None
+    stale: bool = Field(default=False, description="A rerun has been requested but has not finished yet.")
+    pending_since: Optional[datetime] = None
+    last_error: Optional[str] = None
 
 
 class PortalOrderCreateRequest(BaseModel):
@@ -124,6 +133,10 @@ class EventResponse(BaseModel):
 
 class EventListResponse(BaseModel):
     events: List[EventResponse]
+    next_before: Optional[int] = Field(
+        default=None,
+        description="Byte-offset cursor for the previous page (pass as ?before=); null at the start of the log.",
+    )
 
 
 class SlaEvaluateRequest(BaseModel):
@@ -175,6 +188,16 @@ class SlaPolicyResponse(BaseModel):
     specs: List[SlaSpecPayload]
 
 
+class SlaPortfolioResponse(BaseModel):
+    evaluated_at: datetime
+    policy_version: str
+    order_count: int
+    total_credits: float
+    specs: Mapping[str, List[Any]] = Field(description="Per-spec columns: spec_name, metric, evaluated, passed, pass_rate, credits.")
+    orders: Mapping[str, List[Any]] = Field(description="Per-order columns: order_id, total_credits, breaches, volume_tier.")
+    tiers: Mapping[str, int]
+
+
 class ComplianceAlert(BaseModel):
     patient_id: str
     supply_sku: str
@@ -222,6 +245,11 @@ class PatientLinkSessionResponse(BaseModel):
     order_summary: Mapping[str, object]
 
 
+class InventoryScenarioLever(BaseModel):
+    growth_percent: float = Field(default=0.0, ge=-100.0, le=500.0)
+    lead_time_delta: int = Field(default=0, ge=-30, le=120)
+
+
 class InventoryScenarioRequest(BaseModel):
     growth_percent: float = Field(
         default=0.0,
@@ -239,6 +267,30 @@ class InventoryScenarioRequest(BaseModel):
         default=None,
         description="Optional list of SKUs to scope the scenario output.",
     )
+    scenarios: Optional[List[InventoryScenarioLever]] = Field(
+        default=None,
+        description="Batch mode: evaluate each lever pair against one shared baseline.",
+        max_length=MAX_INVENTORY_SCENARIOS,
+    )
+    growth_percents: Optional[List[float]] = Field(
+        default=None,
+        description="Batch mode: growth values crossed with lead_time_deltas into a grid.",
+    )
+    lead_time_deltas: Optional[List[int]] = Field(
+        default=None,
+        description="Batch mode: lead-time deltas crossed with growth_percents into a grid.",
+    )
+    simulate: bool = Field(
+        default=False,
+        description="Add Monte-Carlo safety_stock and stockout_probability to every forecast.",
+    )
+    service_level: float = Field(default=0.95, gt=0.5, lt=1.0)
+    paths: int = Field(default=2000, ge=100, le=10000, description="Simulated demand paths per SKU.")
+    seed: Optional[int] = Field(default=None, description="RNG seed; the same seed reproduces the same draws.")
+
+    @property
+    def is_batch(self) -> bool:
+        return bool(self.scenarios or self.growth_percents or self.lead_time_deltas)
 
 
 class InventoryScenarioResponse(BaseModel):
@@ -252,6 +304,21 @@ class InventoryScenarioResponse(BaseModel):
     deltas: Mapping[str, Mapping[str, float]]
 
 
+class InventoryScenarioResult(BaseModel):
+    growth_percent: float
+    lead_time_delta: int
+    lead_time_applied: int
+    scenario: Mapping[str, Mapping[str, Any]]
+    deltas: Mapping[str, Mapping[str, float]]
+
+
+class InventoryScenarioBatchResponse(BaseModel):
+    generated_at: datetime
+    skus: List[str]
+    baseline: Mapping[str, Mapping[str, Any]]
+    scenarios: List[InventoryScenarioResult]
+
+
 class PayerEligibilityRequest(BaseModel):
     patient_id: str
     payer_id: str
@@ -420,6 +487,7 @@ class WebhookOutboxEntry(BaseModel):
     delivered_at: Optional[datetime]
     updated_at: Optional[datetime]
     error: Optional[str]
+    next_attempt_at: Optional[datetime] = None
 
 
 class WebhookOutboxListResponse(BaseModel):
@@ -2,18 +2,24 @@
 from __future__ import annotations
 
 import json
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field, ValidationError
 
-from backend.events import load_events_for_order
+from backend.events import tail_order_events
 from backend.tasks import TaskStore
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from backend.sla_portfolio import SlaPortfolio
+
 POLICY_FILE = "sla_policy.json"
 DEFAULT_POLICY_VERSION = "2024-Q4"
+MAX_CACHED_ORDERS = 10_000
 
 
 class CreditRule(BaseModel):
@@ -174,86 +180,139 @@ def _to_datetime(value: Any) -> Optional[datetime]:
         return None
 
 
-def _filter_events(events: Iterable[Mapping[str, Any]], topics: Sequence[str]) -> List[Mapping[str, Any]]:
-    desired = {topic.lower() for topic in topics}
-    filtered = [event for event in events if str(event.get("topic", "")).lower() in desired]
-    return filtered
-
-
-def _first_event_timestamp(events: Iterable[Mapping[str, Any]], topics: Sequence[str]) -> Optional[datetime]:
-    filtered = _filter_events(events, topics)
-    timestamps = [_to_datetime(event.get("timestamp")) for event in filtered]
-    timestamps = [stamp for stamp in timestamps if stamp]
-    return min(timestamps) if timestamps else None
-
-
-def _last_event_timestamp(events: Iterable[Mapping[str, Any]], topics: Sequence[str]) -> Optional[datetime]:
-    filtered = _filter_events(events, topics)
-    timestamps = [_to_datetime(event.get("timestamp")) for event in filtered]
-    timestamps = [stamp for stamp in timestamps if stamp]
-    return max(timestamps) if timestamps else None
-
+DELIVERY_START_TOPICS = frozenset({"order.approved", "order.created"})
+DELIVERED_TOPICS = frozenset({"shipment.delivered", "order.fulfilled"})
+PAID_TOPICS = frozenset({"claim.paid", "order.paid"})
+LAPSE_TOPICS = frozenset({"order.lapsed", "compliance.lapsed", "audit.failed"})
+AUDIT_READY_TOPICS = frozenset({"audit.ready", "audit.vaulted", "audit.package_generated"})
+STATUS_TOPICS = frozenset({"order.status", "status.live", "shipment.delivered", "order.updated", "tracking.updated"})
+REWORK_TASK_TYPES = frozenset({"compliance_review", "sla_breach", "rework"})
 
-def _extract_first_pass(events: Iterable[Mapping[str, Any]]) -> float:
-    for event in events:
-        if str(event.get("topic", "")).lower() == "order.first_pass":
-            payload = event.get("payload", {})
-            success = bool(payload.get("success", True))
-            return 1.0 if success else 0.0
-    for event in events:
-        if str(event.get("topic", "")).lower() == "task.created":
-            payload = event.get("payload", {})
-            if payload.get("task_type") in {"compliance_review", "sla_breach", "rework"}:
-                return 0.0
-    return 1.0
 
-
-def _compute_delivery_hours(events: Sequence[Mapping[str, Any]]) -> Optional[float]:
-    start = _first_event_timestamp(events, ["order.approved", "order.created"])
-    delivered = _first_event_timestamp(events, ["shipment.delivered", "order.fulfilled"])
-    if not start or not delivered:
-        return None
-    return (delivered - start).total_seconds() / 3600.0
+def _earliest(current: Optional[datetime], stamp: Optional[datetime]) -> Optional[datetime]:
+    if stamp is None:
+        return current
+    return stamp if current is None or stamp < current else current
 
 
-def _compute_dso_days(events: Sequence[Mapping[str, Any]]) -> Optional[float]:
-    fulfilled = _first_event_timestamp(events, ["shipment.delivered", "order.fulfilled"])
-    paid = _first_event_timestamp(events, ["claim.paid", "order.paid"])
-    if not fulfilled or not paid:
-        return None
-    return (paid - fulfilled).days + (paid - fulfilled).seconds / 86400.0
+def _latest(current: Optional[datetime], stamp: Optional[datetime]) -> Optional[datetime]:
+    if stamp is None:
+        return current
+    return stamp if current is None or stamp > current else current
 
 
-def _has_compliance_lapse(events: Sequence[Mapping[str, Any]]) -> bool:
-    for event in events:
+@dataclass
+class SlaState:
+    """Compact summary of one order's timeline holding everything the metrics need.
+
+    ``fold`` is O(1) per event. Apart from ``event_count`` it is idempotent, so
+    an event folded twice does not change the score.
+    """
+
+    order_id: str = ""
+    fallback_order_id: str = "UNKNOWN"
+    event_count: int = 0
+    first_start: Optional[datetime] = None
+    first_delivered: Optional[datetime] = None
+    first_paid: Optional[datetime] = None
+    latest_status: Optional[datetime] = None
+    latest_event: Optional[datetime] = None
+    first_pass: Optional[bool] = None
+    first_pass_key: str = ""
+    rework_requested: bool = False
+    lapsed: bool = False
+    audit_ready: bool = False
+
+    @classmethod
+    def from_events(cls, events: Iterable[Mapping[str, Any]]) -> "SlaState":
+        state = cls()
+        for event in events:
+            state.fold(event)
+        return state
+
+    def fold(self, event: Mapping[str, Any]) -> None:
         topic = str(event.get("topic", "")).lower()
-        if topic in {"order.lapsed", "compliance.lapsed", "audit.failed"}:
-            return True
-    return False
+        payload = event.get("payload", {})
+        if not isinstance(payload, Mapping):
+            payload = {}
+        if self.event_count == 0:
+            self.fallback_order_id = str(payload.get("order_id", "UNKNOWN"))
+        if not self.order_id:
+            self.order_id = str(payload.get("order_id", ""))
+        self.event_count += 1
+
+        stamp = _to_datetime(event.get("timestamp"))
+        if stamp is not None and stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        self.latest_event = _latest(self.latest_event, stamp)
+        if topic in DELIVERY_START_TOPICS:
+            self.first_start = _earliest(self.first_start, stamp)
+        if topic in DELIVERED_TOPICS:
+            self.first_delivered = _earliest(self.first_delivered, stamp)
+        if topic in PAID_TOPICS:
+            self.first_paid = _earliest(self.first_paid, stamp)
+        if topic in STATUS_TOPICS:
+            self.latest_status = _latest(self.latest_status, stamp)
+        if topic == "order.first_pass":
+            # Timelines are read in timestamp order, so the earliest outcome wins.
+            key = str(event.get("timestamp") or "")
+            if self.first_pass is None or key < self.first_pass_key:
+                self.first_pass = bool(payload.get("success", True))
+                self.first_pass_key = key
+        elif topic == "task.created" and payload.get("task_type") in REWORK_TASK_TYPES:
+            self.rework_requested = True
+        elif topic in LAPSE_TOPICS:
+            self.lapsed = True
+        elif topic in AUDIT_READY_TOPICS:
+            self.audit_ready = True
+
+    def merge(self, other: "SlaState") -> None:
+        """Combine with a state folded from events that follow this one's in the log."""
+
+        if other.event_count == 0:
+            return
+        if self.event_count == 0:
+            self.fallback_order_id = other.fallback_order_id
+        if not self.order_id:
+            self.order_id = other.order_id
+        self.event_count += other.event_count
+        self.first_start = _earliest(self.first_start, other.first_start)
+        self.first_delivered = _earliest(self.first_delivered, other.first_delivered)
+        self.first_paid = _earliest(self.first_paid, other.first_paid)
+        self.latest_status = _latest(self.latest_status, other.latest_status)
+        self.latest_event = _latest(self.latest_event, other.latest_event)
+        if other.first_pass is not None and (self.first_pass is None or other.first_pass_key < self.first_pass_key):
+            self.first_pass = other.first_pass
+            self.first_pass_key = other.first_pass_key
+        self.rework_requested = self.rework_requested or other.rework_requested
+        self.lapsed = self.lapsed or other.lapsed
+        self.audit_ready = self.audit_ready or other.audit_ready
+
+    @property
+    def resolved_order_id(self) -> str:
+        return self.order_id or self.fallback_order_id
+
+    def first_pass_ratio(self) -> float:
+        if self.first_pass is not None:
+            return 1.0 if self.first_pass else 0.0
+        return 0.0 if self.rework_requested else 1.0
+
+    def delivery_hours(self) -> Optional[float]:
+        if not self.first_start or not self.first_delivered:
+            return None
+        return (self.first_delivered - self.first_start).total_seconds() / 3600.0
 
+    def dso_days(self) -> Optional[float]:
+        if not self.first_delivered or not self.first_paid:
+            return None
+        delta = self.first_paid - self.first_delivered
+        return delta.days + delta.seconds / 86400.0
 
-def _is_audit_ready(events: Sequence[Mapping[str, Any]]) -> bool:
-    for event in events:
-        topic = str(event.get("topic", "")).lower()
-        if topic in {"audit.ready", "audit.vaulted", "audit.package_generated"}:
-            return True
-    return False
-
-
-def _status_latency_hours(events: Sequence[Mapping[str, Any]], evaluated_at: datetime) -> Optional[float]:
-    latest = _last_event_timestamp(events, [
-        "order.status",
-        "status.live",
-        "shipment.delivered",
-        "order.updated",
-        "tracking.updated",
-    ])
-    if not latest:
-        latest = _last_event_timestamp(events, [event.get("topic", "") for event in events])
-    if not latest:
-        return None
-    delta = evaluated_at - latest
-    return max(delta.total_seconds() / 3600.0, 0.0)
+    def status_latency_hours(self, evaluated_at: datetime) -> Optional[float]:
+        latest = self.latest_status or self.latest_event
+        if not latest:
+            return None
+        return max((evaluated_at - latest).total_seconds() / 3600.0, 0.0)
 
 
 def determine_volume_tier(passed: int, total: int) -> str:
@@ -282,23 +341,32 @@ def evaluate(
 
     if not order_events:
         raise ValueError("No order events provided for SLA evaluation.")
+    return evaluate_state(
+        SlaState.from_events(order_events),
+        policy=policy,
+        policy_version=policy_version,
+        evaluated_at=evaluated_at,
+    )
+
+
+def evaluate_state(
+    state: SlaState,
+    *,
+    policy: Optional[Sequence[SlaSpec]] = None,
+    policy_version: str | None = None,
+    evaluated_at: Optional[datetime] = None,
+) -> SlaScore:
+    """Score a folded ``SlaState``; cost does not depend on timeline length."""
+
+    if state.event_count == 0:
+        raise ValueError("No order events provided for SLA evaluation.")
 
     evaluated_at = evaluated_at or datetime.now(timezone.utc)
     policy_bundle = _PolicyBundle(
         version=policy_version or DEFAULT_POLICY_VERSION,
         specs=list(policy or DEFAULT_SPECS),
     )
-
-    order_id = ""
-    normalized_events = []
-    for event in order_events:
-        candidate = dict(event)
-        payload = candidate.get("payload", {})
-        if isinstance(payload, Mapping) and not order_id:
-            order_id = str(payload.get("order_id", ""))
-        normalized_events.append(candidate)
-    if not order_id:
-        order_id = str(order_events[0].get("payload", {}).get("order_id", "UNKNOWN"))
+    order_id = state.resolved_order_id
 
     metric_results: List[SlaMetricScore] = []
     breaches: List[SlaBreach] = []
@@ -310,21 +378,21 @@ def evaluate(
         notes: Optional[str] = None
 
         if spec.metric == "delivery_time_hours":
-            observed = _compute_delivery_hours(normalized_events)
+            observed = state.delivery_hours()
             if observed is None:
                 passed = False
                 notes = "Missing delivery confirmation event."
             else:
                 passed = observed <= float(spec.threshold)
         elif spec.metric == "first_pass_ratio":
-            value = _extract_first_pass(normalized_events)
+            value = state.first_pass_ratio()
             observed = round(value, 3)
             passed = observed >= float(spec.threshold)
         elif spec.metric == "compliance_lapses":
-            observed = 1 if _has_compliance_lapse(normalized_events) else 0
+            observed = 1 if state.lapsed else 0
             passed = observed <= int(spec.threshold)
         elif spec.metric == "dso_days":
-            dso = _compute_dso_days(normalized_events)
+            dso = state.dso_days()
             observed = None if dso is None else round(dso, 2)
             if observed is None:
                 passed = False
@@ -332,10 +400,10 @@ def evaluate(
             else:
                 passed = observed <= float(spec.threshold)
         elif spec.metric == "audit_readiness":
-            observed = 1.0 if _is_audit_ready(normalized_events) else 0.0
+            observed = 1.0 if state.audit_ready else 0.0
             passed = observed >= float(spec.threshold)
         elif spec.metric == "status_latency_hours":
-            latency = _status_latency_hours(normalized_events, evaluated_at)
+            latency = state.status_latency_hours(evaluated_at)
             observed = None if latency is None else round(latency, 2)
             if observed is None:
                 passed = False
@@ -419,13 +487,21 @@ class SlaService:
         dispatcher,
         task_store: TaskStore,
         auto_subscribe: bool = True,
+        max_cached_orders: int = MAX_CACHED_ORDERS,
     ) -> None:
         self.data_dir = Path(data_dir)
         self.dispatcher = dispatcher
         self.task_store = task_store
+        self.max_cached_orders = max_cached_orders
         bundle = load_policy(self.data_dir)
         self.policy_version = bundle.version
         self.policy = bundle.specs
+        # Folded per-order state, least recently used first, and the log
+        # position each one has read up to. Orders evicted here are rebuilt
+        # from the event log the next time they are scored.
+        self._states: "OrderedDict[str, SlaState]" = OrderedDict()
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.RLock()
         if auto_subscribe:
             dispatcher.subscribe("*", self._handle_event)
 
@@ -435,27 +511,74 @@ class SlaService:
         self.policy = bundle.specs
 
     def score(self, order_id: str, *, emit: bool = False) -> Optional[SlaScore]:
-        events = load_events_for_order(self.data_dir, order_id)
-        if not events:
-            return None
-        score = evaluate(
-            events,
-            policy=self.policy,
-            policy_version=self.policy_version,
-        )
+        # Queued events must be folded in (or, for a cold order, be in the log) first.
+        self.dispatcher.flush()
+        with self._lock:
+            state = self._state(order_id, load=True)
+            if state is None:
+                return None
+            score = self._evaluate(state)
         if emit:
             self._emit(score)
         return score
 
+    def portfolio(self, *, workers: Optional[int] = None) -> "SlaPortfolio":
+        """Score every order in the log in one pass (see ``backend.sla_portfolio``)."""
+
+        from backend.sla_portfolio import score_portfolio
+
+        self.dispatcher.wait_until_written()
+        return score_portfolio(
+            self.data_dir,
+            policy=self.policy,
+            policy_version=self.policy_version,
+            workers=workers,
+        )
+
+    def _evaluate(self, state: SlaState) -> SlaScore:
+        return evaluate_state(state, policy=self.policy, policy_version=self.policy_version)
+
+    def _state(self, order_id: str, *, load: bool) -> Optional[SlaState]:
+        """Return the order's state, first folding in anything logged since it was last read.
+
+        Tailing the log rather than trusting the dispatcher picks up events
+        published by other processes, e.g. ``cli.py compliance-scan``.
+        """
+
+        state = self._states.get(order_id)
+        if state is None and not load:
+            return None
+        events, position = tail_order_events(self.data_dir, order_id, self._positions.get(order_id, 0))
+        if state is None:
+            if not events:
+                return None
+            state = self._states[order_id] = SlaState()
+            while len(self._states) > self.max_cached_orders:
+                evicted, _ = self._states.popitem(last=False)
+                self._positions.pop(evicted, None)
+        else:
+            self._states.move_to_end(order_id)
+        for event in sorted(events, key=lambda item: str(item.get("timestamp", ""))):
+            state.fold(event)
+        self._positions[order_id] = position
+        return state
+
     def _handle_event(self, event: Mapping[str, Any]) -> None:
         topic = str(event.get("topic", ""))
-        if topic.startswith("sla."):
-            return
         payload = event.get("payload", {}) or {}
-        order_id = payload.get("order_id")
+        order_id = payload.get("order_id") if isinstance(payload, Mapping) else None
         if not order_id:
             return
-        self.score(str(order_id), emit=True)
+        scored = not topic.startswith("sla.")
+        with self._lock:
+            # The event is already in the log, so tailing it folds this event
+            # along with anything other processes wrote before it.
+            state = self._state(str(order_id), load=scored)
+            if state is None:
+                return
+            score = self._evaluate(state) if scored else None
+        if score is not None:
+            self._emit(score)
 
     def _emit(self, score: SlaScore) -> None:
         payload = score.dict()
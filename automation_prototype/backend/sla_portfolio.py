@@ -0,0 +1,220 @@
+"""Score every order in the event log in one pass and summarise the results."""
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from automation.utils import process_pool_context
+from backend.event_segments import EventSegmentStore
+from backend.events import EVENT_LOG_FILE
+from backend.sla import DEFAULT_POLICY_VERSION, SlaScore, SlaSpec, SlaState, evaluate_state, load_policy
+
+CHUNK_BYTES = 16 * 1024 * 1024
+# Below this much log the process pool costs more than it saves.
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+VOLUME_TIERS = ("platinum", "gold", "silver", "bronze", "standard", "unknown")
+
+# ("segment", log_path, manifest_entry) or ("range", log_path, start, end)
+_Source = Tuple[object, ...]
+
+
+@dataclass
+class SlaPortfolio:
+    """Column-oriented SLA results for a set of orders."""
+
+    evaluated_at: datetime
+    policy_version: str
+    specs: Mapping[str, List[object]]
+    orders: Mapping[str, List[object]]
+    tiers: Mapping[str, int]
+
+    @property
+    def total_credits(self) -> float:
+        return round(sum(self.orders["total_credits"]), 2)
+
+    def to_dict(self) -> Mapping[str, object]:
+        return {
+            "evaluated_at": self.evaluated_at.isoformat(),
+            "policy_version": self.policy_version,
+            "order_count": len(self.orders["order_id"]),
+            "total_credits": self.total_credits,
+            "specs": dict(self.specs),
+            "orders": dict(self.orders),
+            "tiers": dict(self.tiers),
+        }
+
+
+# ----------------------------------------------------------------------
+# Folding the log
+# ----------------------------------------------------------------------
+def _fold_lines(lines: Iterable[bytes]) -> Dict[str, SlaState]:
+    states: Dict[str, SlaState] = {}
+    for raw in lines:
+        try:
+            event = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if not isinstance(event, Mapping):
+            continue
+        payload = event.get("payload")
+        order_id = payload.get("order_id") if isinstance(payload, Mapping) else None
+        if not isinstance(order_id, str) or not order_id:
+            continue
+        state = states.get(order_id)
+        if state is None:
+            state = states[order_id] = SlaState()
+        state.fold(event)
+    return states
+
+
+def _read_range(path: Path, start: int, end: int) -> Iterable[bytes]:
+    with path.open("rb") as handle:
+        handle.seek(start)
+        return handle.read(end - start).splitlines()
+
+
+def _fold_source(source: _Source) -> Dict[str, SlaState]:
+    kind, log_path = source[0], Path(str(source[1]))
+    if kind == "segment":
+        return _fold_lines(EventSegmentStore.for_log(log_path).read_lines(source[2]))  # type: ignore[arg-type]
+    return _fold_lines(_read_range(log_path, int(source[2]), int(source[3])))  # type: ignore[arg-type]
+
+
+def _line_ranges(path: Path, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split the complete lines of ``path`` into ranges of roughly ``chunk_bytes``."""
+
+    if not path.exists():
+        return []
+    ranges: List[Tuple[int, int]] = []
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        start = 0
+        while start < size:
+            handle.seek(min(start + chunk_bytes, size) - 1)
+            # Extend to the end of the line the chunk boundary falls in; a
+            # trailing line without a newline is still being written.
+            tail = handle.readline()
+            end = handle.tell() if tail.endswith(b"\n") else handle.tell() - len(tail)
+            if end <= start:
+                break
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _sources(log_path: Path, chunk_bytes: int) -> Tuple[List[_Source], int]:
+    sources: List[_Source] = []
+    total = 0
+    for entry in EventSegmentStore.for_log(log_path).entries():
+        sources.append(("segment", str(log_path), entry))
+        total += int(entry.get("bytes") or 0)
+    for start, end in _line_ranges(log_path, chunk_bytes):
+        sources.append(("range", str(log_path), start, end))
+        total += end - start
+    return sources, total
+
+
+def fold_orders(
+    data_dir: Path,
+    *,
+    workers: Optional[int] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Dict[str, SlaState]:
+    """Fold the whole log (sealed segments, then the active file) into per-order state.
+
+    Sources are folded independently, across a process pool when the log is
+    large, and merged back in log order so results match per-order scoring.
+    """
+
+    log_path = Path(data_dir) / EVENT_LOG_FILE
+    sources, total = _sources(log_path, chunk_bytes)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if total >= PARALLEL_MIN_BYTES else 1
+    if workers > 1 and len(sources) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sources)), mp_context=process_pool_context()) as pool:
+            partials = list(pool.map(_fold_source, sources))
+    else:
+        partials = [_fold_source(source) for source in sources]
+
+    states: Dict[str, SlaState] = {}
+    for partial in partials:
+        for order_id, state in partial.items():
+            current = states.get(order_id)
+            if current is None:
+                states[order_id] = state
+            else:
+                current.merge(state)
+    return states
+
+
+# ----------------------------------------------------------------------
+# Scoring and summary
+# ----------------------------------------------------------------------
+def summarize(
+    scores: Sequence[SlaScore],
+    specs: Sequence[SlaSpec],
+    *,
+    policy_version: str,
+    evaluated_at: datetime,
+) -> SlaPortfolio:
+    names = [spec.name for spec in specs]
+    evaluated = Counter()
+    passed = Counter()
+    credits: Counter = Counter()
+    for score in scores:
+        for metric in score.metrics:
+            evaluated[metric.spec_name] += 1
+            if metric.passed:
+                passed[metric.spec_name] += 1
+            credits[metric.spec_name] += metric.credits
+    spec_columns = {
+        "spec_name": names,
+        "metric": [spec.metric for spec in specs],
+        "evaluated": [evaluated[name] for name in names],
+        "passed": [passed[name] for name in names],
+        "pass_rate": [round(passed[name] / evaluated[name], 4) if evaluated[name] else None for name in names],
+        "credits": [round(credits[name], 2) for name in names],
+    }
+    order_columns = {
+        "order_id": [score.order_id for score in scores],
+        "total_credits": [score.total_credits for score in scores],
+        "breaches": [len(score.breaches) for score in scores],
+        "volume_tier": [score.volume_tier for score in scores],
+    }
+    tiers = Counter(score.volume_tier for score in scores)
+    return SlaPortfolio(
+        evaluated_at=evaluated_at,
+        policy_version=policy_version,
+        specs=spec_columns,
+        orders=order_columns,
+        tiers={tier: tiers.get(tier, 0) for tier in VOLUME_TIERS},
+    )
+
+
+def score_portfolio(
+    data_dir: Path,
+    *,
+    policy: Optional[Sequence[SlaSpec]] = None,
+    policy_version: Optional[str] = None,
+    workers: Optional[int] = None,
+    evaluated_at: Optional[datetime] = None,
+) -> SlaPortfolio:
+    """Score every order in the log; the policy defaults to the one stored in ``data_dir``."""
+
+    if policy is None:
+        bundle = load_policy(data_dir)
+        policy, policy_version = bundle.specs, bundle.version
+    policy_version = policy_version or DEFAULT_POLICY_VERSION
+    evaluated_at = evaluated_at or datetime.now(timezone.utc)
+    states = fold_orders(data_dir, workers=workers)
+    scores = [
+        evaluate_state(states[order_id], policy=policy, policy_version=policy_version, evaluated_at=evaluated_at)
+        for order_id in sorted(states)
+    ]
+    return summarize(scores, policy, policy_version=policy_version, evaluated_at=evaluated_at)
@@ -0,0 +1,296 @@
+"""Pluggable record storage shared by the JSON-backed stores."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from backend.config import StorageConfig, load_infrastructure_config
+
+STORAGE_BACKENDS = {"json", "sqlite"}
+DEFAULT_SQLITE_FILE = "automation.sqlite3"
+STORE_MIGRATIONS = "backend.migrations.store"
+STORE_HISTORY_TABLE = "store_schema_history"
+
+
+@dataclass(frozen=True)
+class CollectionSpec:
+    """Shape of one record collection: its id field and the fields worth indexing."""
+
+    name: str
+    id_field: str
+    indexed: Tuple[str, ...] = ()
+
+    @property
+    def table(self) -> str:
+        return f"store_{self.name}"
+
+    @staticmethod
+    def column(field_path: str) -> str:
+        return field_path.replace(".", "_")
+
+
+COLLECTIONS: Mapping[str, CollectionSpec] = {
+    "tasks": CollectionSpec(
+        "tasks",
+        "id",
+        ("status", "task_type", "metadata.order_id", "metadata.compliance_key", "metadata.sla_key"),
+    ),
+    "portal_orders": CollectionSpec("portal_orders", "id", ("status", "patient_id")),
+    "partner_orders": CollectionSpec("partner_orders", "order_id", ("partner_id", "status")),
+    "patient_links": CollectionSpec("patient_links", "token", ("patient_id", "order_id")),
+    "webhooks": CollectionSpec("webhooks", "id"),
+}
+
+
+def _field_value(record: Mapping[str, object], field_path: str) -> Optional[str]:
+    value: object = record
+    for part in field_path.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(part)
+    return None if value is None else str(value)
+
+
+# ----------------------------------------------------------------------
+# SQLite implementation
+# ----------------------------------------------------------------------
+class SqliteCollection:
+    """One collection stored as JSON bodies plus indexed scalar columns.
+
+    Every write bumps a per-table ``rev`` counter so stores in other processes
+    can pull just the rows changed since their last sync. Deletes leave a
+    tombstone (``body`` is NULL) for the same reason.
+    """
+
+    def __init__(self, storage: "SqliteStorage", spec: CollectionSpec) -> None:
+        self.storage = storage
+        self.spec = spec
+        columns = [CollectionSpec.column(path) for path in spec.indexed]
+        table = spec.table
+        self._columns = columns
+        self._upsert_sql = (
+            f"INSERT INTO {table} (id, rev, body{''.join(', ' + name for name in columns)}) "
+            f"VALUES (?, ?, ?{', ?' * len(columns)}) "
+            f"ON CONFLICT(id) DO UPDATE SET rev = excluded.rev, body = excluded.body"
+            + "".join(f", {name} = excluded.{name}" for name in columns)
+        )
+        self._delete_sql = f"UPDATE {table} SET rev = ?, body = NULL WHERE id = ?"
+        self._max_rev_sql = f"SELECT COALESCE(MAX(rev), 0) FROM {table}"
+        self._changes_sql = f"SELECT id, body, rev FROM {table} WHERE rev > ? ORDER BY rev"
+        self._all_sql = f"SELECT id, body, rev FROM {table} ORDER BY seq"
+        self._get_sql = f"SELECT body FROM {table} WHERE id = ? AND body IS NOT NULL"
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        # Tables come from backend/migrations/store; fail loudly if a spec outgrew them.
+        rows = self.storage.connection().execute(f"PRAGMA table_info({self.spec.table})").fetchall()
+        missing = sorted({"id", "rev", "body", *self._columns} - {row[1] for row in rows})
+        if missing:
+            raise RuntimeError(
+                f"{self.spec.table} lacks columns {missing}; add a migration under backend/migrations/store"
+            )
+
+    def _row(self, record: Mapping[str, object], rev: int) -> Tuple[object, ...]:
+        record_id = str(record.get(self.spec.id_field))
+        body = json.dumps(record, separators=(",", ":"), default=str)
+        return (record_id, rev, body, *(_field_value(record, path) for path in self.spec.indexed))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def put_many(self, records: Sequence[Mapping[str, object]]) -> int:
+        """Upsert ``records`` in one transaction and return the last revision written."""
+
+        if not records:
+            return 0
+        with self.storage.transaction() as connection:
+            rev = connection.execute(self._max_rev_sql).fetchone()[0]
+            rows = [self._row(record, rev + offset) for offset, record in enumerate(records, start=1)]
+            connection.executemany(self._upsert_sql, rows)
+        return rev + len(records)
+
+    def import_if_empty(self, read: Callable[[], Iterable[Mapping[str, object]]]) -> int:
+        """Seed a never-written table from ``read()`` (the store's JSON file); returns rows imported.
+
+        Checked again inside the write transaction, so concurrent first opens import once.
+        """
+
+        if self.storage.connection().execute(self._max_rev_sql).fetchone()[0]:
+            return 0
+        records = sorted(read(), key=lambda item: str(item.get("created_at", "")))
+        if not records:
+            return 0
+        with self.storage.transaction() as connection:
+            if connection.execute(self._max_rev_sql).fetchone()[0]:
+                return 0
+            connection.executemany(
+                self._upsert_sql, [self._row(record, rev) for rev, record in enumerate(records, start=1)]
+            )
+        return len(records)
+
+    def put(self, record: Mapping[str, object]) -> int:
+        return self.put_many([record])
+
+    def delete(self, record_id: str) -> None:
+        with self.storage.transaction() as connection:
+            rev = connection.execute(self._max_rev_sql).fetchone()[0]
+            connection.execute(self._delete_sql, (rev + 1, str(record_id)))
+
+    def get(self, record_id: str) -> Optional[Mapping[str, object]]:
+        row = self.storage.connection().execute(self._get_sql, (str(record_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, field_path: str, value: object) -> List[Mapping[str, object]]:
+        if field_path not in self.spec.indexed:
+            raise ValueError(f"{field_path} is not indexed on {self.spec.name}")
+        sql = (
+            f"SELECT body FROM {self.spec.table} "
+            f"WHERE {CollectionSpec.column(field_path)} = ? AND body IS NOT NULL ORDER BY seq"
+        )
+        rows = self.storage.connection().execute(sql, (str(value),)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def load_all(self) -> Tuple[List[Mapping[str, object]], int]:
+        """Return live records in insertion order plus the current revision."""
+
+        records: List[Mapping[str, object]] = []
+        latest = 0
+        for _, body, rev in self.storage.connection().execute(self._all_sql):
+            latest = max(latest, rev)
+            if body is not None:
+                records.append(json.loads(body))
+        return records, latest
+
+    def changes(self, since: int) -> Tuple[List[Tuple[str, Optional[Mapping[str, object]]]], int]:
+        """Return ``(id, record-or-None)`` pairs written after revision ``since``."""
+
+        changed: List[Tuple[str, Optional[Mapping[str, object]]]] = []
+        latest = since
+        for record_id, body, rev in self.storage.connection().execute(self._changes_sql, (since,)):
+            changed.append((record_id, json.loads(body) if body is not None else None))
+            latest = rev
+        return changed, latest
+
+
+class SqliteStorage:
+    """SQLite database in WAL mode with one connection per thread.
+
+    Opening it applies the ``backend.migrations.store`` migrations, recorded
+    in their own ``store_schema_history`` table.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._collections: Dict[str, SqliteCollection] = {}
+        self._lock = threading.Lock()
+        self.migrate()
+
+    def migrate(self) -> List[Mapping[str, object]]:
+        """Apply pending store migrations and return the versions that ran."""
+
+        from backend.migrations import MigrationRunner, discover_migrations
+
+        runner = MigrationRunner(
+            f"sqlite:///{self.path}",
+            history_table=STORE_HISTORY_TABLE,
+            migrations=discover_migrations(STORE_MIGRATIONS),
+        )
+        return runner.apply()
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # isolation_level=None leaves transaction control to ``transaction``.
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def transaction(self) -> "_Transaction":
+        return _Transaction(self.connection())
+
+    def collection(self, name: str) -> SqliteCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = SqliteCollection(self, COLLECTIONS[name])
+                self._collections[name] = collection
+            return collection
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` block so concurrent writers serialize on the write lock."""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# ----------------------------------------------------------------------
+# Factory and importer
+# ----------------------------------------------------------------------
+_STORAGE: Dict[str, SqliteStorage] = {}
+_STORAGE_LOCK = threading.Lock()
+
+
+def open_storage(data_dir: Path, config: StorageConfig | None = None) -> Optional[SqliteStorage]:
+    """Return the configured storage, or ``None`` when stores keep their JSON files."""
+
+    config = config or load_infrastructure_config().storage
+    if config.backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{config.backend}'")
+    if config.backend == "json":
+        return None
+    path = Path(config.sqlite_path) if config.sqlite_path else Path(data_dir) / DEFAULT_SQLITE_FILE
+    key = str(path.resolve())
+    with _STORAGE_LOCK:
+        storage = _STORAGE.get(key)
+        if storage is None:
+            storage = SqliteStorage(path)
+            _STORAGE[key] = storage
+        return storage
+
+
+def import_json_stores(data_dir: Path, storage: SqliteStorage) -> Mapping[str, int]:
+    """Copy every JSON store under ``data_dir`` into ``storage``; returns counts per collection."""
+
+    from backend.partners import PartnerOrderStore
+    from backend.patient_links import PatientLinkStore
+    from backend.portal import PortalOrderStore
+    from backend.tasks import TaskStore
+    from backend.webhooks import WebhookRegistry
+
+    data_dir = Path(data_dir)
+    sources: Dict[str, Iterable[Mapping[str, object]]] = {
+        "tasks": TaskStore(data_dir).list_tasks(),
+        "portal_orders": PortalOrderStore(data_dir).list_orders(),
+        "partner_orders": PartnerOrderStore(data_dir).list_orders(),
+        "patient_links": PatientLinkStore(data_dir).list_links(),
+        "webhooks": WebhookRegistry(data_dir).list(),
+    }
+    counts: Dict[str, int] = {}
+    for name, records in sources.items():
+        # Oldest first so insertion order in the table matches the JSON files.
+        ordered = sorted(records, key=lambda item: str(item.get("created_at", "")))
+        storage.collection(name).put_many(ordered)
+        counts[name] = len(ordered)
+    return counts
@@ -3,16 +3,25 @@ from __future__ import annotations
 
 import json
 import threading
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Mapping, MutableMapping, Optional, Sequence
+from typing import TYPE_CHECKING, Dict, Hashable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
 from automation import utils as automation_utils
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from backend.storage import SqliteStorage
+
 TASK_FILE = "tasks.json"
 DEFAULT_SLA_HOURS = 24
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+JOURNAL_COMPACT_SECONDS = 60.0
+OPEN_STATUSES = frozenset({"open", "in_progress"})
+INDEXED_METADATA_KEYS = ("order_id", "compliance_key", "sla_key", "sla_order_id", "claim_id")
+_MISSING = object()
 
 
 def _parse_iso(value: str) -> Optional[datetime]:
@@ -60,41 +69,148 @@ class Task:
 
 
 class TaskStore:
-    def __init__(self, data_dir: Path) -> None:
+    """Task queue persisted as a JSON snapshot plus an append-only journal.
+
+    In journal mode every mutation appends one compact record to
+    ``tasks.journal.jsonl``; a background compactor folds the journal into
+    ``tasks.json`` once it grows past ``compact_bytes`` or has been open for
+    ``compact_seconds``. ``journal=False`` restores rewrite-on-every-change.
+    Passing ``storage`` keeps tasks in the shared SQLite database instead and
+    pulls rows written by other processes before every operation. The JSON
+    files are then kept as a mirror of the database for the agents that read
+    them, and an empty database imports them on first open.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        journal: bool = True,
+        compact_bytes: int = JOURNAL_COMPACT_BYTES,
+        compact_seconds: float = JOURNAL_COMPACT_SECONDS,
+        storage: "SqliteStorage | None" = None,
+    ) -> None:
         self.data_dir = data_dir
         self.path = self.data_dir / TASK_FILE
+        self.journal_path = automation_utils.journal_path(self.path)
+        self.journal_enabled = journal
+        self._collection = storage.collection("tasks") if storage is not None else None
+        self._rev = 0
+        self.compact_bytes = compact_bytes
+        self.compact_seconds = compact_seconds
         self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compactor: threading.Thread | None = None
+        self._last_compacted = time.monotonic()
         self._tasks: MutableMapping[str, Mapping[str, object]] = {}
+        self._sequence: Dict[str, int] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._by_type: Dict[str, Dict[str, None]] = {}
+        self._by_metadata: Dict[str, Dict[object, Dict[str, None]]] = {key: {} for key in INDEXED_METADATA_KEYS}
         self._load()
 
     # ------------------------------------------------------------------
     # Persistence
     # ------------------------------------------------------------------
     def _load(self) -> None:
-        if not self.path.exists():
-            self._tasks = {}
+        if self._collection is not None:
+            self._collection.import_if_empty(lambda: automation_utils.load_journaled_records(self.path, "tasks"))
+            records, self._rev = self._collection.load_all()
+        else:
+            records = automation_utils.load_journaled_records(self.path, "tasks")
+        self._tasks = {}
+        self._sequence = {}
+        self._by_status = {}
+        self._by_type = {}
+        self._by_metadata = {key: {} for key in INDEXED_METADATA_KEYS}
+        for record in records:
+            self._store(record.get("id", self._generate_id()), dict(record))
+        if self._collection is not None and self.journal_enabled:
+            # Bring the mirror up to date with writes made while it was not kept.
+            self.compact()
+        elif not self.journal_enabled and (self._collection is not None or self.journal_path.exists()):
+            # Leftover journal from journal mode: fold it so it cannot shadow new writes.
+            self._write_snapshot(list(self._tasks.values()))
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+
+    def _persist(self, changed: Sequence[Mapping[str, object]] = ()) -> None:
+        """Record ``changed`` tasks; callers hold ``self._lock``."""
+        if self._collection is not None:
+            self._collection.put_many(changed)
+        if not self.journal_enabled:
+            self._write_snapshot(list(self._tasks.values()))
             return
-        try:
-            data = json.loads(self.path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            data = {"tasks": []}
-        records = data.get("tasks", []) if isinstance(data, dict) else data
-        self._tasks = {record.get("id", self._generate_id()): dict(record) for record in records}
-
-    def _persist(self) -> None:
+        automation_utils.ensure_directory(self.journal_path.parent)
+        lines = "".join(
+            json.dumps({"op": "put", "record": record}, separators=(",", ":"), default=str) + "\n"
+            for record in changed
+        )
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            handle.write(lines)
+            size = handle.tell()
+        due = time.monotonic() - self._last_compacted >= self.compact_seconds
+        if size >= self.compact_bytes or due:
+            self._schedule_compaction()
+
+    def _sync(self) -> None:
+        """Apply rows other processes wrote to the shared database; callers hold ``self._lock``."""
+        if self._collection is None:
+            return
+        changed, self._rev = self._collection.changes(self._rev)
+        for task_id, record in changed:
+            if record is not None:
+                self._store(task_id, dict(record))
+
+    def _write_snapshot(self, records: List[Mapping[str, object]]) -> None:
         automation_utils.ensure_directory(self.path.parent)
-        snapshot = {"tasks": list(self._tasks.values())}
-        self.path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        snapshot = {"tasks": records}
+        automation_utils.replace_file(self.path, json.dumps(snapshot, indent=2).encode("utf-8"))
+
+    def _schedule_compaction(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="task-journal-compactor", daemon=True)
+        self._compactor.start()
+
+    def compact(self) -> None:
+        """Fold the journal into ``tasks.json`` and drop the folded prefix."""
+        if not self.journal_enabled:
+            return
+        with self._compact_lock:
+            with self._lock:
+                # Measure the journal before pulling database rows: every line
+                # in the folded prefix was appended after its row committed, so
+                # the snapshot already holds it even when another process wrote it.
+                folded = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+                self._sync()
+                records = list(self._tasks.values())
+            # Writing the snapshot happens outside the store lock so writers keep going.
+            self._write_snapshot(records)
+            with self._lock:
+                self._last_compacted = time.monotonic()
+                if not folded:
+                    return
+                # Journal records are full task states, so a crash before this
+                # truncation only replays records the snapshot already holds.
+                with self.journal_path.open("rb") as handle:
+                    handle.seek(folded)
+                    tail = handle.read()
+                automation_utils.replace_file(self.journal_path, tail)
 
     # ------------------------------------------------------------------
     # CRUD
     # ------------------------------------------------------------------
     def list_tasks(self, status: Optional[str] = None) -> List[Mapping[str, object]]:
         with self._lock:
-            tasks = list(self._tasks.values())
+            self._sync()
             if status:
                 statuses = {value.strip().lower() for value in status.split(",")}
-                tasks = [task for task in tasks if str(task.get("status", "")).lower() in statuses]
+                task_ids = [task_id for value in statuses for task_id in self._by_status.get(value, ())]
+                task_ids.sort(key=self._sequence.__getitem__)
+                tasks = [self._tasks[task_id] for task_id in task_ids]
+            else:
+                tasks = list(self._tasks.values())
             tasks.sort(key=lambda item: item.get("created_at", ""), reverse=True)
             return [dict(task) for task in tasks]
 
@@ -107,49 +223,30 @@ class TaskStore:
         desired = {value.strip().lower() for value in task_types if str(value).strip()}
         if not desired:
             return []
-        tasks = self.list_tasks(status=status)
-        return [task for task in tasks if str(task.get("task_type", "")).lower() in desired]
+        statuses = {value.strip().lower() for value in status.split(",")} if status else None
+        with self._lock:
+            self._sync()
+            task_ids = [task_id for value in desired for task_id in self._by_type.get(value, ())]
+            task_ids.sort(key=self._sequence.__getitem__)
+            tasks = [self._tasks[task_id] for task_id in task_ids]
+            if statuses is not None:
+                tasks = [task for task in tasks if str(task.get("status", "")).lower() in statuses]
+            tasks.sort(key=lambda item: item.get("created_at", ""), reverse=True)
+            return [dict(task) for task in tasks]
 
     def has_open_task_for_order(self, order_id: str) -> bool:
-        with self._lock:
-            for task in self._tasks.values():
-                metadata = task.get("metadata") or {}
-                if metadata.get("order_id") == order_id and str(task.get("status", "")).lower() in {"open", "in_progress"}:
-                    return True
-        return False
+        return self.has_open_task_with_key("order_id", order_id)
 
     def close_tasks_for_order(self, order_id: str) -> List[Mapping[str, object]]:
-        closed: List[Mapping[str, object]] = []
-        with self._lock:
-            for task_id, task in list(self._tasks.items()):
-                metadata = task.get("metadata") or {}
-                if metadata.get("order_id") == order_id and str(task.get("status", "")).lower() in {"open", "in_progress"}:
-                    now = datetime.now(timezone.utc)
-                    updated = dict(task)
-                    updated["status"] = "closed"
-                    updated["updated_at"] = now.isoformat()
-                    created_dt = _parse_iso(str(updated.get("created_at"))) if updated.get("created_at") else None
-                    if created_dt and not updated.get("cycle_time_secs"):
-                        updated["cycle_time_secs"] = int((now - created_dt).total_seconds())
-                    if updated.get("first_pass_flag") is None:
-                        updated["first_pass_flag"] = True
-                    self._tasks[task_id] = updated
-                    closed.append(dict(updated))
-            if closed:
-                self._persist()
-        return closed
+        return self.close_tasks_by_metadata("order_id", order_id)
 
     def close_tasks_by_metadata(self, key: str, value: str) -> List[Mapping[str, object]]:
         closed: List[Mapping[str, object]] = []
         with self._lock:
-            for task_id, task in list(self._tasks.items()):
-                metadata = task.get("metadata") or {}
-                if metadata.get(key) != value:
-                    continue
-                if str(task.get("status", "")).lower() not in {"open", "in_progress"}:
-                    continue
+            self._sync()
+            for task_id in self._open_task_ids(key, value):
                 now = datetime.now(timezone.utc)
-                updated = dict(task)
+                updated = dict(self._tasks[task_id])
                 updated["status"] = "closed"
                 updated["updated_at"] = now.isoformat()
                 created_dt = _parse_iso(str(updated.get("created_at"))) if updated.get("created_at") else None
@@ -157,10 +254,10 @@ class TaskStore:
                     updated["cycle_time_secs"] = int((now - created_dt).total_seconds())
                 if updated.get("first_pass_flag") is None:
                     updated["first_pass_flag"] = True
-                self._tasks[task_id] = updated
+                self._store(task_id, updated)
                 closed.append(dict(updated))
             if closed:
-                self._persist()
+                self._persist(closed)
         return closed
 
     def ensure_sla_task(self, breach: "SlaBreach") -> Optional[Mapping[str, object]]:
@@ -170,16 +267,14 @@ class TaskStore:
 
     def get_task(self, task_id: str) -> Optional[Mapping[str, object]]:
         with self._lock:
+            self._sync()
             task = self._tasks.get(task_id)
             return dict(task) if task else None
 
     def has_open_task_with_key(self, key: str, value: str) -> bool:
         with self._lock:
-            for task in self._tasks.values():
-                metadata = task.get("metadata") or {}
-                if metadata.get(key) == value and str(task.get("status", "")).lower() in {"open", "in_progress"}:
-                    return True
-        return False
+            self._sync()
+            return bool(self._open_task_ids(key, value))
 
     def create_task(
         self,
@@ -218,12 +313,14 @@ class TaskStore:
             metadata=metadata or {},
         ).to_dict()
         with self._lock:
-            self._tasks[task_id] = record
-            self._persist()
+            self._sync()
+            self._store(task_id, record)
+            self._persist([record])
         return dict(record)
 
     def update_status(self, task_id: str, status: str, owner: Optional[str] = None) -> Mapping[str, object]:
         with self._lock:
+            self._sync()
             if task_id not in self._tasks:
                 raise KeyError(f"Task {task_id} not found")
             task = dict(self._tasks[task_id])
@@ -240,21 +337,75 @@ class TaskStore:
                     task["cycle_time_secs"] = int((now - created_dt).total_seconds())
                 if task.get("first_pass_flag") is None:
                     task["first_pass_flag"] = True
-            self._tasks[task_id] = task
-            self._persist()
+            self._store(task_id, task)
+            self._persist([task])
             return dict(task)
 
     def assign_owner(self, task_id: str, owner: str) -> Mapping[str, object]:
         with self._lock:
+            self._sync()
             if task_id not in self._tasks:
                 raise KeyError(f"Task {task_id} not found")
             task = dict(self._tasks[task_id])
             task["owner"] = owner
             task["updated_at"] = datetime.now(timezone.utc).isoformat()
-            self._tasks[task_id] = task
-            self._persist()
+            self._store(task_id, task)
+            self._persist([task])
             return dict(task)
 
+    # ------------------------------------------------------------------
+    # Secondary indexes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _index_entries(task: Mapping[str, object]) -> Dict[Tuple[str, str], object]:
+        metadata = task.get("metadata") or {}
+        entries: Dict[Tuple[str, str], object] = {
+            ("status", ""): str(task.get("status", "")).lower(),
+            ("task_type", ""): str(task.get("task_type", "")).lower(),
+        }
+        for key in INDEXED_METADATA_KEYS:
+            value = metadata.get(key)
+            if value is not None and isinstance(value, Hashable):
+                entries[("metadata", key)] = value
+        return entries
+
+    def _bucket(self, entry: Tuple[str, str], value: object) -> Dict[str, None]:
+        kind, key = entry
+        if kind == "status":
+            return self._by_status.setdefault(str(value), {})
+        if kind == "task_type":
+            return self._by_type.setdefault(str(value), {})
+        return self._by_metadata[key].setdefault(value, {})
+
+    def _store(self, task_id: str, task: Mapping[str, object]) -> None:
+        """Save ``task`` and move it between index buckets whose key changed."""
+        previous = self._tasks.get(task_id)
+        self._tasks[task_id] = task
+        self._sequence.setdefault(task_id, len(self._sequence))
+        old_entries = self._index_entries(previous) if previous is not None else {}
+        new_entries = self._index_entries(task)
+        for entry, value in old_entries.items():
+            if new_entries.get(entry, _MISSING) != value:
+                self._bucket(entry, value).pop(task_id, None)
+        for entry, value in new_entries.items():
+            if old_entries.get(entry, _MISSING) != value:
+                self._bucket(entry, value)[task_id] = None
+
+    def _open_task_ids(self, key: str, value: object) -> List[str]:
+        if key in self._by_metadata and value is not None and isinstance(value, Hashable):
+            candidates = list(self._by_metadata[key].get(value, ()))
+        else:
+            candidates = [
+                task_id
+                for task_id, task in self._tasks.items()
+                if (task.get("metadata") or {}).get(key) == value
+            ]
+        return [
+            task_id
+            for task_id in candidates
+            if str(self._tasks[task_id].get("status", "")).lower() in OPEN_STATUSES
+        ]
+
     # ------------------------------------------------------------------
     # Utilities
     # ------------------------------------------------------------------
@@ -0,0 +1,85 @@
+"""Topic routing shared by the event dispatcher and the webhook registry."""
+from __future__ import annotations
+
+import re
+import threading
+from fnmatch import translate
+from typing import Dict, Generic, List, Pattern, Tuple, TypeVar
+
+T = TypeVar("T")
+
+TOPIC_CACHE_SIZE = 4096
+
+
+def is_pattern(topic: str) -> bool:
+    return any(char in topic for char in "*?[")
+
+
+class TopicRouter(Generic[T]):
+    """Map topics to subscribers using ``fnmatch`` semantics.
+
+    Exact topics are a dict lookup. Wildcard patterns are compiled once when
+    they are added, and the full result for each concrete topic is cached
+    until the subscriptions change, so routing a repeated topic costs the
+    same however many patterns are registered.
+    """
+
+    def __init__(self, cache_size: int = TOPIC_CACHE_SIZE) -> None:
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._exact: Dict[str, List[T]] = {}
+        self._patterns: Dict[str, Tuple[Pattern[str], List[T]]] = {}
+        self._cache: Dict[str, Tuple[T, ...]] = {}
+
+    def add(self, topic: str, value: T) -> None:
+        with self._lock:
+            if is_pattern(topic):
+                entry = self._patterns.get(topic)
+                if entry is None:
+                    entry = (re.compile(translate(topic)), [])
+                    self._patterns[topic] = entry
+                entry[1].append(value)
+            else:
+                self._exact.setdefault(topic, []).append(value)
+            self._cache.clear()
+
+    def remove(self, topic: str, value: T) -> bool:
+        with self._lock:
+            if is_pattern(topic):
+                entry = self._patterns.get(topic)
+                values = entry[1] if entry else None
+            else:
+                values = self._exact.get(topic)
+            if not values:
+                return False
+            try:
+                values.remove(value)
+            except ValueError:
+                return False
+            if not values:
+                (self._patterns if is_pattern(topic) else self._exact).pop(topic, None)
+            self._cache.clear()
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._patterns.clear()
+            self._cache.clear()
+
+    def match(self, topic: str) -> Tuple[T, ...]:
+        """Return exact subscribers first, then pattern subscribers in registration order."""
+
+        cached = self._cache.get(topic)
+        if cached is not None:
+            return cached
+        with self._lock:
+            matched: List[T] = list(self._exact.get(topic, ()))
+            for compiled, values in self._patterns.values():
+                if compiled.match(topic):
+                    matched.extend(values)
+            result = tuple(matched)
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[topic] = result
+            return result
@@ -2,60 +2,97 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import hmac
 import json
 import logging
+import os
+import random
 import threading
+import time
 import uuid
-from datetime import datetime, timezone
-from fnmatch import fnmatchcase
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Mapping, MutableMapping, Sequence
+from typing import TYPE_CHECKING, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
 from automation import utils as automation_utils
+from backend.topics import TopicRouter
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import httpx
+
+    from backend.storage import SqliteStorage
 
 WEBHOOK_FILE = "webhooks.json"
 OUTBOX_FILE = "webhook_outbox.jsonl"
+OUTBOX_DIR = "webhook_outbox"
+OUTBOX_SEGMENT_BYTES = 4 * 1024 * 1024
+OUTBOX_RETAIN_SEGMENTS = 8
+OUTBOX_RETENTION_SECONDS = 7 * 24 * 3600.0
+CURSOR_FLUSH_BYTES = 64 * 1024
 
 
 class WebhookRegistry:
     """Persisted registry of webhook subscriptions."""
 
-    def __init__(self, data_dir: Path) -> None:
+    def __init__(self, data_dir: Path, *, storage: "SqliteStorage | None" = None) -> None:
         self.path = data_dir / WEBHOOK_FILE
+        self._collection = storage.collection("webhooks") if storage is not None else None
+        self._rev = 0
         self._lock = threading.Lock()
         self._webhooks: MutableMapping[str, Mapping[str, object]] = {}
+        self._router: TopicRouter[str] | None = None
+        self._positions: Dict[str, int] = {}
         self._load()
 
     # ------------------------------------------------------------------
     # Persistence helpers
     # ------------------------------------------------------------------
-    def _load(self) -> None:
+    def _read_json(self) -> List[Mapping[str, object]]:
         if not self.path.exists():
-            self._webhooks = {}
-            return
+            return []
         try:
             raw = json.loads(self.path.read_text(encoding="utf-8"))
         except json.JSONDecodeError:
             raw = {"webhooks": []}
 
         records = raw.get("webhooks", []) if isinstance(raw, dict) else raw
-        store: MutableMapping[str, Mapping[str, object]] = {}
-
+        normalized: List[Mapping[str, object]] = []
         for record in records:
-            webhook_id = str(record.get("id") or self._generate_id())
             topics = [str(topic).strip() for topic in record.get("topics", []) if str(topic).strip()]
-            normalized = {
-                "id": webhook_id,
-                "url": str(record.get("url") or ""),
-                "topics": topics,
-                "secret": record.get("secret"),
-                "description": record.get("description"),
-                "created_at": record.get("created_at")
-                or datetime.now(timezone.utc).isoformat(),
-            }
-            store[webhook_id] = normalized
-
-        self._webhooks = store
+            normalized.append(
+                {
+                    "id": str(record.get("id") or self._generate_id()),
+                    "url": str(record.get("url") or ""),
+                    "topics": topics,
+                    "secret": record.get("secret"),
+                    "description": record.get("description"),
+                    "created_at": record.get("created_at")
+                    or datetime.now(timezone.utc).isoformat(),
+                }
+            )
+        return normalized
+
+    def _load(self) -> None:
+        if self._collection is not None:
+            self._collection.import_if_empty(self._read_json)
+            records, self._rev = self._collection.load_all()
+        else:
+            records = self._read_json()
+        self._webhooks = {str(record.get("id")): dict(record) for record in records}
+
+    def _sync(self) -> None:
+        if self._collection is None:
+            return
+        changed, self._rev = self._collection.changes(self._rev)
+        for webhook_id, record in changed:
+            if record is None:
+                self._webhooks.pop(webhook_id, None)
+            else:
+                self._webhooks[webhook_id] = dict(record)
+        if changed:
+            self._router = None
 
     def _persist(self) -> None:
         automation_utils.ensure_directory(self.path.parent)
@@ -71,6 +108,7 @@ class WebhookRegistry:
     # ------------------------------------------------------------------
     def list(self) -> List[Mapping[str, object]]:
         with self._lock:
+            self._sync()
             return [dict(record) for record in self._webhooks.values()]
 
     def add(
@@ -95,65 +133,248 @@ class WebhookRegistry:
         }
 
         with self._lock:
+            self._sync()
             self._webhooks[record["id"]] = record
-            self._persist()
+            self._router = None
+            if self._collection is not None:
+                self._collection.put(record)
+            else:
+                self._persist()
         return dict(record)
 
+    def get(self, webhook_id: str) -> Mapping[str, object] | None:
+        with self._lock:
+            self._sync()
+            record = self._webhooks.get(webhook_id)
+            return dict(record) if record else None
+
     def remove(self, webhook_id: str) -> bool:
         with self._lock:
+            self._sync()
             if webhook_id in self._webhooks:
                 self._webhooks.pop(webhook_id)
-                self._persist()
+                self._router = None
+                if self._collection is not None:
+                    self._collection.delete(webhook_id)
+                else:
+                    self._persist()
                 return True
         return False
 
     def match(self, topic: str) -> List[Mapping[str, object]]:
         normalized_topic = str(topic).strip()
         with self._lock:
-            matches: List[Mapping[str, object]] = []
-            for record in self._webhooks.values():
-                topics = [str(item).strip() for item in record.get("topics", []) if str(item).strip()]
-                for candidate in topics:
-                    if candidate == "*" or normalized_topic == candidate or fnmatchcase(normalized_topic, candidate):
-                        matches.append(dict(record))
-                        break
-            return matches
+            self._sync()
+            if self._router is None:
+                self._router = self._build_router()
+            # The router groups hits by topic pattern; restore registry order.
+            matched = sorted(set(self._router.match(normalized_topic)), key=self._positions.__getitem__)
+            return [dict(self._webhooks[webhook_id]) for webhook_id in matched]
+
+    def _build_router(self) -> TopicRouter[str]:
+        router: TopicRouter[str] = TopicRouter()
+        self._positions = {}
+        for position, (webhook_id, record) in enumerate(self._webhooks.items()):
+            self._positions[webhook_id] = position
+            for candidate in dict.fromkeys(str(item).strip() for item in record.get("topics", [])):
+                if candidate:
+                    router.add(candidate, webhook_id)
+        return router
 
 
 class WebhookOutbox:
-    """Persistent queue of webhook deliveries."""
+    """Persistent queue of webhook deliveries kept as append-only segment files.
 
-    def __init__(self, data_dir: Path) -> None:
-        self.path = data_dir / OUTBOX_FILE
-        self._lock = threading.Lock()
+    ``enqueue`` appends the full delivery record; ``mark_status`` appends a
+    status record carrying the entry's mutable fields. Only pending entries
+    stay in memory, and polling reads just the bytes written since the last
+    poll. ``cursor.json`` remembers the oldest segment position that still
+    holds a pending entry, so restarts replay from there instead of from the
+    start of history. Segments wholly behind the cursor are compacted to one
+    record per delivery and dropped once they fall outside retention.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        segment_bytes: int = OUTBOX_SEGMENT_BYTES,
+        retain_segments: int = OUTBOX_RETAIN_SEGMENTS,
+        retention_seconds: float = OUTBOX_RETENTION_SECONDS,
+    ) -> None:
+        self.legacy_path = data_dir / OUTBOX_FILE
+        self.directory = data_dir / OUTBOX_DIR
+        self.cursor_path = self.directory / "cursor.json"
+        self.segment_bytes = segment_bytes
+        self.retain_segments = retain_segments
+        self.retention_seconds = retention_seconds
+        self._lock = threading.RLock()
+        self._pending: MutableMapping[str, MutableMapping[str, object]] = {}
+        self._positions: MutableMapping[str, Tuple[int, int]] = {}
+        self._read_segment = 1
+        self._read_offset = 0
+        self._cursor: Tuple[int, int] = (1, 0)
+        self._saved_cursor: Tuple[int, int] = (1, 0)
+        self._compactor: threading.Thread | None = None
+        self._load()
 
     # ------------------------------------------------------------------
-    # Persistence helpers
+    # Segment helpers
     # ------------------------------------------------------------------
-    def _load_entries(self) -> List[MutableMapping[str, object]]:
-        if not self.path.exists():
+    def _segments(self) -> List[Tuple[int, Path]]:
+        if not self.directory.exists():
             return []
+        found = []
+        for path in self.directory.glob("*.jsonl"):
+            number = path.name.split(".", 1)[0]
+            if number.isdigit():
+                found.append((int(number), path))
+        return sorted(found)
+
+    def _segment_path(self, number: int) -> Path:
+        for path in (self.directory / f"{number:08d}.jsonl", self.directory / f"{number:08d}.compact.jsonl"):
+            if path.exists():
+                return path
+        return self.directory / f"{number:08d}.jsonl"
+
+    @staticmethod
+    def _decode(raw: bytes) -> Optional[Mapping[str, object]]:
         try:
-            lines = self.path.read_text(encoding="utf-8").strip().splitlines()
-        except OSError:
-            return []
-        entries: List[MutableMapping[str, object]] = []
-        for line in lines:
-            if not line:
-                continue
+            record = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        return record if isinstance(record, Mapping) else None
+
+    def _append(self, records: Sequence[Mapping[str, object]]) -> None:
+        automation_utils.ensure_directory(self.directory)
+        segments = self._segments()
+        number = segments[-1][0] if segments else 1
+        path = self._segment_path(number)
+        if path.exists() and path.stat().st_size >= self.segment_bytes:
+            number += 1
+            path = self._segment_path(number)
+            self._schedule_compaction()
+        data = "".join(json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in records)
+        with path.open("ab") as handle:
+            handle.write(data.encode("utf-8"))
+
+    # ------------------------------------------------------------------
+    # Persistence helpers
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if self.legacy_path.exists() and not self._segments():
+            self._import_legacy()
+        if self.cursor_path.exists():
             try:
-                entries.append(dict(json.loads(line)))
-            except json.JSONDecodeError:
+                payload = json.loads(self.cursor_path.read_text(encoding="utf-8"))
+                self._cursor = (int(payload["segment"]), int(payload["offset"]))
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                self._cursor = (1, 0)
+        segments = self._segments()
+        if segments and self._cursor[0] < segments[0][0]:
+            self._cursor = (segments[0][0], 0)
+        self._saved_cursor = self._cursor
+        self._read_segment, self._read_offset = self._cursor
+        self._tail()
+
+    def _import_legacy(self) -> None:
+        entries = []
+        for line in self.legacy_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                record = self._decode(line.encode("utf-8"))
+                if record is not None:
+                    entries.append({"op": "enqueue", "entry": dict(record)})
+        if entries:
+            self._append(entries)
+        self.legacy_path.rename(self.legacy_path.with_name(self.legacy_path.name + ".migrated"))
+
+    def _apply(self, record: Mapping[str, object], position: Tuple[int, int]) -> None:
+        if record.get("op") == "enqueue":
+            entry = dict(record.get("entry") or {})
+            delivery_id = str(entry.get("id") or "")
+            if not delivery_id:
+                return
+            if str(entry.get("status", "")).lower() == "pending":
+                self._pending[delivery_id] = entry
+                self._positions[delivery_id] = position
+            else:
+                self._pending.pop(delivery_id, None)
+                self._positions.pop(delivery_id, None)
+        elif record.get("op") == "status":
+            delivery_id = str(record.get("id") or "")
+            entry = self._pending.get(delivery_id)
+            if entry is None:
+                return
+            updated = _merge_status(entry, record.get("fields") or {})
+            if str(updated.get("status", "")).lower() == "pending":
+                self._pending[delivery_id] = updated
+            else:
+                del self._pending[delivery_id]
+                del self._positions[delivery_id]
+
+    def _tail(self) -> None:
+        """Apply records written since the last read, from any process."""
+
+        for number, path in self._segments():
+            if number < self._read_segment:
                 continue
-        return entries
-
-    def _write_entries(self, entries: List[Mapping[str, object]]) -> None:
-        automation_utils.ensure_directory(self.path.parent)
-        if not entries:
-            self.path.write_text("", encoding="utf-8")
-            return
-        serialized = "\n".join(json.dumps(entry, default=str) for entry in entries)
-        self.path.write_text(serialized + "\n", encoding="utf-8")
+            if number > self._read_segment:
+                self._read_segment, self._read_offset = number, 0
+            with path.open("rb") as handle:
+                handle.seek(self._read_offset)
+                offset = self._read_offset
+                for raw in handle:
+                    if not raw.endswith(b"\n"):
+                        break  # partially written record; retry on the next poll
+                    record = self._decode(raw)
+                    if record is not None:
+                        self._apply(record, (number, offset))
+                    offset += len(raw)
+                self._read_offset = offset
+        self._advance_cursor()
+
+    def _advance_cursor(self) -> None:
+        if self._positions:
+            self._cursor = next(iter(self._positions.values()))
+        else:
+            self._cursor = (self._read_segment, self._read_offset)
+        segment, offset = self._saved_cursor
+        # Persisting lazily is safe: a stale cursor only makes restarts rescan a little more.
+        if self._cursor[0] != segment or self._cursor[1] - offset >= CURSOR_FLUSH_BYTES:
+            self._save_cursor()
+
+    def _save_cursor(self) -> None:
+        automation_utils.ensure_directory(self.directory)
+        scratch = self.cursor_path.with_name(self.cursor_path.name + ".tmp")
+        scratch.write_text(json.dumps({"segment": self._cursor[0], "offset": self._cursor[1]}), encoding="utf-8")
+        os.replace(scratch, self.cursor_path)
+        self._saved_cursor = self._cursor
+
+    def _scan_newest_first(self, wanted: Optional[str] = None, limit: int = 0) -> List[MutableMapping[str, object]]:
+        """Rebuild entries from disk, newest first; stops at ``limit`` or at ``wanted``."""
+
+        latest_fields: Dict[str, Mapping[str, object]] = {}
+        seen: set = set()
+        found: List[MutableMapping[str, object]] = []
+        for _, path in reversed(self._segments()):
+            lines = path.read_bytes().splitlines()
+            for raw in reversed(lines):
+                record = self._decode(raw)
+                if record is None:
+                    continue
+                if record.get("op") == "status":
+                    latest_fields.setdefault(str(record.get("id")), record.get("fields") or {})
+                    continue
+                entry = dict(record.get("entry") or {})
+                delivery_id = str(entry.get("id") or "")
+                if not delivery_id or delivery_id in seen or (wanted is not None and delivery_id != wanted):
+                    continue
+                seen.add(delivery_id)
+                fields = latest_fields.get(delivery_id)
+                found.append(_merge_status(entry, fields) if fields else entry)
+                if wanted is not None or (limit and len(found) >= limit):
+                    return found
+        return found
 
     # ------------------------------------------------------------------
     # Public API
@@ -172,22 +393,20 @@ class WebhookOutbox:
         }
 
         with self._lock:
-            entries = self._load_entries()
-            entries.append(payload)
-            self._write_entries(entries)
+            self._append([{"op": "enqueue", "entry": payload}])
+            self._tail()
         return payload
 
     def list_recent(self, limit: int = 50) -> List[Mapping[str, object]]:
         with self._lock:
-            entries = self._load_entries()
-            if limit:
-                entries = entries[-limit:]
+            entries = self._scan_newest_first(limit=limit)
+            entries.reverse()
             return [dict(entry) for entry in entries]
 
     def pending_entries(self) -> List[Mapping[str, object]]:
         with self._lock:
-            entries = self._load_entries()
-            return [dict(entry) for entry in entries if str(entry.get("status", "")).lower() == "pending"]
+            self._tail()
+            return [dict(entry) for entry in self._pending.values()]
 
     def mark_status(
         self,
@@ -195,26 +414,133 @@ class WebhookOutbox:
         status: str,
         *,
         error: str | None = None,
+        next_attempt_at: str | None = None,
     ) -> bool:
         with self._lock:
-            entries = self._load_entries()
-            updated = False
-            for entry in entries:
-                if entry.get("id") != delivery_id:
-                    continue
-                entry["status"] = status
-                entry["updated_at"] = datetime.now(timezone.utc).isoformat()
-                if status == "delivered":
-                    entry["delivered_at"] = datetime.now(timezone.utc).isoformat()
-                    entry.pop("error", None)
-                elif error:
-                    entry["error"] = error
-                entry["attempts"] = int(entry.get("attempts", 0)) + 1
-                updated = True
-                break
-            if updated:
-                self._write_entries(entries)
-            return updated
+            self._tail()
+            entry = self._pending.get(delivery_id)
+            if entry is None:
+                matches = self._scan_newest_first(wanted=delivery_id)
+                if not matches:
+                    return False
+                entry = matches[0]
+            updated = dict(entry)
+            updated["status"] = status
+            updated["updated_at"] = datetime.now(timezone.utc).isoformat()
+            if status == "delivered":
+                updated["delivered_at"] = datetime.now(timezone.utc).isoformat()
+                updated.pop("error", None)
+            elif error:
+                updated["error"] = error
+            if next_attempt_at:
+                updated["next_attempt_at"] = next_attempt_at
+            else:
+                updated.pop("next_attempt_at", None)
+            updated["attempts"] = int(updated.get("attempts", 0)) + 1
+            if status == "pending" and delivery_id not in self._pending:
+                # Requeued: append the whole entry so the cursor never has to move backwards.
+                record = {"op": "enqueue", "entry": updated}
+            else:
+                record = {"op": "status", "id": delivery_id, "fields": _status_fields(updated)}
+            self._append([record])
+            self._tail()
+            return True
+
+    def flush(self) -> None:
+        """Persist the delivery cursor immediately (used on shutdown)."""
+
+        with self._lock:
+            self._tail()
+            if self._segments():
+                self._save_cursor()
+
+    # ------------------------------------------------------------------
+    # Compaction and retention
+    # ------------------------------------------------------------------
+    def _schedule_compaction(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="webhook-outbox-compactor", daemon=True)
+        self._compactor.start()
+
+    def compact(self) -> Mapping[str, int]:
+        """Drop expired settled segments and fold the rest to one record per delivery."""
+
+        with self._lock:
+            self._tail()
+            cursor_segment = self._cursor[0]
+            segments = self._segments()
+        settled = [(number, path) for number, path in segments if number < cursor_segment]
+        removed = 0
+        cutoff = time.time() - self.retention_seconds
+        excess = max(0, len(settled) - self.retain_segments)
+        for index, (number, path) in enumerate(list(settled)):
+            if index < excess or path.stat().st_mtime < cutoff:
+                with self._lock:
+                    path.unlink(missing_ok=True)
+                removed += 1
+        settled = [(number, path) for number, path in settled if path.exists()]
+
+        compacted = 0
+        later = [path for number, path in segments if number >= cursor_segment]
+        for position, (number, path) in enumerate(settled):
+            if path.name.endswith(".compact.jsonl"):
+                continue
+            # Status records for this segment's deliveries may sit in any later segment.
+            followers = [other for _, other in settled[position + 1 :]] + later
+            self._compact_segment(number, path, followers)
+            compacted += 1
+        return {"removed": removed, "compacted": compacted}
+
+    def _compact_segment(self, number: int, path: Path, followers: Sequence[Path]) -> None:
+        entries: Dict[str, MutableMapping[str, object]] = {}
+        foreign: List[Mapping[str, object]] = []
+        for raw in path.read_bytes().splitlines():
+            record = self._decode(raw)
+            if record is None:
+                continue
+            if record.get("op") == "enqueue":
+                entry = dict(record.get("entry") or {})
+                entries[str(entry.get("id"))] = entry
+            elif str(record.get("id")) in entries:
+                entries[str(record.get("id"))] = _merge_status(entries[str(record.get("id"))], record.get("fields") or {})
+            else:
+                foreign.append(record)
+        for follower in followers:
+            if not follower.exists():
+                continue
+            for raw in follower.read_bytes().splitlines():
+                record = self._decode(raw)
+                if record is not None and record.get("op") == "status" and str(record.get("id")) in entries:
+                    key = str(record.get("id"))
+                    entries[key] = _merge_status(entries[key], record.get("fields") or {})
+        lines = [{"op": "enqueue", "entry": entry} for entry in entries.values()] + foreign
+        target = self.directory / f"{number:08d}.compact.jsonl"
+        scratch = target.with_name(target.name + ".tmp")
+        scratch.write_text(
+            "".join(json.dumps(line, separators=(",", ":"), default=str) + "\n" for line in lines),
+            encoding="utf-8",
+        )
+        stat = path.stat()
+        with self._lock:
+            os.replace(scratch, target)
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            path.unlink(missing_ok=True)
+
+
+_IMMUTABLE_FIELDS = ("id", "webhook_id", "url", "topic", "payload", "timestamp", "queued_at")
+
+
+def _status_fields(entry: Mapping[str, object]) -> Mapping[str, object]:
+    return {key: value for key, value in entry.items() if key not in _IMMUTABLE_FIELDS}
+
+
+def _merge_status(entry: Mapping[str, object], fields: Mapping[str, object]) -> MutableMapping[str, object]:
+    """Status records carry every mutable field, so they replace rather than patch."""
+
+    merged = {key: value for key, value in entry.items() if key in _IMMUTABLE_FIELDS}
+    merged.update(fields)
+    return merged
 
 
 class WebhookDispatcher:
@@ -235,17 +561,89 @@ class WebhookDispatcher:
             self.outbox.enqueue(webhook, event)
 
 
+class CircuitBreaker:
+    """Per-URL breaker: opens after consecutive failures, half-opens after a cool-down."""
+
+    def __init__(self, *, threshold: int = 5, reset_seconds: float = 60.0) -> None:
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: set = set()
+
+    def allow(self, url: str) -> bool:
+        opened = self._opened_at.get(url)
+        if opened is None:
+            return True
+        if time.monotonic() - opened < self.reset_seconds or url in self._trial:
+            return False
+        self._trial.add(url)  # half-open: let exactly one request probe the receiver
+        return True
+
+    def record_success(self, url: str) -> None:
+        self._failures.pop(url, None)
+        self._opened_at.pop(url, None)
+        self._trial.discard(url)
+
+    def record_failure(self, url: str) -> None:
+        self._trial.discard(url)
+        failures = self._failures.get(url, 0) + 1
+        self._failures[url] = failures
+        if failures >= self.threshold:
+            self._opened_at[url] = time.monotonic()
+
+    def state(self, url: str) -> str:
+        if url not in self._opened_at:
+            return "closed"
+        return "half_open" if url in self._trial else "open"
+
+
+def sign_payload(secret: str, timestamp: str, body: bytes) -> str:
+    """HMAC-SHA256 over ``"{timestamp}.{body}"``, hex encoded."""
+
+    message = timestamp.encode("utf-8") + b"." + body
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
 class WebhookDeliveryWorker:
-    """Background worker that delivers pending webhook payloads."""
+    """Background worker that POSTs pending webhook payloads to their receivers.
+
+    Deliveries run concurrently on one pooled ``httpx.AsyncClient``, capped per
+    receiving host so a slow endpoint only ties up its own slots. Failures are
+    retried with exponential backoff and jitter until ``max_attempts``, after
+    which the entry moves to ``dead_letter``. Repeated failures open a per-URL
+    circuit breaker that pauses deliveries to that receiver.
+    """
 
     def __init__(
         self,
         outbox: WebhookOutbox,
         *,
-        interval_seconds: float = 5.0,
+        registry: WebhookRegistry | None = None,
+        interval_seconds: float = 1.0,
+        max_attempts: int = 8,
+        backoff_base_seconds: float = 2.0,
+        backoff_max_seconds: float = 600.0,
+        per_host_limit: int = 4,
+        max_connections: int = 100,
+        timeout_seconds: float = 10.0,
+        breaker: CircuitBreaker | None = None,
+        client: "httpx.AsyncClient | None" = None,
     ) -> None:
         self.outbox = outbox
+        self.registry = registry
         self.interval_seconds = interval_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.timeout_seconds = timeout_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._client = client
+        self._owns_client = client is None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
         self._task: asyncio.Task | None = None
         self._running = False
         self._logger = logging.getLogger(__name__)
@@ -259,31 +657,148 @@ class WebhookDeliveryWorker:
 
     async def stop(self) -> None:
         self._running = False
-        if self._task is None:
-            return
-        self._task.cancel()
-        try:
-            await self._task
-        except asyncio.CancelledError:
-            pass
-        self._task = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight.values(), return_exceptions=True)
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
 
     async def _run(self) -> None:
         while self._running:
-            pending = self.outbox.pending_entries()
-            for entry in pending:
-                await self._process_entry(entry)
+            try:
+                self.dispatch_due()
+            except Exception:  # pragma: no cover - keep the loop alive
+                self._logger.exception("webhook dispatch pass failed")
             await asyncio.sleep(self.interval_seconds)
 
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def dispatch_due(self, now: datetime | None = None) -> List[asyncio.Task]:
+        """Start a delivery task for every due entry not already in flight."""
+
+        now = now or datetime.now(timezone.utc)
+        started: List[asyncio.Task] = []
+        for entry in self.outbox.pending_entries():
+            delivery_id = str(entry.get("id") or "")
+            if not delivery_id or delivery_id in self._in_flight:
+                continue
+            due_at = _parse_timestamp(entry.get("next_attempt_at"))
+            if due_at is not None and due_at > now:
+                continue
+            if not self.breaker.allow(str(entry.get("url"))):
+                continue
+            task = asyncio.get_running_loop().create_task(self._process_entry(entry))
+            self._in_flight[delivery_id] = task
+            task.add_done_callback(lambda _, key=delivery_id: self._in_flight.pop(key, None))
+            started.append(task)
+        return started
+
+    async def run_once(self, now: datetime | None = None) -> None:
+        """Deliver every due entry and wait for the results (handy in tests)."""
+
+        tasks = self.dispatch_due(now)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _backoff_seconds(self, attempts: int) -> float:
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** max(attempts - 1, 0)))
+        # "Equal jitter": keep half the delay, randomise the other half.
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+    def _http(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.per_host_limit)
+            self._host_slots[host] = slot
+        return slot
+
+    def _secret_for(self, entry: Mapping[str, object]) -> Optional[str]:
+        if self.registry is None:
+            return None
+        webhook = self.registry.get(str(entry.get("webhook_id") or ""))
+        secret = webhook.get("secret") if webhook else None
+        return str(secret) if secret else None
+
+    def _request(self, entry: Mapping[str, object]) -> Tuple[bytes, Mapping[str, str]]:
+        body = json.dumps(
+            {
+                "id": entry.get("id"),
+                "topic": entry.get("topic"),
+                "timestamp": entry.get("timestamp"),
+                "payload": entry.get("payload", {}),
+            },
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        sent_at = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Id": str(entry.get("id")),
+            "X-Webhook-Topic": str(entry.get("topic")),
+            "X-Webhook-Timestamp": sent_at,
+        }
+        secret = self._secret_for(entry)
+        if secret:
+            headers["X-Webhook-Signature"] = f"sha256={sign_payload(secret, sent_at, body)}"
+        return body, headers
+
     async def _process_entry(self, entry: Mapping[str, object]) -> None:
         delivery_id = str(entry.get("id"))
+        url = str(entry.get("url") or "")
         if not delivery_id:
             return
-        # Placeholder delivery: mark as delivered to avoid duplicate processing.
-        self._logger.info(
-            "webhook delivery simulated id=%s topic=%s url=%s",
-            delivery_id,
-            entry.get("topic"),
-            entry.get("url"),
-        )
-        self.outbox.mark_status(delivery_id, "delivered")
+        body, headers = self._request(entry)
+        error: str | None = None
+        try:
+            async with self._slot(url):
+                response = await self._http().post(url, content=body, headers=headers)
+            if not 200 <= response.status_code < 300:
+                error = f"HTTP {response.status_code}"
+        except Exception as exc:  # httpx transport errors, invalid URLs, timeouts
+            error = f"{type(exc).__name__}: {exc}"
+
+        if error is None:
+            self.breaker.record_success(url)
+            self.outbox.mark_status(delivery_id, "delivered")
+            return
+
+        self.breaker.record_failure(url)
+        attempts = int(entry.get("attempts", 0) or 0) + 1
+        if attempts >= self.max_attempts:
+            self._logger.warning("webhook dead-lettered id=%s url=%s error=%s", delivery_id, url, error)
+            self.outbox.mark_status(delivery_id, "dead_letter", error=error)
+            return
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=self._backoff_seconds(attempts))
+        self.outbox.mark_status(delivery_id, "pending", error=error, next_attempt_at=retry_at.isoformat())
+
+
+def _parse_timestamp(value: object) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
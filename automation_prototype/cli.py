@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -12,13 +12,20 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from automation import engagement, ordering, payments, performance, workforce, finance
+from automation import jsonstream
+from automation.backfill import LAYOUTS as BACKFILL_LAYOUTS, parse_step, run_backfill
+from automation.demand_history import DemandHistoryStore
+from automation.forecast_models import ForecastModelService
 from backend.compliance import scan_compliance
 from backend.config import load_infrastructure_config
-from backend.events import EventDispatcher, load_events_for_order, replay_events
+from backend.events import EventDispatcher, iter_replay_events, load_events_for_order
 from backend.ingestion import ingest_portal_holds
+from backend.migrations import MigrationRunner
+from backend.storage import import_json_stores, open_storage
 from backend.tasks import TaskStore
 from backend.revenue_model import build_revenue_model
 from backend.sla import evaluate as evaluate_sla, load_policy
+from backend.sla_portfolio import score_portfolio
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,6 +34,9 @@ def parse_args() -> argparse.Namespace:
         "command",
         choices=[
             "run-all",
+            "backfill",
+            "demand-sync",
+            "forecast-fit",
             "ordering",
             "payments",
             "workforce",
@@ -38,7 +48,11 @@ def parse_args() -> argparse.Namespace:
             "infrastructure",
             "revenue-model",
             "sla-evaluate",
+            "sla-portfolio",
             "events-replay",
+            "events-rotate",
+            "storage-import",
+            "migrate",
         ],
     )
     parser.add_argument("--data-dir", default="data", help="Path to synthetic data directory")
@@ -49,7 +63,13 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--output",
-        help="Optional path to write JSON results",
+        help="Optional path to write JSON results (backfill: output directory).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=jsonstream.FORMATS,
+        default="json",
+        help="Output encoding: indented JSON, compact JSON, or one record per line (ndjson).",
     )
     parser.add_argument(
         "--order-id",
@@ -63,22 +83,50 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--from",
         dest="from_date",
-        help="Start of event replay window (YYYY-MM-DD or ISO).",
+        help="Start of event replay or backfill window (YYYY-MM-DD or ISO).",
     )
     parser.add_argument(
         "--to",
         dest="to_date",
-        help="End of event replay window (YYYY-MM-DD or ISO).",
+        help="End of event replay or backfill window (YYYY-MM-DD or ISO).",
+    )
+    parser.add_argument(
+        "--step",
+        default="1d",
+        help="Backfill interval between as-of dates (e.g. 1d, 7d, 2w).",
+    )
+    parser.add_argument(
+        "--agents",
+        help="Comma-separated agents to backfill (default: all).",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=sorted(BACKFILL_LAYOUTS),
+        default="jsonl",
+        help="Backfill partition format: JSON lines or column arrays.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Process pool size for sla-portfolio, backfill and forecast-fit (default: automatic).",
     )
     return parser.parse_args()
 
 
-def _write_output(results, output_path: str | None) -> None:
+def _write_output(results, output_path: str | None, output_format: str = "json") -> None:
+    """Stream ``results`` so lists and generators are never encoded all at once."""
+
     if not output_path:
-        print(json.dumps(results, indent=2))
+        try:
+            jsonstream.write(results, sys.stdout, format=output_format)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader (head, jq -n ...) stopped early; silence the flush at exit.
+            sys.stdout = open(os.devnull, "w")
         return
     destination = Path(output_path)
-    destination.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    with destination.open("w", encoding="utf-8") as handle:
+        jsonstream.write(results, handle, format=output_format)
     print(f"Wrote output to {destination}")
 
 
@@ -123,6 +171,33 @@ def main() -> None:
             "performance": performance.compute_kpis(data_dir, as_of),
             "finance": finance.compute_financial_pulse(data_dir, as_of),
         }
+    elif args.command == "backfill":
+        start = _parse_date(args.from_date)
+        end = _parse_date(args.to_date) or start
+        if start is None:
+            raise SystemExit("--from is required for backfill")
+        try:
+            step = parse_step(args.step)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        agents = [name.strip() for name in args.agents.split(",") if name.strip()] if args.agents else None
+        results = run_backfill(
+            data_dir,
+            start.replace(tzinfo=None),
+            end.replace(tzinfo=None),
+            Path(args.output or "out/backfill"),
+            step=step,
+            agents=agents,
+            layout=args.layout,
+            workers=args.workers,
+        )
+        _write_output(results, None, args.format)
+        return
+    elif args.command == "demand-sync":
+        store = DemandHistoryStore.for_data_dir(data_dir)
+        results = {**store.sync(data_dir), "skus": len(store.skus()), "directory": str(store.directory)}
+    elif args.command == "forecast-fit":
+        results = ForecastModelService.for_data_dir(data_dir).refresh(workers=args.workers)
     elif args.command == "compliance-scan":
         dispatcher = EventDispatcher(data_dir)
         task_store = TaskStore(data_dir)
@@ -147,25 +222,44 @@ def main() -> None:
             raise SystemExit(f"No events found for order {args.order_id}")
         score = evaluate_sla(events, policy=bundle.specs, policy_version=bundle.version)
         results = score.model_dump(mode="json")
+    elif args.command == "sla-portfolio":
+        results = score_portfolio(data_dir, workers=args.workers).to_dict()
     elif args.command == "events-replay":
         since = _parse_date(args.from_date)
         until = _parse_date(args.to_date)
         topics = args.topic or []
-        events = replay_events(
+        events = iter_replay_events(
             data_dir,
             since=since,
             until=until,
             topics=topics,
             order_id=args.order_id,
         )
-        results = {
-            "count": len(events),
-            "events": events,
-        }
+        if args.format == "ndjson":
+            results = events
+        else:
+            events, count = jsonstream.counted(events)
+            results = {
+                "events": events,
+                "count": count,
+            }
+    elif args.command == "events-rotate":
+        sealed = EventDispatcher(data_dir).rotate()
+        results = {"sealed": sealed}
+    elif args.command == "storage-import":
+        storage = open_storage(data_dir, load_infrastructure_config().storage)
+        if storage is None:
+            raise SystemExit("storage-import needs AUTOMATION_STORAGE_BACKEND=sqlite (or storage.backend in config)")
+        results = {"database": str(storage.path), "imported": import_json_stores(data_dir, storage)}
+    elif args.command == "migrate":
+        database = load_infrastructure_config().database
+        runner = MigrationRunner(database.url, history_table=database.migration_table)
+        applied = runner.apply()
+        results = {**runner.status(), "ran": applied}
     else:
         results = COMMAND_MAP[args.command](data_dir, as_of)
 
-    _write_output(results, args.output)
+    _write_output(results, args.output, args.format)
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -0,0 +1,26 @@
+"""Shared fixtures for the automation prototype tests."""
+from __future__ import annotations
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+DATA_DIR = ROOT / "data"
+
+
+@pytest.fixture
+def sample_data(tmp_path: Path) -> Path:
+    """A scratch copy of the bundled sample CSV and JSON files."""
+
+    target = tmp_path / "data"
+    target.mkdir()
+    for path in DATA_DIR.iterdir():
+        if path.is_file() and path.suffix in {".csv", ".json"}:
+            shutil.copy2(path, target / path.name)
+    return target
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import threading
+from datetime import datetime, timezone
+
+from backend.agents import AgentOrchestrator, AgentRecomputeScheduler
+
+
+class _Orchestrator:
+    def __init__(self) -> None:
+        self.runs = []
+
+    def run_agents(self, agents, as_of):
+        self.runs.append(list(agents))
+        return {}
+
+
+def test_failing_callback_does_not_stop_the_scheduler():
+    calls = []
+
+    def on_complete(agents, as_of, triggers):
+        calls.append(list(agents))
+        if len(calls) == 1:
+            raise RuntimeError("event bus unavailable")
+
+    orchestrator = _Orchestrator()
+    scheduler = AgentRecomputeScheduler(
+        orchestrator, debounce_seconds=0.01, max_delay_seconds=0.05, on_complete=on_complete
+    )
+    scheduler.start()
+    try:
+        now = datetime.now(timezone.utc)
+        scheduler.request(["ordering"], now, trigger="test")
+        assert scheduler.wait_until_fresh(timeout=5)
+        scheduler.request(["finance"], now, trigger="test")
+        assert scheduler.wait_until_fresh(timeout=5)
+    finally:
+        scheduler.stop()
+    assert calls == [["ordering"], ["finance"]]
+    assert orchestrator.runs == [["ordering"], ["finance"]]
+
+
+def test_inline_request_finishes_when_callback_fails():
+    def on_complete(agents, as_of, triggers):
+        raise RuntimeError("event bus unavailable")
+
+    scheduler = AgentRecomputeScheduler(_Orchestrator(), on_complete=on_complete)
+    scheduler.request(["ordering"], datetime.now(timezone.utc), trigger="test")
+    assert scheduler.wait_until_fresh(timeout=0)
+
+
+def test_process_mode_matches_serial(sample_data):
+    as_of = datetime(2024, 8, 21, tzinfo=timezone.utc)
+    agents = ["ordering", "finance"]
+    serial = AgentOrchestrator(sample_data, mode="serial").run_agents(agents, as_of)
+    orchestrator = AgentOrchestrator(sample_data, mode="process", max_workers=2)
+    try:
+        pooled = orchestrator.run_agents(agents, as_of)
+    finally:
+        orchestrator.close()
+    assert all(orchestrator.results[name].ok for name in agents)
+    assert json.dumps(pooled, sort_keys=True, default=str) == json.dumps(serial, sort_keys=True, default=str)
+
+
+def test_thread_mode_times_out_slow_agents_and_keeps_last_success(sample_data, monkeypatch):
+    from backend import agents as agents_module
+
+    release = threading.Event()
+    slow = {"finance"}
+
+    def fake_run(agent, data_dir, as_of):
+        if agent in slow:
+            release.wait(5)
+            raise RuntimeError("finance feed unavailable")
+        return {"agent": agent}, datetime.now(timezone.utc), 1.0
+
+    monkeypatch.setattr(agents_module, "_timed_run", fake_run)
+    orchestrator = AgentOrchestrator(sample_data, mode="thread", agent_timeouts={"finance": 0.05})
+    as_of = datetime(2024, 8, 21)
+    try:
+        slow.clear()
+        orchestrator.run_agents(["ordering", "finance"], as_of)
+        good = orchestrator.results["finance"]
+        slow.add("finance")
+
+        responses = orchestrator.run_agents(["ordering", "finance"], as_of)
+        assert responses["ordering"] == {"agent": "ordering"}
+        assert responses["finance"]["error"].startswith("TimeoutError")
+        result = orchestrator.results["finance"]
+        assert not result.ok and result.last_success is good and result.latest_good is good
+        assert result.duration_ms >= 50
+
+        release.set()
+        responses = orchestrator.run_agents(["finance", "ordering"], as_of)
+        assert responses["finance"]["error"] == "RuntimeError: finance feed unavailable"
+        assert orchestrator.results["finance"].last_success is good
+    finally:
+        release.set()
+        orchestrator.close()
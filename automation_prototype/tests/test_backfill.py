@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from automation.backfill import parse_step, run_backfill
+
+
+def _partitions(directory):
+    return {
+        str(path.relative_to(directory)): path.read_text(encoding="utf-8")
+        for path in sorted(directory.rglob("as_of=*"))
+    }
+
+
+def test_parse_step():
+    assert parse_step("7") == timedelta(days=7)
+    assert parse_step("2w") == timedelta(weeks=2)
+    with pytest.raises(ValueError):
+        parse_step("0d")
+
+
+def test_sub_day_step_is_rejected(sample_data, tmp_path):
+    with pytest.raises(ValueError):
+        run_backfill(sample_data, datetime(2024, 8, 1), datetime(2024, 8, 2), tmp_path / "out", step=timedelta(hours=12))
+
+
+def test_process_pool_backfill_matches_serial(sample_data, tmp_path):
+    start, end = datetime(2024, 8, 20), datetime(2024, 8, 22)
+    serial = run_backfill(sample_data, start, end, tmp_path / "serial", agents=["ordering"], workers=1)
+    parallel = run_backfill(sample_data, start, end, tmp_path / "parallel", agents=["ordering"], workers=2)
+
+    assert serial["dates"] == parallel["dates"] == ["2024-08-20", "2024-08-21", "2024-08-22"]
+    expected = _partitions(tmp_path / "serial")
+    assert expected
+    assert _partitions(tmp_path / "parallel") == expected
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import csv
+import os
+
+from automation import datasets, utils
+
+
+def test_rows_match_csv_dictreader(sample_data):
+    for path in sorted(sample_data.glob("*.csv")):
+        with path.open("r", encoding="utf-8", newline="") as handle:
+            expected = list(csv.DictReader(handle))
+        assert [dict(row) for row in datasets.load_dataset(path).rows()] == expected, path.name
+
+
+def test_dates_are_parsed_on_request(tmp_path):
+    path = tmp_path / "usage.csv"
+    path.write_text("patient_id,last_fulfillment_date\nP1,2024-08-20\nP2,\nP3,08/01/2024\n", encoding="utf-8")
+    rows = utils.load_csv(path, parse_dates=["last_fulfillment_date"])
+    assert [row["last_fulfillment_date"] for row in rows] == [
+        utils.parse_date("2024-08-20"),
+        "",
+        utils.parse_date("2024-08-01"),
+    ]
+
+
+def test_cache_is_reused_until_the_file_changes(tmp_path):
+    path = tmp_path / "levels.csv"
+    path.write_text("sku,on_hand\nA,1\nB,oops\n", encoding="utf-8")
+    first = datasets.load_dataset(path)
+    assert datasets.load_dataset(path) is first
+    assert first.float_column("on_hand", default=-1.0) == (1.0, -1.0)
+    assert first.column("missing") == (None, None)
+
+    path.write_text("sku,on_hand\nA,1\nB,2\nC,3\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = datasets.load_dataset(path)
+    assert second is not first
+    assert second.float_column("on_hand") == (1.0, 2.0, 3.0)
+
+
+def test_short_rows_are_padded_and_blank_lines_skipped(tmp_path):
+    path = tmp_path / "short.csv"
+    path.write_text("a,b,c\n1,2\n\n4,5,6\n", encoding="utf-8")
+    rows = [dict(row) for row in datasets.load_dataset(path).rows()]
+    assert rows == [{"a": "1", "b": "2", "c": None}, {"a": "4", "b": "5", "c": "6"}]
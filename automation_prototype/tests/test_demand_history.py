@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from automation.demand_history import DemandHistoryStore
+from backend.events import EventDispatcher
+from backend.portal import OrderAssessment, PortalOrderStore, subscribe_order_demand
+
+
+def _order(store: PortalOrderStore, disposition: str) -> dict:
+    assessment = OrderAssessment(disposition=disposition, compliance_status="compliant", recommended_quantity=4)
+    return dict(
+        store.create_order(
+            {"patient_id": "P001", "supply_sku": "SKU-1", "quantity": 4}, assessment, datetime.now(timezone.utc)
+        )
+    )
+
+
+def test_order_approved_at_creation_is_recorded(tmp_path):
+    dispatcher = EventDispatcher(tmp_path)
+    store = PortalOrderStore(tmp_path)
+    history = DemandHistoryStore(tmp_path / "demand_history")
+    subscribe_order_demand(dispatcher, store, history)
+
+    order = _order(store, "approved")
+    assert order["status"] == "approved"
+    dispatcher.publish("order.created", {"order_id": order["id"], "status": order["status"]})
+
+    created = datetime.fromisoformat(order["created_at"])
+    assert list(history.window("SKU-1", created, 1)) == [4.0]
+
+
+def test_pending_order_is_recorded_once_approved(tmp_path):
+    dispatcher = EventDispatcher(tmp_path)
+    store = PortalOrderStore(tmp_path)
+    history = DemandHistoryStore(tmp_path / "demand_history")
+    subscribe_order_demand(dispatcher, store, history)
+
+    order = _order(store, "requires_review")
+    dispatcher.publish("intake.order.created", {"order_id": order["id"]})
+    assert history.skus() == []
+
+    store.update_status(order["id"], status="approved", actor="staff", note="ok")
+    dispatcher.publish("order.approved", {"order_id": order["id"]})
+    dispatcher.publish("order.approved", {"order_id": order["id"]})
+    created = datetime.fromisoformat(order["created_at"])
+    assert list(history.window("SKU-1", created, 1)) == [4.0]
+
+
+def _record_batch(directory: str, worker: int) -> None:
+    store = DemandHistoryStore(Path(directory))
+    for batch in range(20):
+        # Every worker replays the shared keys; each worker also brings its own SKU.
+        store.record_many(
+            [
+                (f"shared:{batch}", "SKU-SHARED", "2024-06-01", 1.0),
+                (f"own:{worker}:{batch}", f"SKU-{worker}", "2024-06-01", 1.0),
+            ]
+        )
+
+
+def test_concurrent_writers_do_not_double_count(tmp_path):
+    directory = tmp_path / "demand_history"
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_record_batch, args=(str(directory), worker)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = DemandHistoryStore(directory)
+    day = date(2024, 6, 1)
+    assert list(store.window("SKU-SHARED", day, 1)) == [20.0]
+    for worker in range(4):
+        assert list(store.window(f"SKU-{worker}", day, 1)) == [20.0]
+    index = json.loads((directory / "index.json").read_text(encoding="utf-8"))["skus"]
+    assert len({entry["file"] for entry in index.values()}) == 5
+    assert not list(directory.glob("*.tmp"))
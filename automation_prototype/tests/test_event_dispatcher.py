@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from backend.event_index import EventLogIndex
+from backend.events import EVENT_LOG_FILE, EventDispatcher
+
+
+def _logged(data_dir):
+    return [json.loads(line) for line in (data_dir / EVENT_LOG_FILE).read_text(encoding="utf-8").splitlines()]
+
+
+def test_buffered_publishing_writes_and_dispatches_everything_in_order(tmp_path):
+    dispatcher = EventDispatcher(tmp_path, buffer_size=8, dispatch_queue_size=2)
+    seen = []
+    dispatcher.subscribe("order.*", lambda event: seen.append(event["payload"]["n"]))
+    dispatcher.start()
+
+    def publish(start):
+        for n in range(start, start + 50):
+            dispatcher.publish("order.created", {"order_id": f"ORD-{n}", "n": n})
+
+    threads = [threading.Thread(target=publish, args=(start,)) for start in range(0, 200, 50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert dispatcher.flush(timeout=10)
+
+    logged = [event["payload"]["n"] for event in _logged(tmp_path)]
+    assert sorted(logged) == list(range(200))
+    assert seen == logged
+    for start in range(0, 200, 50):
+        mine = [n for n in logged if start <= n < start + 50]
+        assert mine == sorted(mine)
+    assert len(EventLogIndex.for_log(tmp_path / EVENT_LOG_FILE).offsets()) == 200
+    dispatcher.stop()
+
+
+def test_listener_publishing_from_the_dispatch_thread_does_not_deadlock(tmp_path):
+    dispatcher = EventDispatcher(tmp_path, buffer_size=2, dispatch_queue_size=1)
+
+    def cascade(event):
+        for _ in range(5):
+            dispatcher.publish("order.audited", {"order_id": event["payload"]["order_id"]})
+
+    dispatcher.subscribe("order.created", cascade)
+    dispatcher.start()
+    for n in range(10):
+        dispatcher.publish("order.created", {"order_id": f"ORD-{n}"})
+    dispatcher.stop(timeout=10)
+
+    topics = [event["topic"] for event in _logged(tmp_path)]
+    assert topics.count("order.created") == 10
+    assert topics.count("order.audited") == 50
+
+
+def test_stop_drains_the_buffer_and_returns_to_inline_publishing(tmp_path):
+    dispatcher = EventDispatcher(tmp_path)
+    dispatcher.start()
+    for n in range(20):
+        dispatcher.publish("task.created", {"n": n})
+    dispatcher.stop()
+    assert len(_logged(tmp_path)) == 20
+
+    seen = []
+    dispatcher.subscribe("*", seen.append)
+    dispatcher.publish("task.closed", {"n": 20})
+    assert len(_logged(tmp_path)) == 21 and len(seen) == 1
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+
+from backend.event_index import EventLogIndex
+
+
+def _line(order_id: str, topic: str = "order.created") -> bytes:
+    event = {"topic": topic, "payload": {"order_id": order_id}, "timestamp": "2026-01-01T00:00:00+00:00"}
+    return (json.dumps(event) + "\n").encode("utf-8")
+
+
+def _orders(index: EventLogIndex) -> list:
+    return [event["payload"]["order_id"] for event in index.read(index.offsets())]
+
+
+def test_restart_reuses_sidecar_for_the_same_log(tmp_path):
+    log = tmp_path / "events.jsonl"
+    log.write_bytes(_line("A") + _line("B"))
+    EventLogIndex(log)
+    with log.open("ab") as handle:
+        handle.write(_line("C"))
+
+    index = EventLogIndex(log)
+    assert _orders(index) == ["A", "B", "C"]
+    assert index.offsets(order_id="B") == [len(_line("A"))]
+
+
+def test_sidecar_is_rebuilt_for_a_replaced_log(tmp_path):
+    log = tmp_path / "events.jsonl"
+    log.write_bytes(_line("A") + _line("B"))
+    EventLogIndex(log)
+
+    # Same length, different content, new inode: offsets would still be in range.
+    replacement = tmp_path / "events.new"
+    replacement.write_bytes(_line("X") + _line("Y") + _line("Z"))
+    os.replace(replacement, log)
+
+    index = EventLogIndex(log)
+    assert _orders(index) == ["X", "Y", "Z"]
+    assert index.offsets(order_id="A") == []
+
+
+def test_sidecar_is_rebuilt_when_the_head_was_rewritten_in_place(tmp_path):
+    log = tmp_path / "events.jsonl"
+    log.write_bytes(_line("A") + _line("B"))
+    EventLogIndex(log)
+
+    # Same inode and no shorter, so only the head digest tells the logs apart.
+    log.write_bytes(_line("QQ") + _line("B"))
+
+    index = EventLogIndex(log)
+    assert _orders(index) == ["QQ", "B"]
+
+
+def test_sidecar_without_identity_header_is_rebuilt(tmp_path):
+    log = tmp_path / "events.jsonl"
+    log.write_bytes(_line("A"))
+    index = EventLogIndex(log)
+    index.path.write_text(json.dumps({"o": 0, "e": 1, "t": "bogus"}) + "\n", encoding="utf-8")
+
+    assert _orders(EventLogIndex(log)) == ["A"]
+
+
+def test_final_line_without_newline_is_indexed_once_complete(tmp_path):
+    log = tmp_path / "events.jsonl"
+    complete = _line("B").rstrip(b"\n")
+    log.write_bytes(_line("A") + complete[:10])
+    index = EventLogIndex(log)
+    assert _orders(index) == ["A"]
+
+    log.write_bytes(_line("A") + complete)
+    index.refresh()
+    assert _orders(index) == ["A", "B"]
+
+    with log.open("ab") as handle:
+        handle.write(b"\n" + _line("C"))
+    index.refresh()
+    assert _orders(index) == ["A", "B", "C"]
+    assert _orders(EventLogIndex(log)) == ["A", "B", "C"]
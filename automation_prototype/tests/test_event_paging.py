@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import io
+
+from backend.events import EventDispatcher, _iter_lines_reversed, load_event_page, load_recent_events
+
+
+def _publish(data_dir, count, **options):
+    dispatcher = EventDispatcher(data_dir, **options)
+    for index in range(count):
+        topic = "order.created" if index % 3 else "task.created"
+        dispatcher.publish(topic, {"order_id": f"ORD-{index}", "n": index})
+    return dispatcher
+
+
+def _walk(data_dir, limit, **filters):
+    pages, before = [], None
+    while True:
+        events, before = load_event_page(data_dir, limit=limit, before=before, **filters)
+        pages.append([event["payload"]["n"] for event in events])
+        if before is None:
+            return pages
+
+
+def test_reverse_line_reader_handles_block_boundaries():
+    data = b"".join(b"line-%d-" % index + b"x" * (index % 7) + b"\n" for index in range(50)) + b"tail"
+    expected, offset = [], 0
+    for line in data.split(b"\n"):
+        expected.append((offset, line))
+        offset += len(line) + 1
+    for block_size in (1, 5, 16, 4096):
+        assert list(_iter_lines_reversed(io.BytesIO(data), block_size=block_size)) == list(reversed(expected))
+
+
+def test_pages_walk_back_to_the_start_of_the_log(tmp_path):
+    _publish(tmp_path, 23)
+    pages = _walk(tmp_path, 5)
+    assert pages[0] == [18, 19, 20, 21, 22]
+    assert [n for page in reversed(pages) for n in page] == list(range(23))
+    assert [event["payload"]["n"] for event in load_recent_events(tmp_path, limit=3)] == [20, 21, 22]
+
+
+def test_topic_filter_applies_before_the_limit(tmp_path):
+    _publish(tmp_path, 12)
+    pages = _walk(tmp_path, 2, topics=["task.*"])
+    assert [n for page in reversed(pages) for n in page] == [0, 3, 6, 9]
+
+
+def test_empty_or_missing_log(tmp_path):
+    assert load_event_page(tmp_path, limit=10) == ([], None)
+    _publish(tmp_path, 2)
+    assert load_event_page(tmp_path, limit=0) == ([], None)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+
+from backend.event_segments import EventSegmentStore
+from backend.events import EVENT_LOG_FILE, EventDispatcher, load_event_page, load_events_for_order, replay_events
+
+
+def _segmented_log(data_dir, count=60):
+    dispatcher = EventDispatcher(data_dir, segment_bytes=1500, compression="gzip")
+    for index in range(count):
+        dispatcher.publish("order.created" if index % 2 else "task.created", {"order_id": f"ORD-{index % 5}", "n": index})
+    store = EventSegmentStore.for_log(data_dir / EVENT_LOG_FILE)
+    deadline = time.monotonic() + 10
+    while any(not entry["compression"] for entry in store.entries()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return store
+
+
+def test_log_is_sealed_into_compressed_segments(tmp_path):
+    store = _segmented_log(tmp_path)
+    entries = store.entries()
+    assert len(entries) > 2
+    assert all(entry["compression"] == "gzip" and entry["file"].endswith(".gz") for entry in entries)
+    assert [int(entry["base"]) for entry in entries[1:]] == [
+        int(entry["base"]) + int(entry["bytes"]) for entry in entries[:-1]
+    ]
+    assert sum(entry["count"] for entry in entries) < 60
+    assert not list(store.directory.glob("*.jsonl"))
+
+
+def test_reads_span_sealed_segments_and_the_active_log(tmp_path):
+    _segmented_log(tmp_path)
+
+    numbers, before = [], None
+    while True:
+        events, before = load_event_page(tmp_path, limit=7, before=before)
+        numbers[:0] = [event["payload"]["n"] for event in events]
+        if before is None:
+            break
+    assert numbers == list(range(60))
+
+    assert [event["payload"]["n"] for event in load_events_for_order(tmp_path, "ORD-3")] == list(range(3, 60, 5))
+    replayed = replay_events(tmp_path, topics=["task.*"], order_id="ORD-0")
+    assert [event["payload"]["n"] for event in replayed] == list(range(0, 60, 10))
+
+
+def test_select_skips_segments_that_cannot_match(tmp_path):
+    store = _segmented_log(tmp_path)
+    assert store.select(order_id="ORD-9") == []
+    assert store.select(topics=["payment.*"]) == []
+    assert len(store.select(topics=["order.*"])) == len(store.entries())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import date, timedelta
+
+from automation.demand_history import DemandHistoryStore
+from automation.forecast_models import ForecastModelService
+
+
+def _seed(data_dir, skus=("SKU-A", "SKU-B", "SKU-C"), days=120):
+    store = DemandHistoryStore.for_data_dir(data_dir)
+    start = date(2026, 1, 1)
+    store.record_many(
+        (f"seed:{sku}:{offset}", sku, (start + timedelta(days=offset)).isoformat(), float((offset * (index + 3)) % 7))
+        for index, sku in enumerate(skus)
+        for offset in range(days)
+    )
+    return start + timedelta(days=days - 1)
+
+
+def test_process_pool_fit_matches_serial_fit(tmp_path):
+    last = _seed(tmp_path)
+    serial = ForecastModelService(tmp_path, workers=1, persist=False)
+    parallel = ForecastModelService(tmp_path, workers=2, persist=False)
+
+    assert parallel.refresh()["refit"] == 3
+    expected = {sku: asdict(model) for sku, model in serial.models(last).items()}
+    assert expected
+    assert {sku: asdict(model) for sku, model in parallel.models(last).items()} == expected
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from automation.graph import AgentGraph, AgentNode
+
+AS_OF = datetime(2024, 8, 21)
+
+
+def _graph(tmp_path, calls, gate=None, **options):
+    (tmp_path / "usage.csv").write_text("sku,units\nA,1\n", encoding="utf-8")
+    (tmp_path / "claims.csv").write_text("claim\nC1\n", encoding="utf-8")
+
+    def base(data_dir, as_of, inputs):
+        calls["base"] += 1
+        if gate is not None:
+            gate.wait(5)
+        return {"rows": [1, 2, 3]}
+
+    def consumer(data_dir, as_of, inputs):
+        calls["consumer"] += 1
+        return {"total": sum(inputs["base"]["rows"])}
+
+    def broken(data_dir, as_of, inputs):
+        calls["broken"] += 1
+        raise RuntimeError("boom")
+
+    nodes = {
+        "base": AgentNode("base", base, ("usage.csv",)),
+        "consumer": AgentNode("consumer", consumer, ("claims.csv",), ("base",)),
+        "broken": AgentNode("broken", broken),
+    }
+    return AgentGraph(tmp_path, nodes=nodes, **options)
+
+
+def _touch(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_shared_inputs_are_computed_once(tmp_path):
+    calls = Counter()
+    graph = _graph(tmp_path, calls)
+    assert graph.datasets("consumer") == ("claims.csv", "usage.csv")
+    assert graph.get("consumer", AS_OF) == {"total": 6}
+    assert graph.get("base", AS_OF) == {"rows": [1, 2, 3]}
+    assert graph.get("consumer", AS_OF.replace(tzinfo=timezone.utc)) == {"total": 6}
+    assert calls == {"base": 1, "consumer": 1}
+
+
+def test_results_are_copies(tmp_path):
+    graph = _graph(tmp_path, Counter())
+    graph.get("base", AS_OF)["rows"].append(99)
+    assert graph.get("base", AS_OF) == {"rows": [1, 2, 3]}
+    assert graph.peek("consumer", AS_OF) is None
+
+
+def test_changed_inputs_invalidate_dependents_only(tmp_path):
+    calls = Counter()
+    graph = _graph(tmp_path, calls)
+    graph.get("consumer", AS_OF)
+    _touch(tmp_path / "claims.csv")
+    graph.get("consumer", AS_OF)
+    assert calls == {"base": 1, "consumer": 2}
+    _touch(tmp_path / "usage.csv")
+    graph.get("consumer", AS_OF)
+    assert calls == {"base": 2, "consumer": 3}
+
+
+def test_tolerance_reuses_a_nearby_result(tmp_path):
+    calls = Counter()
+    graph = _graph(tmp_path, calls)
+    graph.get("base", AS_OF)
+    graph.get("base", AS_OF + timedelta(minutes=5), tolerance=timedelta(minutes=10))
+    assert calls["base"] == 1
+    graph.get("base", AS_OF + timedelta(hours=1), tolerance=timedelta(minutes=10))
+    assert calls["base"] == 2
+
+
+def test_concurrent_requests_share_one_computation(tmp_path):
+    calls = Counter()
+    gate = threading.Event()
+    graph = _graph(tmp_path, calls, gate=gate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(graph.get("base", AS_OF))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert calls["base"] == 1
+    assert results == [{"rows": [1, 2, 3]}] * 4
+
+
+def test_failures_are_not_cached_and_old_entries_are_evicted(tmp_path):
+    calls = Counter()
+    graph = _graph(tmp_path, calls, max_entries=2)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            graph.get("broken", AS_OF)
+    assert calls["broken"] == 2
+
+    for day in range(3):
+        graph.get("base", AS_OF + timedelta(days=day))
+    assert graph.peek("base", AS_OF) is None
+    assert graph.peek("base", AS_OF + timedelta(days=2)) == {"rows": [1, 2, 3]}
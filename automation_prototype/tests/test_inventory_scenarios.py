@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from automation.demand_history import DemandHistoryStore
+from automation.predictive_inventory import (
+    DEFAULT_LEAD_TIME_DAYS,
+    forecast_inventory,
+    forecast_scenarios,
+    load_inventory_inputs,
+    run_inventory_scenarios,
+    scenario_grid,
+)
+
+AS_OF = datetime(2024, 8, 21)
+
+
+def _seed_history(data_dir, sku="INC-XL-24", days=120):
+    start = date(2024, 4, 1)
+    DemandHistoryStore.for_data_dir(data_dir).record_many(
+        (f"seed:{offset}", sku, (start + timedelta(days=offset)).isoformat(), float(3 + offset % 5))
+        for offset in range(days)
+    )
+
+
+def test_scenario_grid_is_growth_major():
+    assert scenario_grid([0, 10], [-2, 3]) == [(0.0, -2), (0.0, 3), (10.0, -2), (10.0, 3)]
+    assert scenario_grid([], []) == [(0.0, 0)]
+
+
+@pytest.mark.parametrize("with_history", [False, True])
+def test_one_pass_matches_forecasting_each_scenario(sample_data, with_history):
+    if with_history:
+        _seed_history(sample_data)
+    inputs = load_inventory_inputs(sample_data, AS_OF)
+    assert bool(inputs.models) is with_history
+    levers = [(growth / 100.0, DEFAULT_LEAD_TIME_DAYS + delta) for growth, delta in scenario_grid([-20, 0, 35], [-3, 0, 9])]
+
+    batched = forecast_scenarios(sample_data, AS_OF, levers, inputs=inputs)
+    expected = [
+        forecast_inventory(sample_data, AS_OF, growth_adjustment=growth, lead_time_days=lead, inputs=inputs)
+        for growth, lead in levers
+    ]
+    assert batched == expected
+
+
+def test_scenarios_report_deltas_against_the_baseline(sample_data):
+    result = run_inventory_scenarios(sample_data, AS_OF, [(0.0, 0), (25.0, 4)])
+    unchanged, grown = result["scenarios"]
+    assert unchanged["scenario"] == result["baseline"]
+    assert all(value == 0 for delta in unchanged["deltas"].values() for value in delta.values() if isinstance(value, (int, float)))
+    assert grown["lead_time_applied"] == DEFAULT_LEAD_TIME_DAYS + 4
+    assert any(delta["forecast_units"] > 0 for delta in grown["deltas"].values())
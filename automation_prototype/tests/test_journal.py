@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+
+from automation.utils import journal_path, load_journaled_records
+from backend.tasks import TaskStore
+
+
+def _write_journal(snapshot, *records, torn: str = "") -> None:
+    lines = "".join(json.dumps({"op": "put", "record": record}) + "\n" for record in records)
+    journal_path(snapshot).write_text(lines + torn, encoding="utf-8")
+
+
+def test_journal_replays_over_snapshot(tmp_path):
+    snapshot = tmp_path / "tasks.json"
+    snapshot.write_text(json.dumps({"tasks": [{"id": "T1", "status": "open"}, {"title": "legacy"}]}), encoding="utf-8")
+    _write_journal(
+        snapshot,
+        {"id": "T1", "status": "closed"},
+        {"id": "T2", "status": "open"},
+        {"title": "no id"},
+        {"title": "also no id"},
+        torn='{"op": "put", "record": {"id": "T3"',
+    )
+
+    records = load_journaled_records(snapshot, "tasks")
+    assert records == [
+        {"id": "T1", "status": "closed"},
+        {"title": "legacy"},
+        {"id": "T2", "status": "open"},
+        {"title": "no id"},
+        {"title": "also no id"},
+    ]
+
+
+def test_task_store_restart_replays_the_journal(tmp_path):
+    store = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    task = store.create_task(title="Call payer", task_type="payer_followup")
+    store.update_status(task["id"], "in_progress")
+    assert not store.path.exists()
+    assert len(store.journal_path.read_text(encoding="utf-8").splitlines()) == 2
+
+    reopened = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    assert reopened.get_task(task["id"])["status"] == "in_progress"
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    store = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    first = store.create_task(title="First", task_type="intake")
+    store.compact()
+    assert store.journal_path.read_bytes() == b""
+    assert [task["id"] for task in json.loads(store.path.read_text(encoding="utf-8"))["tasks"]] == [first["id"]]
+
+    second = store.create_task(title="Second", task_type="intake")
+    reopened = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    assert {task["id"] for task in reopened.list_tasks()} == {first["id"], second["id"]}
+
+
+def test_rewrite_mode_folds_a_leftover_journal(tmp_path):
+    store = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    task = store.create_task(title="Pending", task_type="intake")
+
+    plain = TaskStore(tmp_path, journal=False)
+    assert not plain.journal_path.exists()
+    assert [entry["id"] for entry in json.loads(plain.path.read_text(encoding="utf-8"))["tasks"]] == [task["id"]]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from automation import jsonstream, utils
+
+DOCUMENT = {
+    "summary": {"count": 2, "label": "café", "empty": {}, "none": None},
+    "orders": [{"id": "A", "lines": [1, 2]}, {"id": "B", "lines": []}],
+    "tags": ("x", "y"),
+    "nothing": [],
+    "ratio": 0.5,
+}
+
+
+def _write(value, format):
+    handle = io.StringIO()
+    jsonstream.write(value, handle, format=format)
+    return handle.getvalue()
+
+
+def test_json_and_compact_match_json_dumps():
+    assert _write(DOCUMENT, "json") == json.dumps(DOCUMENT, indent=2) + "\n"
+    assert _write(DOCUMENT, "compact") == json.dumps(DOCUMENT, separators=(",", ":")) + "\n"
+    assert _write([], "json") == "[]\n"
+    assert _write("scalar", "json") == '"scalar"\n'
+
+
+def test_generators_are_streamed_and_counts_follow_them():
+    consumed = []
+
+    def rows():
+        for index in range(3):
+            consumed.append(index)
+            yield {"n": index}
+
+    events, count = jsonstream.counted(rows())
+    text = _write({"events": events, "count": count}, "json")
+    assert json.loads(text) == {"events": [{"n": 0}, {"n": 1}, {"n": 2}], "count": 3}
+    assert consumed == [0, 1, 2]
+
+
+def test_ndjson_flattens_lists_and_scalars():
+    lines = [json.loads(line) for line in _write(DOCUMENT, "ndjson").splitlines()]
+    assert lines == [
+        {"path": "summary", "record": {"count": 2, "label": "café", "none": None}},
+        {"path": "orders", "record": {"id": "A", "lines": [1, 2]}},
+        {"path": "orders", "record": {"id": "B", "lines": []}},
+        {"path": "tags", "record": "x"},
+        {"path": "tags", "record": "y"},
+        {"ratio": 0.5},
+    ]
+    assert _write([{"a": 1}, {"a": 2}], "ndjson") == '{"a":1}\n{"a":2}\n'
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        jsonstream.JsonStreamWriter(io.StringIO(), format="yaml")
+
+
+def test_export_json_writes_each_format(tmp_path):
+    records = [{"id": index} for index in range(3)]
+    utils.export_json(iter(records), tmp_path / "out" / "records.json")
+    assert json.loads((tmp_path / "out" / "records.json").read_text(encoding="utf-8")) == records
+    utils.export_json(records, tmp_path / "records.ndjson", format="ndjson")
+    assert (tmp_path / "records.ndjson").read_text(encoding="utf-8").splitlines() == [
+        json.dumps(record, separators=(",", ":")) for record in records
+    ]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from backend.migrations.runner import MigrationRunner, discover_migrations
+
+
+def _package(root, name, modules):
+    package = root / name
+    package.mkdir()
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    for module, statements in modules.items():
+        body = f"def generate_statements():\n    return {list(statements)!r}\n"
+        (package / f"{module}.py").write_text(body, encoding="utf-8")
+    return name
+
+
+def _history(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT version, name FROM schema_history ORDER BY version").fetchall()
+
+
+def test_discovery_orders_by_version(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    name = _package(
+        tmp_path,
+        "ordered_migrations",
+        {
+            "v010_late": ["CREATE TABLE c (id INTEGER)"],
+            "v002_middle": ["CREATE TABLE b (id INTEGER)"],
+            "v001_first": ["CREATE TABLE a (id INTEGER)"],
+            "helpers": [],
+        },
+    )
+    assert [(m.version, m.name) for m in discover_migrations(name)] == [(1, "first"), (2, "middle"), (10, "late")]
+    assert [m.version for m in discover_migrations()] == [1, 2]
+
+
+def test_duplicate_versions_are_rejected(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    name = _package(tmp_path, "duplicate_migrations", {"v001_a": [], "v001_b": []})
+    with pytest.raises(ValueError, match="Duplicate migration version 1"):
+        discover_migrations(name)
+
+
+def test_target_then_remaining_versions(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    name = _package(
+        tmp_path,
+        "target_migrations",
+        {"v001_a": ["CREATE TABLE a (id INTEGER)"], "v002_b": ["CREATE INDEX ix_a ON a (id)"]},
+    )
+    path = tmp_path / "db.sqlite3"
+    runner = MigrationRunner(f"sqlite:///{path}", migrations=discover_migrations(name))
+    assert [entry["version"] for entry in runner.apply(target=1)] == [1]
+    assert [entry["version"] for entry in runner.status()["pending"]] == [2]
+    assert [entry["version"] for entry in runner.apply()] == [2]
+    assert runner.apply() == []
+    assert _history(path) == [(1, "a"), (2, "b")]
+
+
+def test_failed_migration_leaves_no_partial_schema(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    name = _package(
+        tmp_path,
+        "failing_migrations",
+        {"v001_ok": ["CREATE TABLE a (id INTEGER)"], "v002_bad": ["CREATE TABLE b (id INTEGER)", "NOT SQL"]},
+    )
+    path = tmp_path / "db.sqlite3"
+    with pytest.raises(sqlite3.OperationalError):
+        MigrationRunner(f"sqlite:///{path}", migrations=discover_migrations(name)).apply()
+    assert _history(path) == [(1, "ok")]
+    with sqlite3.connect(path) as connection:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "a" in tables and "b" not in tables
+
+
+def test_modified_migration_fails_the_run(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    name = _package(tmp_path, "modified_migrations", {"v001_a": ["CREATE TABLE a (id INTEGER)"]})
+    path = tmp_path / "db.sqlite3"
+    migrations = discover_migrations(name)
+    MigrationRunner(f"sqlite:///{path}", migrations=migrations).apply()
+
+    migrations[0].module.generate_statements = lambda: iter(["CREATE TABLE a (id INTEGER, extra TEXT)"])
+    runner = MigrationRunner(f"sqlite:///{path}", migrations=migrations)
+    assert [entry["version"] for entry in runner.status()["modified"]] == [1]
+    with pytest.raises(RuntimeError, match="v001_a"):
+        runner.apply()
+
+
+def test_concurrent_runners_apply_each_version_once(tmp_path):
+    path = tmp_path / "db.sqlite3"
+    ran = []
+    errors = []
+
+    def run():
+        try:
+            ran.extend(entry["version"] for entry in MigrationRunner(f"sqlite:///{path}").apply())
+        except Exception as exc:  # pragma: no cover - reported by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sorted(ran) == [1, 2]
+    assert _history(path) == [(1, "init"), (2, "event_indexes")]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import csv
+import os
+from datetime import datetime
+
+from automation.order_lookup import OrderLookupService
+from automation.ordering import assess_portal_order
+
+AS_OF = datetime(2024, 8, 21)
+
+
+def _append(path, line):
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(line + "\n")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+
+
+def _rows(path):
+    with path.open(newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_lookups_match_a_scan_of_the_csvs(sample_data):
+    service = OrderLookupService(sample_data)
+    usage = _rows(sample_data / "patient_usage.csv")
+    compliance = _rows(sample_data / "compliance_status.csv")
+    inventory = _rows(sample_data / "inventory_levels.csv")
+    for row in usage:
+        first = next(r for r in usage if (r["patient_id"], r["supply_sku"]) == (row["patient_id"], row["supply_sku"]))
+        assert service.usage(row["patient_id"], row["supply_sku"])["avg_daily_use"] == first["avg_daily_use"]
+    for row in compliance:
+        last = [r for r in compliance if (r["patient_id"], r["supply_sku"]) == (row["patient_id"], row["supply_sku"])][-1]
+        assert service.compliance(row["patient_id"], row["supply_sku"])["f2f_status"] == last["f2f_status"]
+    for row in inventory:
+        last = [r for r in inventory if r["supply_sku"] == row["supply_sku"]][-1]
+        assert service.inventory(row["supply_sku"])["on_hand_units"] == last["on_hand_units"]
+    assert service.usage("P404", "NOPE") is None
+
+
+def test_duplicate_keys_keep_first_usage_and_last_compliance(sample_data):
+    service = OrderLookupService(sample_data)
+    service.refresh()
+    _append(sample_data / "patient_usage.csv", "P001,INC-XL-24,99.0,1,2024-08-21")
+    _append(sample_data / "compliance_status.csv", "P001,INC-XL-24,expired,on_file,approved,2024-10-01")
+    assert service.usage("P001", "INC-XL-24")["avg_daily_use"] == "4.0"
+    assert service.compliance("P001", "INC-XL-24")["f2f_status"] == "expired"
+    status = service.status()
+    assert status["patient_usage"]["appends"] == 1
+    assert status["patient_usage"]["rebuilds"] == 1
+
+
+def test_rewritten_file_is_rebuilt(sample_data):
+    service = OrderLookupService(sample_data)
+    assert service.inventory("INC-XL-24")["on_hand_units"] == "80"
+    path = sample_data / "inventory_levels.csv"
+    text = path.read_text(encoding="utf-8").replace("INC-XL-24,80,", "INC-XL-24,5,")
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert service.inventory("INC-XL-24")["on_hand_units"] == "5"
+    assert service.status()["inventory_levels"]["rebuilds"] == 2
+
+
+def test_assess_portal_order_picks_up_edits(sample_data):
+    kwargs = dict(patient_id="P001", supply_sku="INC-XL-24", quantity=1, requested_date="2024-08-25", as_of=AS_OF)
+    first = assess_portal_order(sample_data, **kwargs)
+    assert first["disposition"] == "approved"
+    assert first["recommended_quantity"] == 120
+    assert first["recommended_fulfillment"] == "dropship"
+
+    _append(sample_data / "compliance_status.csv", "P001,INC-XL-24,current,missing,approved,2024-10-01")
+    held = assess_portal_order(sample_data, **kwargs)
+    assert held["disposition"] == "requires_review"
+    assert held["notes"] == ["WOPD missing", "Warehouse inventory low (80 on hand)"]
+
+    missing = assess_portal_order(sample_data, **{**kwargs, "patient_id": "P404", "supply_sku": "NOPE"})
+    assert missing["compliance_status"] == "unknown"
+    assert missing["recommended_fulfillment"] == "dropship"
+    assert "SKU missing from inventory table" in missing["notes"]
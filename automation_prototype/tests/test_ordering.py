@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from automation.ordering import generate_patient_work_orders
+
+
+def _run(data_dir, as_of, engine):
+    orders, alerts = generate_patient_work_orders(data_dir, as_of, engine=engine)
+    return [order.to_dict() for order in orders], [alert.to_dict() for alert in alerts]
+
+
+@pytest.mark.parametrize("as_of", [datetime(2024, 8, 21), datetime(2024, 9, 1), datetime(2025, 1, 1)])
+def test_numpy_engine_matches_python_engine_on_sample_data(sample_data, as_of):
+    expected = _run(sample_data, as_of, "python")
+    assert expected[0]
+    assert _run(sample_data, as_of, "numpy") == expected
+
+
+def test_numpy_engine_matches_python_engine_on_edge_cases(tmp_path):
+    (tmp_path / "patient_usage.csv").write_text(
+        "patient_id,supply_sku,avg_daily_use,days_supply_remaining,last_fulfillment_date\n"
+        "P1,SKU-A,2.0,3,2024-08-01\n"
+        "P2,SKU-B,0.01,0,2024-08-01\n"  # quantity floors at 1
+        "P3,SKU-A,1.5,,2024-08-01\n"  # blank days remaining counts as zero
+        "P4,SKU-Z,1.0,5,2024-08-01\n"  # no compliance row, SKU missing from inventory
+        "P5,SKU-A,1.0,30,2024-08-01\n"  # above the reorder threshold
+        "P6,SKU-B,3.0,4,2024-08-01\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "compliance_status.csv").write_text(
+        "patient_id,supply_sku,f2f_status,wopd_status,prior_auth_status,next_due_date\n"
+        "P1,SKU-A,expired,missing,pending,2024-08-01\n"
+        "P1,SKU-A,current,on_file,approved,2024-12-01\n"  # later row wins
+        "P2,SKU-B,current,on_file,not_required,2024-09-01\n"  # due exactly on depletion
+        "P3,SKU-A,current,on_file,approved,2024-09-01\n"
+        "P6,SKU-B,current,missing,approved,2025-01-01\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "inventory_levels.csv").write_text(
+        "supply_sku,on_hand_units,reorder_point_units,lead_time_days,vendor\n"
+        "SKU-A,10,5,7,V1\n"
+        "SKU-B,500,5,7,V1\n"
+        "SKU-B,1,5,7,V1\n",  # later row wins
+        encoding="utf-8",
+    )
+    as_of = datetime(2024, 9, 1)
+    expected = _run(tmp_path, as_of, "python")
+    assert [order["patient_id"] for order in expected[0]] == ["P1", "P2", "P3", "P4", "P6"]
+    assert _run(tmp_path, as_of, "numpy") == expected
+
+
+def test_unknown_engine_is_rejected(sample_data):
+    with pytest.raises(ValueError):
+        generate_patient_work_orders(sample_data, datetime(2024, 8, 21), engine="fortran")
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from automation import safety_stock
+from automation.safety_stock import MAX_PATHS, SafetyStockSimulator
+
+SKUS = [f"SKU-{index}" for index in range(7)]
+FORECASTS = {
+    sku: {"forecast_units": 60 + 10 * index, "lead_time_days": 5 + index, "on_hand": 80}
+    for index, sku in enumerate(SKUS)
+}
+
+
+def _simulator(paths: int = 500) -> SafetyStockSimulator:
+    return SafetyStockSimulator(SKUS, {sku: 0.4 for sku in SKUS}, paths=paths, seed=7)
+
+
+def test_paths_limit():
+    with pytest.raises(ValueError):
+        _simulator(paths=MAX_PATHS + 1)
+
+
+def test_results_do_not_depend_on_which_skus_are_run():
+    full = _simulator().run(FORECASTS)
+    subset = _simulator().run({sku: FORECASTS[sku] for sku in SKUS[3:5]})
+    assert subset == {sku: full[sku] for sku in SKUS[3:5]}
+    assert all(0.0 <= entry["stockout_probability"] <= 1.0 for entry in full.values())
+
+
+def test_chunks_bound_memory_and_regenerate_identical_draws(monkeypatch):
+    monkeypatch.setattr(safety_stock, "CHUNK_CELLS", 1000)
+    cached = _simulator()
+    assert cached.chunk_rows == 2
+    expected = cached.run(FORECASTS)
+    assert len(cached._cache) == 4
+    assert all(lead.size <= 1000 and shock.size <= 1000 for lead, shock in cached._cache.values())
+
+    monkeypatch.setattr(safety_stock, "CACHED_CELLS", 0)
+    uncached = _simulator()
+    assert uncached._cache is None
+    assert uncached.run(FORECASTS) == expected
+    assert uncached.run(FORECASTS) == expected
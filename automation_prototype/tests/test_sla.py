@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from backend.events import EventDispatcher, load_events_for_order
+from backend.sla import SlaService, SlaState, evaluate, evaluate_state
+from backend.tasks import TaskStore
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TOPICS = [
+    "order.created",
+    "order.approved",
+    "shipment.delivered",
+    "claim.paid",
+    "order.status",
+    "order.first_pass",
+    "task.created",
+    "order.lapsed",
+    "audit.ready",
+]
+
+
+def _timeline(rng, order_id="ORD-1", count=30):
+    events = []
+    for _ in range(count):
+        topic = rng.choice(TOPICS)
+        payload = {"order_id": order_id}
+        if topic == "order.first_pass":
+            payload["success"] = rng.random() < 0.5
+        if topic == "task.created":
+            payload["task_type"] = rng.choice(["rework", "intake"])
+        stamp = START + timedelta(hours=rng.randrange(200))
+        events.append({"topic": topic, "payload": payload, "timestamp": stamp.isoformat()})
+    return events
+
+
+def test_merged_partial_folds_equal_one_fold():
+    rng = random.Random(11)
+    for _ in range(50):
+        events = _timeline(rng)
+        whole = SlaState.from_events(events)
+        cuts = sorted(rng.sample(range(1, len(events)), 3))
+        merged = SlaState()
+        for start, end in zip([0] + cuts, cuts + [len(events)]):
+            merged.merge(SlaState.from_events(events[start:end]))
+        assert merged == whole
+
+
+def test_folded_state_scores_like_the_full_timeline():
+    rng = random.Random(3)
+    evaluated_at = START + timedelta(days=20)
+    for _ in range(20):
+        events = sorted(_timeline(rng), key=lambda event: event["timestamp"])
+        assert evaluate(events, evaluated_at=evaluated_at) == evaluate_state(
+            SlaState.from_events(events), evaluated_at=evaluated_at
+        )
+
+
+def test_service_tails_the_log_and_rebuilds_evicted_orders(tmp_path):
+    dispatcher = EventDispatcher(tmp_path)
+    service = SlaService(
+        data_dir=tmp_path, dispatcher=dispatcher, task_store=TaskStore(tmp_path, journal=False), max_cached_orders=1
+    )
+    dispatcher.publish("order.created", {"order_id": "ORD-1"})
+    dispatcher.publish("order.created", {"order_id": "ORD-2"})  # evicts ORD-1
+
+    # Another process appends to the same log without going through this dispatcher.
+    EventDispatcher(tmp_path).publish("shipment.delivered", {"order_id": "ORD-1"})
+
+    score = service.score("ORD-1")
+    assert score is not None
+    events = load_events_for_order(tmp_path, "ORD-1")
+    assert "shipment.delivered" in {event["topic"] for event in events}
+    expected = evaluate_state(SlaState.from_events(events), policy=service.policy, policy_version=service.policy_version)
+    assert score.metrics == expected.metrics
+    assert service.score("ORD-404") is None
+
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from backend.events import EventDispatcher
+from backend.sla_portfolio import score_portfolio
+
+
+def test_process_pool_fold_matches_serial_fold(tmp_path):
+    dispatcher = EventDispatcher(tmp_path, segment_bytes=2048, compression=None)
+    for index in range(40):
+        order_id = f"ORD-{index % 7}"
+        dispatcher.publish("order.created", {"order_id": order_id})
+        dispatcher.publish("order.first_pass", {"order_id": order_id, "success": index % 3 != 0})
+        if index % 2:
+            dispatcher.publish("order.delivered", {"order_id": order_id})
+
+    evaluated_at = datetime.now(timezone.utc)
+    serial = score_portfolio(tmp_path, workers=1, evaluated_at=evaluated_at)
+    parallel = score_portfolio(tmp_path, workers=2, evaluated_at=evaluated_at)
+    assert len(serial.orders["order_id"]) == 7
+    assert parallel.to_dict() == serial.to_dict()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from automation import utils
+from backend.portal import OrderAssessment, PortalOrderStore
+from backend.storage import COLLECTIONS, CollectionSpec, SqliteCollection, SqliteStorage
+from backend.tasks import TaskStore
+
+
+def _create(store: PortalOrderStore, patient_id: str) -> dict:
+    assessment = OrderAssessment(disposition="approved", compliance_status="compliant", recommended_quantity=2)
+    return dict(
+        store.create_order(
+            {"patient_id": patient_id, "supply_sku": "SKU-1", "quantity": 2}, assessment, datetime.now(timezone.utc)
+        )
+    )
+
+
+def test_opening_storage_applies_store_migrations(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    storage = SqliteStorage(path)
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT version, name FROM store_schema_history").fetchall() == [
+        (1, "record_collections")
+    ]
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {f"store_{name}" for name in COLLECTIONS} <= tables
+    assert storage.migrate() == []
+    assert SqliteStorage(path).migrate() == []
+
+
+def test_collection_rejects_spec_without_migrated_columns(tmp_path):
+    storage = SqliteStorage(tmp_path / "store.sqlite3")
+    spec = CollectionSpec("tasks", "id", ("status", "owner"))
+    with pytest.raises(RuntimeError, match="owner"):
+        SqliteCollection(storage, spec)
+
+
+def test_sqlite_portal_writes_append_to_the_journal(tmp_path):
+    storage = SqliteStorage(tmp_path / "store.sqlite3")
+    store = PortalOrderStore(tmp_path, storage=storage, compact_seconds=3600)
+    snapshot = store.path.read_bytes()
+
+    first = _create(store, "P001")
+    second = _create(store, "P002")
+    store.update_status(first["id"], status="fulfilled", actor="staff")
+
+    # The snapshot is not rewritten per write; readers replay the journal over it.
+    assert store.path.read_bytes() == snapshot
+    assert len(store.journal_path.read_text(encoding="utf-8").splitlines()) == 3
+    mirrored = {order["id"]: order for order in utils.load_journaled_records(store.path, "orders")}
+    assert mirrored[first["id"]]["status"] == "fulfilled"
+    assert second["id"] in mirrored
+
+    store.compact()
+    assert store.journal_path.read_bytes() == b""
+    folded = json.loads(store.path.read_text(encoding="utf-8"))["orders"]
+    assert {order["id"] for order in folded} == {first["id"], second["id"]}
+
+
+def test_sqlite_store_imports_json_on_first_open(tmp_path):
+    json_store = PortalOrderStore(tmp_path)
+    order = _create(json_store, "P001")
+    tasks = TaskStore(tmp_path)
+    task = tasks.create_task(title="Review", task_type="portal_hold", priority="high")
+
+    storage = SqliteStorage(tmp_path / "store.sqlite3")
+    assert PortalOrderStore(tmp_path, storage=storage).get_order(order["id"])["patient_id"] == "P001"
+    assert TaskStore(tmp_path, storage=storage).get_task(task["id"]) is not None
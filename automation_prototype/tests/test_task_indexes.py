@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import random
+
+from backend.tasks import OPEN_STATUSES, TaskStore
+
+STATUSES = ("open", "in_progress", "closed", "blocked")
+TYPES = ("intake", "payer_followup", "sla_breach")
+
+
+def _brute_force(store, status=None, task_types=None):
+    tasks = [store.get_task(task["id"]) for task in store.list_tasks()]
+    if status:
+        tasks = [task for task in tasks if task["status"].lower() in set(status.split(","))]
+    if task_types:
+        tasks = [task for task in tasks if task["task_type"].lower() in task_types]
+    return sorted(task["id"] for task in tasks)
+
+
+def test_indexes_follow_every_mutation(tmp_path):
+    rng = random.Random(7)
+    store = TaskStore(tmp_path, journal=False)
+    ids = []
+    for index in range(60):
+        task = store.create_task(
+            title=f"Task {index}",
+            task_type=rng.choice(TYPES),
+            metadata={"order_id": f"ORD-{rng.randrange(8)}", "claim_id": f"CLM-{rng.randrange(4)}"},
+        )
+        ids.append(task["id"])
+    for _ in range(80):
+        action = rng.random()
+        if action < 0.6:
+            store.update_status(rng.choice(ids), rng.choice(STATUSES))
+        elif action < 0.8:
+            store.close_tasks_for_order(f"ORD-{rng.randrange(8)}")
+        else:
+            store.close_tasks_by_metadata("claim_id", f"CLM-{rng.randrange(4)}")
+
+        for status in ("open", "closed", "open,blocked", "IN_PROGRESS"):
+            assert sorted(task["id"] for task in store.list_tasks(status)) == _brute_force(store, status.lower())
+        for types in (["intake"], ["payer_followup", "sla_breach"]):
+            assert sorted(task["id"] for task in store.list_tasks_by_type(types)) == _brute_force(store, None, types)
+            assert sorted(task["id"] for task in store.list_tasks_by_type(types, status="closed")) == _brute_force(
+                store, "closed", types
+            )
+        for order in range(8):
+            expected = any(
+                task["metadata"].get("order_id") == f"ORD-{order}" and task["status"].lower() in OPEN_STATUSES
+                for task in store.list_tasks()
+            )
+            assert store.has_open_task_for_order(f"ORD-{order}") is expected
+
+
+def test_indexes_are_rebuilt_on_load(tmp_path):
+    store = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    task = store.create_task(title="Follow up", task_type="payer_followup", metadata={"order_id": "ORD-1"})
+    store.update_status(task["id"], "closed")
+    other = store.create_task(title="Intake", task_type="intake", metadata={"order_id": "ORD-1"})
+
+    reopened = TaskStore(tmp_path, compact_bytes=1 << 30, compact_seconds=3600)
+    assert [item["id"] for item in reopened.list_tasks("open")] == [other["id"]]
+    assert [item["id"] for item in reopened.list_tasks_by_type(["payer_followup"])] == [task["id"]]
+    assert reopened.close_tasks_for_order("ORD-1")[0]["id"] == other["id"]
+    assert not reopened.has_open_task_for_order("ORD-1")
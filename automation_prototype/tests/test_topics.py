@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+
+from backend.topics import TopicRouter
+from backend.webhooks import WebhookRegistry
+
+PATTERNS = ["order.created", "order.*", "*", "task.?losed", "sla.[bc]*", "order.created"]
+TOPICS = ["order.created", "order.approved", "task.closed", "task.created", "sla.breach", "sla.cleared", "Order.created"]
+
+
+def test_matches_fnmatchcase_in_registration_order():
+    router: TopicRouter[int] = TopicRouter()
+    for index, pattern in enumerate(PATTERNS):
+        router.add(pattern, index)
+    for topic in TOPICS:
+        exact = [index for index, pattern in enumerate(PATTERNS) if pattern == topic]
+        wildcard = [index for index, pattern in enumerate(PATTERNS) if pattern != topic and fnmatchcase(topic, pattern)]
+        assert router.match(topic) == tuple(exact + wildcard), topic
+
+
+def test_cache_is_invalidated_when_subscriptions_change():
+    router: TopicRouter[str] = TopicRouter(cache_size=2)
+    router.add("order.*", "a")
+    assert router.match("order.created") == ("a",)
+    router.add("order.created", "b")
+    assert router.match("order.created") == ("b", "a")
+    assert router.remove("order.*", "a")
+    assert not router.remove("order.*", "a")
+    assert router.match("order.created") == ("b",)
+    for topic in TOPICS:
+        router.match(topic)
+    assert len(router._cache) <= 2
+    router.clear()
+    assert router.match("order.created") == ()
+
+
+def test_webhook_registry_routes_through_patterns(tmp_path):
+    registry = WebhookRegistry(tmp_path)
+    orders = registry.add("https://a.example/hook", ["order.*"])
+    everything = registry.add("https://b.example/hook", ["*"])
+    assert [hook["id"] for hook in registry.match("order.created")] == [orders["id"], everything["id"]]
+    assert [hook["id"] for hook in registry.match("task.closed")] == [everything["id"]]
+    registry.remove(everything["id"])
+    assert registry.match("task.closed") == []
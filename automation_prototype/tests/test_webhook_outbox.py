@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+
+from backend.webhooks import WebhookOutbox
+
+WEBHOOK = {"id": "WH-1", "url": "https://receiver.example/hook"}
+
+
+def _event(number):
+    return {"topic": "order.created", "payload": {"order_id": f"ORD-{number}"}, "timestamp": "2026-01-01T00:00:00+00:00"}
+
+
+def _settle(outbox):
+    if outbox._compactor is not None:
+        outbox._compactor.join()
+
+
+def _fill(outbox, count):
+    return [outbox.enqueue(WEBHOOK, _event(number)) for number in range(count)]
+
+
+def test_enqueue_and_status_only_append(tmp_path):
+    outbox = WebhookOutbox(tmp_path)
+    first, second = _fill(outbox, 2)
+    segment = tmp_path / "webhook_outbox" / "00000001.jsonl"
+    before = segment.read_bytes()
+    assert outbox.mark_status(first["id"], "delivered")
+    after = segment.read_bytes()
+    assert after.startswith(before)
+    assert json.loads(after[len(before):])["op"] == "status"
+    assert [entry["id"] for entry in outbox.pending_entries()] == [second["id"]]
+    assert not outbox.mark_status("DL-MISSING", "delivered")
+
+
+def test_restart_resumes_from_the_cursor(tmp_path):
+    outbox = WebhookOutbox(tmp_path, segment_bytes=512)
+    entries = _fill(outbox, 12)
+    for entry in entries[:-1]:
+        outbox.mark_status(entry["id"], "delivered")
+    outbox.flush()
+    _settle(outbox)
+    cursor = json.loads((tmp_path / "webhook_outbox" / "cursor.json").read_text())
+    assert cursor["segment"] > 1
+
+    reopened = WebhookOutbox(tmp_path, segment_bytes=512)
+    assert [entry["id"] for entry in reopened.pending_entries()] == [entries[-1]["id"]]
+    assert reopened._positions[entries[-1]["id"]][0] >= cursor["segment"]
+
+
+def test_failed_entry_can_be_requeued(tmp_path):
+    outbox = WebhookOutbox(tmp_path)
+    (entry,) = _fill(outbox, 1)
+    outbox.mark_status(entry["id"], "failed", error="boom")
+    assert outbox.pending_entries() == []
+    outbox.mark_status(entry["id"], "pending", next_attempt_at="2026-01-01T00:05:00+00:00")
+    (pending,) = WebhookOutbox(tmp_path).pending_entries()
+    assert pending["id"] == entry["id"]
+    assert pending["attempts"] == 2
+
+
+def test_compaction_folds_settled_segments(tmp_path):
+    outbox = WebhookOutbox(tmp_path, segment_bytes=512, retain_segments=100)
+    entries = _fill(outbox, 12)
+    for entry in entries:
+        outbox.mark_status(entry["id"], "delivered")
+    _fill(outbox, 1)
+    _settle(outbox)
+    before = {entry["id"]: entry["status"] for entry in outbox.list_recent(limit=100)}
+
+    result = outbox.compact()
+    assert result["removed"] == 0
+    compacted = sorted((tmp_path / "webhook_outbox").glob("*.compact.jsonl"))
+    assert compacted
+    for path in compacted:
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        ids = [record["entry"]["id"] for record in records if record["op"] == "enqueue"]
+        assert len(ids) == len(set(ids))
+    assert {entry["id"]: entry["status"] for entry in outbox.list_recent(limit=100)} == before
+    assert all(before[entry["id"]] == "delivered" for entry in entries)
+    assert len(WebhookOutbox(tmp_path, segment_bytes=512).pending_entries()) == 1
+
+
+def test_retention_drops_old_settled_segments(tmp_path):
+    outbox = WebhookOutbox(tmp_path, segment_bytes=512, retain_segments=1)
+    for entry in _fill(outbox, 12):
+        outbox.mark_status(entry["id"], "delivered")
+    _fill(outbox, 1)
+    _settle(outbox)
+    outbox.compact()
+    settled = [number for number, _ in outbox._segments() if number < outbox._cursor[0]]
+    assert len(settled) <= 1
+    assert len(outbox.pending_entries()) == 1
+
+
+def test_legacy_outbox_is_imported_once(tmp_path):
+    legacy = tmp_path / "webhook_outbox.jsonl"
+    rows = [
+        {"id": "DL-OLD1", "url": WEBHOOK["url"], "status": "pending", "attempts": 0},
+        {"id": "DL-OLD2", "url": WEBHOOK["url"], "status": "delivered", "attempts": 1},
+    ]
+    legacy.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    outbox = WebhookOutbox(tmp_path)
+    assert [entry["id"] for entry in outbox.pending_entries()] == ["DL-OLD1"]
+    assert not legacy.exists()
+    assert (tmp_path / "webhook_outbox.jsonl.migrated").exists()
+    assert [entry["id"] for entry in WebhookOutbox(tmp_path).pending_entries()] == ["DL-OLD1"]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+
+import httpx
+
+from backend import webhooks
+from backend.webhooks import (
+    CircuitBreaker,
+    WebhookDeliveryWorker,
+    WebhookOutbox,
+    WebhookRegistry,
+    sign_payload,
+)
+
+URL = "https://receiver.example/hook"
+EVENT = {"topic": "order.created", "payload": {"order_id": "ORD-1"}, "timestamp": "2026-01-01T00:00:00+00:00"}
+
+
+def _deliver(tmp_path, handler, *, secret=None, **options):
+    registry = WebhookRegistry(tmp_path)
+    webhook = registry.add(URL, ["order.*"], secret=secret)
+    outbox = WebhookOutbox(tmp_path)
+    entry = outbox.enqueue(webhook, EVENT)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        worker = WebhookDeliveryWorker(outbox, registry=registry, client=client, **options)
+        try:
+            await worker.run_once()
+        finally:
+            await client.aclose()
+        return worker
+
+    return outbox, entry, asyncio.run(run())
+
+
+def test_sign_payload_is_hmac_sha256_over_timestamp_and_body():
+    expected = hmac.new(b"s3cret", b"1700000000.{}", hashlib.sha256).hexdigest()
+    assert sign_payload("s3cret", "1700000000", b"{}") == expected
+
+
+def test_delivery_is_signed_with_the_webhook_secret(tmp_path):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(204)
+
+    outbox, _, _ = _deliver(tmp_path, handler, secret="s3cret")
+    request = seen[0]
+    timestamp = request.headers["X-Webhook-Timestamp"]
+    assert request.headers["X-Webhook-Signature"] == f"sha256={sign_payload('s3cret', timestamp, request.content)}"
+    assert json.loads(request.content)["payload"] == {"order_id": "ORD-1"}
+    assert outbox.pending_entries() == []
+    assert outbox.list_recent()[-1]["status"] == "delivered"
+
+
+def test_unsigned_without_a_secret(tmp_path):
+    seen = []
+    _deliver(tmp_path, lambda request: seen.append(request) or httpx.Response(200))
+    assert "X-Webhook-Signature" not in seen[0].headers
+
+
+def test_failed_delivery_is_retried_then_dead_lettered(tmp_path):
+    outbox, _, _ = _deliver(tmp_path, lambda request: httpx.Response(503), max_attempts=2)
+    (pending,) = outbox.pending_entries()
+    assert pending["error"] == "HTTP 503"
+    assert pending["next_attempt_at"]
+
+    async def retry():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        again = WebhookDeliveryWorker(outbox, client=client, max_attempts=2)
+        try:
+            await again.run_once(now=webhooks._parse_timestamp(pending["next_attempt_at"]))
+        finally:
+            await client.aclose()
+
+    asyncio.run(retry())
+    assert outbox.pending_entries() == []
+    assert outbox.list_recent()[-1]["status"] == "dead_letter"
+
+
+def test_pending_entries_survive_a_restart(tmp_path):
+    outbox, entry, _ = _deliver(tmp_path, lambda request: httpx.Response(500))
+    outbox.flush()
+    assert [item["id"] for item in WebhookOutbox(tmp_path).pending_entries()] == [entry["id"]]
+
+
+def test_circuit_breaker_state_changes(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(webhooks.time, "monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(threshold=2, reset_seconds=30.0)
+
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == "closed" and breaker.allow(URL)
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == "open" and not breaker.allow(URL)
+
+    clock[0] += 30.0
+    assert breaker.allow(URL)
+    assert breaker.state(URL) == "half_open"
+    assert not breaker.allow(URL)  # one probe at a time
+
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == "open" and not breaker.allow(URL)
+
+    clock[0] += 30.0
+    assert breaker.allow(URL)
+    breaker.record_success(URL)
+    assert breaker.state(URL) == "closed" and breaker.allow(URL)
+
+
+def test_open_breaker_pauses_dispatch(tmp_path):
+    breaker = CircuitBreaker(threshold=1, reset_seconds=3600.0)
+    _deliver(tmp_path, lambda request: httpx.Response(500), breaker=breaker)
+    assert breaker.state(URL) == "open"
+
+    calls = []
+    _deliver(tmp_path, lambda request: calls.append(request) or httpx.Response(200), breaker=breaker)
+    assert calls == []